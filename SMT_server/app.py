@@ -18,109 +18,120 @@ Author: Gojo-Satoru-git
 
 import os
 import re
+import functools
+import base64
+import hashlib
+import threading
 from datetime import datetime, timezone, timedelta
-import pandas as pd
 import numpy as np
 import json
 
 # --- Flask & DB Imports ---
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_app_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, case, func, or_, select, text, update
+from sqlalchemy.orm import Session, aliased
 
 # --- Supervised ML Imports ---
-import spacy
-import dateparser
-import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.pipeline import Pipeline
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-
-# --- RL Imports ---
-import tensorflow as tf
-from tf_agents.agents.dqn import dqn_agent
-from tf_agents.networks import q_network
-from tf_agents.environments import tf_py_environment, py_environment, utils
-from tf_agents.specs import array_spec
-from tf_agents.utils import common
-from tf_agents.trajectories import trajectory
-from tf_agents.replay_buffers import tf_uniform_replay_buffer
-from tf_agents.trajectories import time_step as ts
+# spaCy, joblib models and TensorFlow are loaded lazily by the registry
+import db_config
+import metrics
+from model_registry import ModelRegistry, UserModelRegistry, rl_enabled
+from feature_schema import NO_DEADLINE_HOURS, hours_until_due, model_columns, priority_frame
+from insights_store import InsightsStore, completion_slot
+from slot_clustering import N_SLOTS
+from scheduler import (SlotAllocator, allocate_all, time_to_cell, cell_to_time,
+                       GRANULARITIES, DEFAULT_GRANULARITY_MIN, DEFAULT_WEEKS, MAX_WEEKS)
+from task_parser import PARSE_WORKERS, ParsePool, parse_date
+from prediction_cache import LRUCache, PredictionCache, normalize_text, normalize_task_name, bucket_hours
+from profile_store import Profile, ProfileStore
+from training_pipeline import StageTimer, train_all
+from online_time_model import ONLINE_ENABLED, WINDOW as ONLINE_WINDOW, RunningTimeStats, blend
+from retrain_jobs import (RetrainQueue, new_job_id, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED,
+                          ACTIVE_STATES, JOB_TIMEOUT)
 
 # --- Initialize App & DB---
 app = Flask(__name__)
 CORS(app)
+metrics.instrument_app(app)  # request timing + GET /metrics (SMT_METRICS=0 disables)
 base_dir = os.path.dirname(os.path.abspath(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(base_dir, 'tasks.db')
+# DATABASE_URL, pool sizes and SQLite pragmas: see db_config.py
+app.config['SQLALCHEMY_DATABASE_URI'] = db_config.database_url(base_dir)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = db_config.engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 
+# --- Write transactions ---
+# Requests that write open their transaction with BEGIN IMMEDIATE, so
+# concurrent writers queue on SQLite's lock (busy_timeout) instead of
+# failing with "database is locked" when a read has to upgrade.
+def wants_write_lock():
+    return has_app_context() and g.get('db_write', False)
+
+def write_transaction(view):
+    """Marks an endpoint as a writer from its first query on."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_write = True
+        return view(*args, **kwargs)
+    return wrapper
+
+def begin_write():
+    """Ends the current read transaction (of a request or a job); the next one takes the write lock up front."""
+    db.session.commit()
+    g.db_write = True
+
+with app.app_context():
+    db_config.install(db.engine, immediate=wants_write_lock)
+    metrics.instrument_db(db.engine, Session)
+
 # --- Machine Learning Model Initialization ---
-print("Loading supervised models...")
-nlp = spacy.load("en_core_web_sm")
-
-time_model_path = os.path.join(base_dir, 'ml_models', 'time_predictor.joblib')
-time_model = joblib.load(time_model_path)
-print("Time prediction model loaded.")
-
-priority_model_path = os.path.join(base_dir, 'ml_models', 'priority_model.joblib')
-priority_model = joblib.load(priority_model_path)
-print("Priority prediction model loaded.")
-
-# --- 2. RL: Define Agent & Environment ---
-rl_agent = None 
-tf_env = None
-
-class CalendarEnv(py_environment.PyEnvironment):
-    def __init__(self):
-        self._observation_spec = array_spec.BoundedArraySpec(
-            shape=(168,), dtype=np.int32, minimum=0, maximum=1, name='calendar'
-        )
-        self._action_spec = array_spec.BoundedArraySpec(
-            shape=(), dtype=np.int32, minimum=0, maximum=167, name='choose_slot'
-        )
-        self._state = np.zeros(168, dtype=np.int32)
-        self._episode_ended = False
-
-    def action_spec(self): return self._action_spec
-    def observation_spec(self): return self._observation_spec
-    def _reset(self):
-        self._state = np.zeros(168, dtype=np.int32)
-        self._episode_ended = False
-        return ts.restart(self._state)
-    
-    def _step(self, action):
-        if self._episode_ended: return self.reset()
-        chosen_slot = action
-        if self._state[chosen_slot] == 1: reward = -100
-        else: reward = 10
-        self._state[chosen_slot] = 1
-        self._episode_ended = True
-        return ts.termination(self._state, reward=reward)
-
-def create_agent():
-    print("Setting up RL environment...")
-    py_env = CalendarEnv()
-    train_env = tf_py_environment.TFPyEnvironment(py_env)
-    q_net = q_network.QNetwork(
-        train_env.observation_spec(),
-        train_env.action_spec(),
-        fc_layer_params=(128, 64)
-    )
-    optimizer = tf.compat.v1.train.AdamOptimizer(learning_rate=1e-3)
-    agent = dqn_agent.DqnAgent(
-        train_env.time_step_spec(),
-        train_env.action_spec(),
-        q_network=q_net,
-        optimizer=optimizer,
-        td_errors_loss_fn=common.element_wise_huber_loss,
-        train_step_counter=tf.Variable(0)
-    )
-    agent.initialize()
-    print("RL Agent initialized successfully in memory.")
-    return agent, train_env
+# Nothing is loaded here: spaCy and the joblib models load on first use,
+# and the RL agent (TensorFlow) only when SMT_ENABLE_RL=1.
+# Retrained models and the profile are written under SMT_STATE_DIR (default: next to app.py)
+state_dir = os.environ.get('SMT_STATE_DIR', base_dir)
+models = ModelRegistry(base_dir, state_dir)
+time_model_path = models.time_model_path
+priority_model_path = models.priority_model_path
+
+# --- Prediction cache for parse-task (cleared whenever a model is swapped) ---
+prediction_cache = PredictionCache()
+models.on_swap(lambda name, model: prediction_cache.invalidate_models())
+_MISSING = object()
+
+# --- Date parsing (NER-only spaCy + regex fast path; worker processes if SMT_PARSE_WORKERS > 0) ---
+parse_pool = ParsePool(lambda: models.nlp)
+
+# --- Productivity profile (parsed once, re-read only when the file changes) ---
+profile_store = ProfileStore(os.path.join(state_dir, 'user_profile.json'))
+
+# --- Users ---
+# Every request acts for one user. Clients that name none, like the
+# current app, are the default user, so a single-user install behaves
+# exactly as before. The X-User-Id header is not authenticated: it is
+# only honoured with SMT_TRUST_USER_HEADER=1, behind a reverse proxy that
+# authenticates the client and sets (or strips) the header itself.
+DEFAULT_USER_ID = os.environ.get('SMT_DEFAULT_USER', 'default')
+USER_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.@-]{1,64}$')
+TRUST_USER_HEADER = os.environ.get('SMT_TRUST_USER_HEADER', '0').lower() in ('1', 'true', 'yes')
+# Per-user plans, profiles and insights kept in memory (least recently used are dropped)
+USER_CACHE_SIZE = int(os.environ.get('SMT_USER_CACHE_SIZE', 256))
+
+@app.before_request
+def refresh_models():
+    # Picks up model versions and profiles published by a retrain in any process
+    models.refresh()
+    profile_store.refresh()
+
+@app.before_request
+def identify_user():
+    user_id = request.headers.get('X-User-Id') or DEFAULT_USER_ID
+    if not USER_ID_PATTERN.match(user_id):
+        return jsonify({"error": "Invalid user id"}), 400
+    if user_id != DEFAULT_USER_ID and not TRUST_USER_HEADER:
+        return jsonify({"error": "X-User-Id is not accepted by this server (SMT_TRUST_USER_HEADER is off)"}), 403
+    g.user_id = user_id
 
 # --- Helper for fixing timezones ---
 def to_utc_iso(dt):
@@ -131,8 +142,23 @@ def to_utc_iso(dt):
     return dt_aware.isoformat()
 
 # --- 3. Define the Task Database Model ---
+def utc_now():
+    return datetime.now(timezone.utc)
+
 class Task(db.Model):
+    # Composite indexes matching the GET /api/v1/tasks partitions, ETags and the plan, per user
+    __table_args__ = (
+        db.Index('ix_task_user_status_my_day_due', 'user_id', 'status', 'my_day_date', 'due_date'),
+        db.Index('ix_task_user_status_due', 'user_id', 'status', 'due_date'),
+        db.Index('ix_task_user_status_completed', 'user_id', 'status', 'completed_at'),
+        db.Index('ix_task_user_status_scheduled', 'user_id', 'status', 'scheduled_time'),
+        db.Index('ix_task_user_updated', 'user_id', 'updated_at'),
+        # Never hand out a deleted task's id again (its tombstone would delete the new task on ?since= clients)
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String(64), nullable=False, default=DEFAULT_USER_ID)
     task_name = db.Column(db.String(200), nullable=False)
     due_date = db.Column(db.DateTime, nullable=True)
     predicted_time_min = db.Column(db.Integer, nullable=True)
@@ -143,6 +169,8 @@ class Task(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
     completed_at = db.Column(db.DateTime, nullable=True)
     actual_time_taken_min = db.Column(db.Integer, nullable=True)
+    # Bumped on every write; drives ETags and ?since= deltas
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
 
     def to_dict(self):
         return {
@@ -158,44 +186,385 @@ class Task(db.Model):
             'completed_at': to_utc_iso(self.completed_at)
         }
 
+class DeletedTask(db.Model):
+    """Tombstones so ?since= clients learn about deletions."""
+    __table_args__ = (db.Index('ix_deleted_task_user_deleted', 'user_id', 'deleted_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String(64), nullable=False, default=DEFAULT_USER_ID)
+    deleted_at = db.Column(db.DateTime, default=utc_now, index=True)
+
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+class CompletionStat(db.Model):
+    """Incremental 7x24 completion histogram per user and priority, feeding /api/v1/insights."""
+    user_id = db.Column(db.String(64), primary_key=True)
+    slot = db.Column(db.Integer, primary_key=True)  # day_of_week * 24 + hour_of_day (UTC)
+    priority = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class SchedulePlan(db.Model):
+    """Header of a user's persisted smart schedule; placements live in Task.scheduled_time."""
+    user_id = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)  # bumped on every plan change
+    week_start = db.Column(db.DateTime, nullable=False)  # Monday 00:00 UTC, first cell of the horizon
+    granularity_min = db.Column(db.Integer, nullable=False)
+    weeks = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=utc_now)
+
+class RetrainJob(db.Model):
+    """Status of a background retrain, readable from any server process."""
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.String(64), nullable=True, index=True)  # whose models it trains
+    status = db.Column(db.String(20), nullable=False, default=JOB_QUEUED, index=True)
+    created_at = db.Column(db.DateTime, default=utc_now, index=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    model_version = db.Column(db.Integer, nullable=True)
+    message = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    timings = db.Column(db.Text, nullable=True)  # JSON {stage: seconds}
+
+    def is_lost(self):
+        """Queued/running for longer than JOB_TIMEOUT: its worker is gone and it will never finish."""
+        return (self.status in ACTIVE_STATES and self.created_at is not None
+                and self.created_at.replace(tzinfo=timezone.utc) < utc_now() - JOB_TIMEOUT)
+
+    def to_dict(self):
+        lost = self.is_lost()
+        return {
+            'job_id': self.id,
+            'user_id': self.user_id,
+            'status': JOB_FAILED if lost else self.status,
+            'created_at': to_utc_iso(self.created_at),
+            'started_at': to_utc_iso(self.started_at),
+            'finished_at': to_utc_iso(self.finished_at),
+            'model_version': self.model_version,
+            'message': self.message,
+            'error': f"Timed out after {int(JOB_TIMEOUT.total_seconds())}s" if lost else self.error,
+            'timings': json.loads(self.timings) if self.timings else None,
+        }
+
+class UserProfile(db.Model):
+    """A user's productivity profile (the default user keeps using user_profile.json)."""
+    user_id = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    last_trained = db.Column(db.String(40), nullable=True)
+    deep_work_slots = db.Column(db.Text, nullable=False, default='[]')  # JSON list of hour-of-week ids
+    shallow_work_slots = db.Column(db.Text, nullable=False, default='[]')
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
+
+    def to_data(self):
+        return {'version': self.version, 'last_trained': self.last_trained,
+                'deep_work_slots': json.loads(self.deep_work_slots),
+                'shallow_work_slots': json.loads(self.shallow_work_slots)}
+
+class UserModel(db.Model):
+    """Pointer to a user's own model artifacts (ml_models/users/versions/)."""
+    user_id = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    time_model = db.Column(db.String(300), nullable=False)
+    priority_model = db.Column(db.String(300), nullable=False)
+    n_samples = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
+
+def lookup_user_models(user_id):
+    """(version, artifacts) of the user's own models, or None to use the global ones."""
+    row = db.session.get(UserModel, user_id)
+    if row is None:
+        return None
+    return row.version, {'time_model': row.time_model, 'priority_model': row.priority_model}
+
+# Personalized models for users who trained their own; everyone else shares `models`
+user_models = UserModelRegistry(models, lookup_user_models)
+
+def record_completion(user_id, completed_at, priority, delta=1):
+    """Adds delta to the user's histogram bin, inside the caller's transaction."""
+    day_of_week, hour_of_day = completion_slot(completed_at)
+    slot = day_of_week * 24 + hour_of_day
+    priority = priority or 'Low'
+    updated = CompletionStat.query.filter_by(user_id=user_id, slot=slot, priority=priority).update(
+        {CompletionStat.count: CompletionStat.count + delta})
+    if not updated and delta > 0:
+        db.session.add(CompletionStat(user_id=user_id, slot=slot, priority=priority, count=delta))
+
+def rebuild_completion_stats():
+    """Recomputes the histogram from the Task table (after bulk loads or on first start)."""
+    counts = {}
+    rows = db.session.query(Task.user_id, Task.completed_at, Task.predicted_priority).filter(
+        Task.status == 'completed', Task.completed_at.isnot(None)).yield_per(10000)
+    for user_id, completed_at, priority in rows:
+        day_of_week, hour_of_day = completion_slot(completed_at)
+        key = (user_id, day_of_week * 24 + hour_of_day, priority or 'Low')
+        counts[key] = counts.get(key, 0) + 1
+    CompletionStat.query.delete()
+    if counts:
+        db.session.execute(CompletionStat.__table__.insert(), [
+            {'user_id': user_id, 'slot': slot, 'priority': priority, 'count': n}
+            for (user_id, slot, priority), n in counts.items()])
+    db.session.commit()
+    insights_stores.clear()
+    print(f"Completion histogram rebuilt from {sum(counts.values())} completed tasks.")
+
+class TimeStat(db.Model):
+    """Running actual-time stats per user and normalized task name (online time model)."""
+    user_id = db.Column(db.String(64), primary_key=True)
+    name = db.Column(db.String(200), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float, nullable=False, default=0.0)
+
+def time_stat_key(task_name):
+    return normalize_task_name(task_name)[:200]
+
+def record_time_feedback(user_id, task_name, actual_minutes):
+    """O(1) online update of the user's running time estimate for the name, inside the caller's transaction."""
+    key = time_stat_key(task_name)
+    new_count = TimeStat.count + 1
+    # Same arithmetic as online_time_model.running_update, done by the DB so workers never race
+    updated = TimeStat.query.filter_by(user_id=user_id, name=key).update({
+        TimeStat.count: new_count,
+        TimeStat.mean: TimeStat.mean + (actual_minutes - TimeStat.mean)
+                       / case((new_count < ONLINE_WINDOW, new_count), else_=ONLINE_WINDOW),
+    })
+    if not updated:
+        db.session.add(TimeStat(user_id=user_id, name=key, count=1, mean=float(actual_minutes)))
+
+def rebuild_time_stats():
+    """Replays every completion in order to rebuild the online time stats."""
+    stats = RunningTimeStats()
+    rows = db.session.query(Task.user_id, Task.task_name, Task.actual_time_taken_min).filter(
+        Task.status == 'completed', Task.actual_time_taken_min.isnot(None)
+    ).order_by(Task.completed_at, Task.id).yield_per(10000)
+    for user_id, task_name, minutes in rows:
+        stats.update((user_id, time_stat_key(task_name)), minutes)
+    TimeStat.query.delete()
+    if stats.stats:
+        db.session.execute(TimeStat.__table__.insert(), [
+            {'user_id': user_id, 'name': name, 'count': count, 'mean': mean}
+            for (user_id, name), (count, mean) in stats.stats.items()])
+    db.session.commit()
+    print(f"Online time stats rebuilt for {len(stats.stats)} (user, task name) pairs.")
+
+def online_time_adjust(user_id, task_names, forest_minutes):
+    """Blends forest predictions with the user's running stats (no-op unless SMT_ONLINE_TIME=1)."""
+    if not ONLINE_ENABLED:
+        return list(forest_minutes)
+    keys = [time_stat_key(name) for name in task_names]
+    stats = {stat.name: stat for stat in TimeStat.query.filter(
+        TimeStat.user_id == user_id, TimeStat.name.in_(set(keys)))}
+    return [blend(minutes, stats[key].count, stats[key].mean) if key in stats else minutes
+            for key, minutes in zip(keys, forest_minutes)]
+
+def load_completion_histograms(user_id):
+    histograms = {}
+    for stat in CompletionStat.query.filter(CompletionStat.user_id == user_id, CompletionStat.count > 0):
+        histograms.setdefault(stat.priority, np.zeros(N_SLOTS, dtype=np.int64))[stat.slot] = stat.count
+    return histograms
+
+# One clustering cache per user (bounded)
+insights_stores = LRUCache(maxsize=USER_CACHE_SIZE)
+
+def insights_store_for(user_id):
+    store = insights_stores.get(user_id)
+    if store is None:
+        store = InsightsStore()
+        insights_stores.set(user_id, store)
+    return store
+
+# Columns added after the first release, with the backfill to run once
+_COLUMN_BACKFILLS = {
+    ('task', 'updated_at'): 'UPDATE task SET updated_at = COALESCE(completed_at, created_at)',
+    # Rows from before multi-user support belong to the default user
+    ('task', 'user_id'): 'UPDATE task SET user_id = :default_user',
+    ('deleted_task', 'user_id'): 'UPDATE deleted_task SET user_id = :default_user',
+    ('retrain_job', 'user_id'): 'UPDATE retrain_job SET user_id = :default_user',
+}
+# Tables derived from Task whose primary key gained user_id: dropped and rebuilt
+_DERIVED_TABLES = (CompletionStat, TimeStat, SchedulePlan)
+# Single-user indexes replaced by the per-user ones
+_OBSOLETE_INDEXES = ('ix_task_status_my_day_due', 'ix_task_status_due', 'ix_task_status_completed',
+                     'ix_task_status_scheduled', 'ix_task_updated_at')
+
+def init_db():
+    """Creates missing tables, columns and indexes. Safe to run on every start."""
+    inspector = db.inspect(db.engine)
+    for model in _DERIVED_TABLES:
+        table = model.__table__
+        if inspector.has_table(table.name) and 'user_id' not in {c['name'] for c in inspector.get_columns(table.name)}:
+            table.drop(db.engine)
+            print(f"Dropped {table.name} (rebuilt per user)")
+    db.create_all()
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                backfill = _COLUMN_BACKFILLS.get((table.name, column.name))
+                if backfill:
+                    conn.execute(text(backfill), {'default_user': DEFAULT_USER_ID})
+                print(f"Added column {table.name}.{column.name}")
+        for index_name in _OBSOLETE_INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS {index_name}'))
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    # First start after upgrading: build the insights histogram once
+    if CompletionStat.query.first() is None and Task.query.filter_by(status='completed').first() is not None:
+        rebuild_completion_stats()
+    if TimeStat.query.first() is None and completed_with_feedback().first() is not None:
+        rebuild_time_stats()
+
 # --- 4. API Endpoints ---
 
+# --- Cached prediction helpers used by parse_task ---
+def parse_dates(texts, batch_size=256):
+    """
+    {text: (date_text, due_date)} for the unique texts. Date phrases are
+    cached per text; only uncached texts go through spaCy (one pass, in
+    the parse pool). Due dates are always re-resolved: "tomorrow" moves.
+    """
+    parsed = {}
+    to_parse = []
+    for text in dict.fromkeys(texts):
+        cached = prediction_cache.entities.get(normalize_text(text), _MISSING)
+        if cached is _MISSING:
+            to_parse.append(text)
+        else:
+            parsed[text] = (cached, parse_date(cached))
+    for text, result in zip(to_parse, parse_pool.parse(to_parse, batch_size)):
+        prediction_cache.entities.set(normalize_text(text), result[0])
+        parsed[text] = result
+    return parsed
+
+def predict_time_min(user_id, task_name):
+    user_model_set = user_models.get(user_id)
+    # Keyed by model scope too: users with their own models must not share entries
+    key = (user_model_set.scope, normalize_task_name(task_name))
+    # Only the forest's output is cached; online stats change with every completion
+    predicted_time_raw = prediction_cache.time.get(key)
+    if predicted_time_raw is None:
+        predicted_time_raw = float(user_model_set.time_predictor.predict([task_name])[0])
+        prediction_cache.time.set(key, predicted_time_raw)
+    predicted_time_raw = online_time_adjust(user_id, [task_name], [predicted_time_raw])[0]
+    return int(round(predicted_time_raw / 5.0) * 5.0)
+
+def predict_priority(user_id, task_name, time_until_due_hours, predicted_time_min):
+    user_model_set = user_models.get(user_id)
+    hours_bucket = bucket_hours(time_until_due_hours)
+    key = (user_model_set.scope, normalize_task_name(task_name), hours_bucket, predicted_time_min)
+    predicted_priority = prediction_cache.priority.get(key)
+    if predicted_priority is None:
+        # Compiled fast path: no DataFrame, identical to priority_model.predict
+        predicted_priority = str(user_model_set.priority_predictor.predict_one(task_name, hours_bucket, predicted_time_min))
+        prediction_cache.priority.set(key, predicted_priority)
+    return predicted_priority
+
+def resolve_due_date(text_input, date_text, parsed_due_date):
+    """Strips the date phrase from the text. Returns (task_name, due_date, hours_until_due)."""
+    task_name = text_input
+    time_until_due_hours = NO_DEADLINE_HOURS
+    if date_text:
+        task_name = re.sub(re.escape(date_text), '', task_name, flags=re.IGNORECASE)
+        task_name = task_name.strip()
+        if parsed_due_date:
+            # Due dates are naive local time, so compare with naive local now
+            time_until_due_hours = hours_until_due(parsed_due_date, datetime.now())
+    return task_name, parsed_due_date, time_until_due_hours
+
 @app.route("/api/v1/parse-task", methods=["POST"])
 def parse_task():
     data = request.get_json()
     if not data or "text" not in data:
         return jsonify({"error": "No text provided"}), 400
     text_input = data["text"]
-    doc = nlp(text_input)
-    task_name = text_input
-    parsed_due_date = None
-    time_until_due_hours = 24 * 7
-    for ent in doc.ents:
-        if ent.label_ in ("DATE", "TIME", "DURATION"):
-            parsed_due_date = dateparser.parse(ent.text, settings={'PREFER_DATES_FROM': 'future'})
-            task_name = re.sub(re.escape(ent.text), '', task_name, flags=re.IGNORECASE)
-            task_name = task_name.strip()
-            if parsed_due_date:
-                time_diff_seconds = (parsed_due_date - datetime.now()).total_seconds()
-                time_until_due_hours = max(0, time_diff_seconds / 3600)
-            break
-            
-    predicted_time_raw = time_model.predict([task_name])[0]
-    predicted_time_min = int(round(predicted_time_raw / 5.0) * 5.0)
-    
-    # --- THIS IS THE FIX ---
-    # The priority model was trained on 'time_estimate_min', not 'predicted_time_min'
-    priority_input_df = pd.DataFrame({
-        'task_name': [task_name], 
-        'time_until_due_hours': [time_until_due_hours], 
-        'time_estimate_min': [predicted_time_min] # <-- This line is corrected
-    })
-    
-    predicted_priority = priority_model.predict(priority_input_df)[0]
+    task_name, parsed_due_date, time_until_due_hours = resolve_due_date(text_input, *parse_dates([text_input])[text_input])
+
+    predicted_time_min = predict_time_min(g.user_id, task_name)
+    predicted_priority = predict_priority(g.user_id, task_name, time_until_due_hours, predicted_time_min)
     print(f"Model's guess: {predicted_priority} (due in {time_until_due_hours:.1f}h)")
     return jsonify({"task_name": task_name, "due_date": parsed_due_date.isoformat() if parsed_due_date else None, "predicted_time_min": predicted_time_min, "predicted_priority": predicted_priority})
 
+# --- Batch parse-and-predict (bulk imports) ---
+BATCH_MAX_ITEMS = int(os.environ.get('SMT_BATCH_MAX_ITEMS', 10000))
+BATCH_MAX_PIPE_SIZE = 4096  # largest nlp.pipe batch_size a client may ask for
+
+@app.route("/api/v1/parse-task/batch", methods=["POST"])
+def parse_task_batch():
+    """
+    Parses many task strings in one request:
+    spaCy runs once over all texts with nlp.pipe, and each model runs a
+    single vectorized predict. With "create": true the parsed tasks are
+    also inserted in one bulk INSERT.
+    """
+    data = request.get_json()
+    if not data or not isinstance(data.get("texts"), list):
+        return jsonify({"error": "'texts' must be a list of strings"}), 400
+    texts = data["texts"]
+    if not all(isinstance(t, str) for t in texts):
+        return jsonify({"error": "'texts' must be a list of strings"}), 400
+    if len(texts) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"At most {BATCH_MAX_ITEMS} texts per batch"}), 400
+    batch_size = data.get("batch_size", 256)
+    if isinstance(batch_size, bool) or not isinstance(batch_size, int) or not 1 <= batch_size <= BATCH_MAX_PIPE_SIZE:
+        return jsonify({"error": f"'batch_size' must be an integer from 1 to {BATCH_MAX_PIPE_SIZE}"}), 400
+    if not texts:
+        return jsonify({"results": [], "created": 0})
+
+    # 1. Entities: one nlp.pipe pass over the unique texts that are not cached yet
+    # 2. Due dates and task names, once per unique text
+    resolved = {text: resolve_due_date(text, *parsed) for text, parsed in parse_dates(texts, batch_size).items()}
+    rows = [resolved[text] for text in texts]
+    task_names = [row[0] for row in rows]
+
+    # 3. One vectorized predict per model
+    # (sklearn's Cython forests win on large batches; the compiled path wins per row)
+    user_model_set = user_models.get(g.user_id)
+    with metrics.span('time_model.sklearn'):
+        forest_minutes = user_model_set.time_model.predict(task_names)
+    predicted_raw = online_time_adjust(g.user_id, task_names, forest_minutes)
+    predicted_times = [int(round(t / 5.0) * 5.0) for t in predicted_raw]
+    priority_model = user_model_set.priority_model
+    with metrics.span('priority_model.sklearn'):
+        predicted_priorities = priority_model.predict(priority_frame(
+            task_names, [row[2] for row in rows], predicted_times, model_columns(priority_model)))
+
+    results = []
+    for (task_name, due_date, _), time_min, priority in zip(rows, predicted_times, predicted_priorities):
+        results.append({"task_name": task_name, "due_date": due_date.isoformat() if due_date else None,
+                        "predicted_time_min": time_min, "predicted_priority": str(priority)})
+
+    # 4. Optional single bulk insert
+    created = 0
+    if data.get("create"):
+        created_at = datetime.now(timezone.utc)
+        task_rows = [{'user_id': g.user_id, 'task_name': r['task_name'][:200], 'due_date': due_date,
+                      'predicted_time_min': r['predicted_time_min'],
+                      'predicted_priority': r['predicted_priority'],
+                      'status': 'pending', 'created_at': created_at}
+                     for r, (_, due_date, _) in zip(results, rows) if r['task_name']]
+        try:
+            begin_write()
+            if task_rows:
+                db.session.execute(Task.__table__.insert(), task_rows)
+                update_plan(g.user_id, fill=True)
+            db.session.commit()
+            created = len(task_rows)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error bulk creating tasks: {e}")
+            return jsonify({"error": "Failed to create tasks"}), 500
+    print(f"Batch parsed {len(texts)} texts ({len(resolved)} unique), created {created} tasks.")
+    return jsonify({"results": results, "created": created})
+
+@app.route("/api/v1/parse-task/cache", methods=["GET"])
+def get_parse_cache_stats():
+    return jsonify(prediction_cache.stats())
+
 @app.route("/api/v1/tasks", methods=["POST"])
+@write_transaction
 def create_task():
     data = request.get_json()
     due_date_obj = None
@@ -205,34 +574,156 @@ def create_task():
             due_date_obj = datetime.fromisoformat(due_date_str)
         except ValueError:
             return jsonify({"error": "Invalid date format"}), 400
-    new_task = Task(task_name=data['task_name'], due_date=due_date_obj,
+    new_task = Task(user_id=g.user_id, task_name=data['task_name'], due_date=due_date_obj,
                     predicted_time_min=data.get('predicted_time_min'),
                     predicted_priority=data.get('predicted_priority'), status='pending')
     db.session.add(new_task)
+    db.session.flush()
+    update_plan(g.user_id, add=[new_task])
     db.session.commit()
     return jsonify(new_task.to_dict()), 201
 
+# --- Task list helpers: one partitioned query, keyset cursors, ETags ---
+def encode_cursor(task):
+    payload = json.dumps([task.due_date.isoformat() if task.due_date else None, task.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor):
+    due_iso, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    return (datetime.fromisoformat(due_iso) if due_iso else None), int(task_id)
+
+def after_cursor(cursor_due, cursor_id):
+    """Rows after the cursor in (due_date NULLS FIRST, id) order."""
+    if cursor_due is None:
+        return or_(Task.due_date.isnot(None), and_(Task.due_date.is_(None), Task.id > cursor_id))
+    return and_(Task.due_date.isnot(None),
+                or_(Task.due_date > cursor_due, and_(Task.due_date == cursor_due, Task.id > cursor_id)))
+
+def task_list_etag(user_id):
+    """Cheap fingerprint: index-backed MAX() lookups plus the day/hour (for the 24h window)."""
+    latest_update, latest_id = db.session.query(func.max(Task.updated_at), func.max(Task.id)).filter(
+        Task.user_id == user_id).one()
+    latest_delete = db.session.query(func.max(DeletedTask.deleted_at)).filter(DeletedTask.user_id == user_id).scalar()
+    raw = f"{latest_update}|{latest_id}|{latest_delete}|{datetime.now().strftime('%Y-%m-%d %H')}|{request.query_string.decode()}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def get_task_changes(user_id, since):
+    """Delta for clients that already hold the list: changed rows + deleted ids."""
+    today = datetime.now().date()
+    changed = Task.query.filter(Task.user_id == user_id, Task.updated_at > since).order_by(
+        Task.updated_at.asc(), Task.id.asc()).all()
+    # Tables created before AUTOINCREMENT can still reuse an id: a live task outranks its old tombstone
+    deleted = [row.id for row in DeletedTask.query.filter(
+        DeletedTask.user_id == user_id, DeletedTask.deleted_at > since,
+        DeletedTask.id.notin_(select(Task.id).where(Task.user_id == user_id))).all()]
+    result = []
+    for task in changed:
+        task_dict = task.to_dict()
+        if task.status == 'pending':
+            task_dict['section'] = 'my_day' if task.my_day_date == today else 'pending'
+        else:
+            task_dict['section'] = 'completed'
+        result.append(task_dict)
+    return {'changed': result, 'deleted': deleted, 'server_time': to_utc_iso(datetime.now(timezone.utc).replace(tzinfo=None))}
+
+TASKS_MAX_LIMIT = int(os.environ.get('SMT_TASKS_MAX_LIMIT', 1000))
+
 @app.route("/api/v1/tasks", methods=["GET"])
 def get_tasks():
+    """
+    Returns {'my_day', 'pending', 'completed'} from a single query.
+    Optional query params:
+    - limit / cursor: keyset pagination of the 'pending' section, at most
+      SMT_TASKS_MAX_LIMIT rows a page (my_day and completed are only sent on the first page)
+    - since: ISO timestamp; returns only changes and deletions after it
+    Responses carry an ETag; a matching If-None-Match returns 304.
+    """
+    etag = task_list_etag(g.user_id)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    since_arg = request.args.get('since')
+    if since_arg:
+        try:
+            since = datetime.fromisoformat(since_arg.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({"error": "Invalid 'since' timestamp"}), 400
+        since = since.astimezone(timezone.utc).replace(tzinfo=None) if since.tzinfo else since
+        # Tombstones older than the retention window are pruned: fall back to a full list
+        if datetime.now(timezone.utc).replace(tzinfo=None) - since < TOMBSTONE_RETENTION:
+            response = jsonify(get_task_changes(g.user_id, since))
+            response.set_etag(etag)
+            return response
+
+    try:
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+        cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+    if limit is not None and not 1 <= limit <= TASKS_MAX_LIMIT:
+        return jsonify({"error": f"limit must be from 1 to {TASKS_MAX_LIMIT}"}), 400
+
     today = datetime.now().date()
-    my_day_tasks = Task.query.filter_by(status='pending', my_day_date=today).order_by(Task.due_date.asc()).all()
-    my_day_task_ids = {task.id for task in my_day_tasks}
-    pending_tasks = Task.query.filter(Task.status == 'pending', Task.id.notin_(my_day_task_ids)).order_by(Task.due_date.asc()).all()
     twenty_four_hours_ago = datetime.now(timezone.utc) - timedelta(hours=24)
-    completed_tasks = Task.query.filter(Task.status == 'completed', Task.completed_at >= twenty_four_hours_ago).order_by(Task.completed_at.desc()).all()
-    return jsonify({'my_day': [task.to_dict() for task in my_day_tasks], 'pending': [task.to_dict() for task in pending_tasks], 'completed': [task.to_dict() for task in completed_tasks]})
+    section = case(
+        (and_(Task.status == 'pending', Task.my_day_date == today), 'my_day'),
+        (Task.status == 'pending', 'pending'),
+        else_='completed')
+    is_completed = section == 'completed'
+    # Pending sections sort by due date (NULLs first, as before); completed by newest first
+    order_keys = [
+        case((is_completed, None), else_=Task.due_date.isnot(None)),
+        case((is_completed, None), else_=Task.due_date),
+        Task.completed_at.desc(),
+        Task.id,
+    ]
+    query = select(Task, section.label('section'),
+                   func.row_number().over(partition_by=section, order_by=order_keys).label('rn'))
+    query = query.where(Task.user_id == g.user_id,
+                        or_(Task.status == 'pending',
+                            and_(Task.status == 'completed', Task.completed_at >= twenty_four_hours_ago)))
+    if cursor:
+        query = query.where(section == 'pending', after_cursor(*cursor))
+    subquery = query.subquery()
+    task_row = aliased(Task, subquery)
+    outer = select(task_row, subquery.c.section).order_by(subquery.c.section, subquery.c.rn)
+    if limit:
+        # One extra pending row tells us whether there is a next page
+        outer = outer.where(or_(subquery.c.section != 'pending', subquery.c.rn <= limit + 1))
+
+    sections = {'my_day': [], 'pending': [], 'completed': []}
+    for task, task_section in db.session.execute(outer):
+        sections[task_section].append(task)
+    next_cursor = None
+    if limit and len(sections['pending']) > limit:
+        sections['pending'] = sections['pending'][:limit]
+        next_cursor = encode_cursor(sections['pending'][-1])
+
+    payload = {name: [task.to_dict() for task in tasks] for name, tasks in sections.items()}
+    if limit:
+        payload['next_cursor'] = next_cursor
+    response = jsonify(payload)
+    response.set_etag(etag)
+    return response
+
+def get_user_task(task_id):
+    """The task if it belongs to the requesting user (other users' ids look like missing ones)."""
+    return Task.query.filter_by(id=task_id, user_id=g.user_id).first()
 
 @app.route("/api/v1/tasks/<int:task_id>", methods=["GET"])
 def get_task(task_id):
-    task = Task.query.get(task_id)
+    task = get_user_task(task_id)
     if not task:
         return jsonify({"error": "Task not found"}), 404
     return jsonify(task.to_dict())
 
 # --- COMPLETE a task (UPGRADED) ---
 @app.route("/api/v1/tasks/<int:task_id>/complete", methods=["PUT"])
+@write_transaction
 def complete_task(task_id):
-    task = Task.query.get(task_id)
+    task = get_user_task(task_id)
     if not task: 
         return jsonify({"error": "Task not found"}), 404
     if task.status == 'completed': 
@@ -250,14 +741,18 @@ def complete_task(task_id):
     
     # --- NEW: Save the user-provided time directly ---
     task.actual_time_taken_min = int(actual_time)
+    record_completion(task.user_id, task.completed_at, task.predicted_priority)
+    record_time_feedback(task.user_id, task.task_name, task.actual_time_taken_min)
+    update_plan(task.user_id, remove=[task], fill=True)
     
     db.session.commit()
     print(f"Task {task.id} completed. Actual time: {task.actual_time_taken_min} min (User reported)")
     return jsonify(task.to_dict())
 
 @app.route("/api/v1/tasks/<int:task_id>/myday", methods=["POST"])
+@write_transaction
 def toggle_my_day(task_id):
-    task = Task.query.get(task_id)
+    task = get_user_task(task_id)
     if not task:
         return jsonify({"error": "Task not found"}), 404
     today = datetime.now().date()
@@ -265,16 +760,27 @@ def toggle_my_day(task_id):
         task.my_day_date = None
     else:
         task.my_day_date = today
+        if task.status == 'pending':
+            update_plan(task.user_id, add=[task], remove=[task])  # try to move it into today
     db.session.commit()
     return jsonify(task.to_dict())
 
 @app.route("/api/v1/tasks/<int:task_id>", methods=["DELETE"])
+@write_transaction
 def delete_task(task_id):
-    task = Task.query.get(task_id)
+    task = get_user_task(task_id)
     if not task:
         return jsonify({"error": "Task not found"}), 404
     try:
+        was_planned = task.status == 'pending' and task.scheduled_time is not None
+        if task.status == 'completed' and task.completed_at:
+            record_completion(task.user_id, task.completed_at, task.predicted_priority, delta=-1)
         db.session.delete(task)
+        if was_planned:
+            db.session.flush()
+            update_plan(task.user_id, remove=[task], fill=True)
+        db.session.merge(DeletedTask(id=task_id, user_id=task.user_id, deleted_at=utc_now()))
+        DeletedTask.query.filter(DeletedTask.deleted_at < utc_now() - TOMBSTONE_RETENTION).delete()
         db.session.commit()
         print(f"Task {task_id} deleted.")
         return jsonify({"message": "Task deleted successfully"}), 200
@@ -303,269 +809,506 @@ def generate_insight_string(center, count, priority_habit):
 @app.route("/api/v1/insights", methods=["GET"])
 def get_insights():
     try:
-        completed_tasks = Task.query.filter_by(status='completed').all()
+        histograms = load_completion_histograms(g.user_id)
     except Exception as e:
         return jsonify({"error": f"Database error: {e}"}), 500
-    if not completed_tasks or len(completed_tasks) < 3:
+    summary = insights_store_for(g.user_id).summarize(histograms)
+    if summary is None:
         return jsonify({"insight": "Not enough data yet...", "daily_summary": None})
-    data = []
-    for task in completed_tasks:
-        if task.completed_at:
-            completed_time = task.completed_at.astimezone(timezone.utc)
-            data.append({'day_of_week': completed_time.weekday(), 'hour_of_day': completed_time.hour, 'priority': task.predicted_priority or 'Low'})
-    if len(data) < 3:
-         return jsonify({"insight": "Not enough data yet...", "daily_summary": None})
-    df = pd.DataFrame(data)
-    daily_counts = df['day_of_week'].value_counts().to_dict()
-    day_counts_list = [0] * 7
-    for day, count in daily_counts.items():
-        if 0 <= day <= 6: day_counts_list[day] = int(count)
-    daily_summary_chart = {'labels': ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], 'datasets': [{'data': day_counts_list}]}
-    numeric_cols = ['day_of_week', 'hour_of_day']
-    scaler = StandardScaler()
-    df_scaled = scaler.fit_transform(df[numeric_cols])
-    kmeans = KMeans(n_clusters=2, random_state=42, n_init=10)
-    df['cluster'] = kmeans.fit_predict(df_scaled)
-    centers_scaled = kmeans.cluster_centers_
-    centers_original = scaler.inverse_transform(centers_scaled)
-    main_cluster_id = df['cluster'].mode()[0]
-    main_center = centers_original[main_cluster_id]
-    cluster_df = df[df['cluster'] == main_cluster_id]
-    task_count = len(cluster_df)
-    priority_habit = "tasks"
-    if not cluster_df.empty:
-        priority_habit = cluster_df['priority'].mode().iloc[0]
-    insight_text = generate_insight_string(main_center, task_count, priority_habit)
+    daily_summary_chart = {'labels': ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"], 'datasets': [{'data': summary['day_counts']}]}
+    insight_text = generate_insight_string(summary['main_center'], summary['task_count'], summary['priority_habit'])
     return jsonify({"insight": insight_text, "daily_summary": daily_summary_chart})
 
-# --- Helper function for RL scheduler ---
-def time_to_slot(dt, start_of_week):
-    """Converts a datetime object into a 0-167 hour slot."""
-    if not dt: return None
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    time_diff_hours = (dt - start_of_week).total_seconds() / 3600
-    slot = int(round(time_diff_hours))
-    if 0 <= slot < 168:
-        return slot
-    return None
-
 # --- 5. Smart Schedule Endpoint (UPGRADED) ---
+# The plan is persisted: Task.scheduled_time holds the placements and each
+# user's SchedulePlan row holds the grid and a version. Task writes update
+# the plan incrementally; GET only re-plans when the plan has gone stale.
+_plan_lock = threading.RLock()
+_plan_caches = LRUCache(maxsize=USER_CACHE_SIZE)  # user_id -> {'key', 'allocator'}
+user_profiles = LRUCache(maxsize=USER_CACHE_SIZE)  # user_id -> Profile built from their row
+
+def plan_cache(user_id):
+    cache = _plan_caches.get(user_id)
+    if cache is None:
+        cache = {'key': None, 'allocator': None}
+        _plan_caches.set(user_id, cache)
+    return cache
+
+def profile_for(user_id):
+    """The user's Profile (slot masks built once per row version), else the shared user_profile.json one."""
+    row = db.session.get(UserProfile, user_id)
+    if row is None:
+        return profile_store.current
+    profile = user_profiles.get(user_id)
+    if profile is None or profile.key != (row.version, row.updated_at):
+        profile = Profile(row.to_data(), stamp=row.updated_at, personal=True)
+        user_profiles.set(user_id, profile)
+    return profile
+
+def slot_policy_for(profile):
+    """
+    The published slot policy is one global model: it scores the users of
+    the shared user_profile.json (the default user and everyone without
+    a profile of their own). A personal profile keeps its own slot masks.
+    """
+    return None if profile.personal else models.slot_policy
+
+def new_allocator(plan, profile):
+    """Empty allocator for the plan's grid, scored with the profile's slot masks or the slot policy (slot_policy_for)."""
+    return SlotAllocator(profile.deep_mask, profile.shallow_mask, granularity_min=plan.granularity_min, weeks=plan.weeks,
+                         policy=slot_policy_for(profile))
+
+def plan_cache_key(plan, profile):
+    return (plan.version, plan.week_start, plan.granularity_min, plan.weeks, profile.key)
+
+def current_week_start():
+    """Monday 00:00 UTC of the current week, naive like the DB columns."""
+    today = datetime.now(timezone.utc).replace(tzinfo=None)
+    start_of_week = today - timedelta(days=today.weekday())
+    return start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def plan_end(plan):
+    return plan.week_start + timedelta(weeks=plan.weeks)
+
+def current_plan_cell(plan):
+    """First cell that is still in the future (the one "now" falls in is partly gone)."""
+    now_cell = time_to_cell(datetime.now(timezone.utc), plan.week_start.replace(tzinfo=timezone.utc),
+                            plan.granularity_min, plan.weeks * 7 * 24 * 60 // plan.granularity_min)
+    return 0 if now_cell is None else now_cell + 1
+
+def to_cell(plan, dt):
+    start = plan.week_start.replace(tzinfo=timezone.utc)
+    return time_to_cell(dt, start, plan.granularity_min, plan.weeks * 7 * 24 * 60 // plan.granularity_min)
+
+def to_time(plan, cell):
+    return cell_to_time(cell, plan.week_start, plan.granularity_min)
+
+def plan_requests(plan, rows):
+    """
+    rows: (id, due_date, predicted_time_min, my_day_date).
+    Returns (my_day_requests, requests): My Day tasks are first tried with
+    a deadline at the end of their day, then with their own due date.
+    """
+    my_day, regular = [], []
+    for task_id, due_date, minutes, my_day_date in rows:
+        minutes = minutes or 30
+        req = (task_id, to_cell(plan, due_date), minutes)
+        regular.append(req)
+        if my_day_date:
+            day_end = datetime.combine(my_day_date + timedelta(days=1), datetime.min.time()) - timedelta(microseconds=1)
+            day_end_cell = to_cell(plan, day_end)
+            if day_end_cell is not None:
+                deadline = day_end_cell if req[1] is None else min(day_end_cell, req[1])
+                my_day.append((task_id, deadline, minutes))
+    return my_day, regular
+
+def place_requests(allocator, my_day, regular):
+    placements = allocate_all(allocator, my_day)
+    placements.update(allocate_all(allocator, [r for r in regular if r[0] not in placements]))
+    return placements
+
+def save_placements(plan, placements, unplaced_ids=()):
+    """Writes scheduled_time for many tasks with one executemany."""
+    now = utc_now()
+    rows = [{'id': task_id, 'scheduled_time': to_time(plan, start), 'updated_at': now}
+            for task_id, (start, _) in placements.items()]
+    rows += [{'id': task_id, 'scheduled_time': None, 'updated_at': now} for task_id in unplaced_ids]
+    if rows:
+        db.session.execute(update(Task), rows)
+
+def plan_allocator(plan):
+    """
+    Allocator holding every placement of this plan version, cached per
+    process. Any other worker's write bumps the version, so a stale cache
+    is rebuilt from the DB.
+    """
+    profile = profile_for(plan.user_id)
+    key = plan_cache_key(plan, profile)
+    cache = plan_cache(plan.user_id)
+    if cache['key'] != key:
+        allocator = new_allocator(plan, profile)
+        rows = db.session.query(Task.scheduled_time, Task.predicted_time_min).filter(
+            Task.user_id == plan.user_id, Task.status == 'pending',
+            Task.scheduled_time >= plan.week_start, Task.scheduled_time < plan_end(plan))
+        for scheduled_time, minutes in rows:
+            allocator.occupy(to_cell(plan, scheduled_time), allocator.cells_for(minutes or 30))
+        cache['key'], cache['allocator'] = key, allocator
+    allocator = cache['allocator']
+    allocator.policy = slot_policy_for(profile)  # follows a hot-swapped policy without a rebuild
+    allocator.block_until(current_plan_cell(plan))
+    return allocator
+
+def bump_plan(plan):
+    plan.version += 1
+    plan.updated_at = utc_now()
+    plan_cache(plan.user_id)['key'] = plan_cache_key(plan, profile_for(plan.user_id))
+
+def rebuild_plan(user_id, granularity_min=None, weeks=None):
+    """
+    Full re-plan of the user's schedule (first start, new week, grid change):
+    keeps future placements, re-places everything else. Runs in the caller's transaction.
+    """
+    with _plan_lock:
+        plan = db.session.get(SchedulePlan, user_id)
+        if plan is None:
+            plan = SchedulePlan(user_id=user_id, version=0)
+            db.session.add(plan)
+        plan.week_start = current_week_start()
+        plan.granularity_min = granularity_min or plan.granularity_min or DEFAULT_GRANULARITY_MIN
+        plan.weeks = min(weeks or plan.weeks or DEFAULT_WEEKS, MAX_WEEKS)
+        profile = profile_for(user_id)
+        allocator = new_allocator(plan, profile)
+        current_cell = current_plan_cell(plan)
+        allocator.block_until(current_cell)
+
+        rows, scheduled_ids = [], set()
+        pending = db.session.query(Task.id, Task.due_date, Task.predicted_time_min, Task.my_day_date,
+                                   Task.scheduled_time).filter(Task.user_id == user_id, Task.status == 'pending')
+        for task_id, due_date, minutes, my_day_date, scheduled_time in pending:
+            if scheduled_time is not None:
+                cell = to_cell(plan, scheduled_time)
+                if cell is not None and cell >= current_cell - 1:
+                    allocator.occupy(cell, allocator.cells_for(minutes or 30))
+                    continue
+                scheduled_ids.add(task_id)
+            rows.append((task_id, due_date, minutes, my_day_date))
+        placements = place_requests(allocator, *plan_requests(plan, rows))
+        save_placements(plan, placements, scheduled_ids - placements.keys())
+        plan.version = (plan.version or 0) + 1
+        plan.updated_at = utc_now()
+        db.session.flush()
+        cache = plan_cache(user_id)
+        cache['key'], cache['allocator'] = plan_cache_key(plan, profile), allocator
+        print(f"Schedule of {user_id} re-planned (v{plan.version}): {len(placements)} of {len(rows)} tasks placed.")
+        return plan
+
+def missed_tasks_query(plan):
+    """The plan's pending tasks whose planned start has already passed."""
+    return Task.query.filter(Task.user_id == plan.user_id, Task.status == 'pending', Task.scheduled_time >= plan.week_start,
+                             Task.scheduled_time < to_time(plan, current_plan_cell(plan) - 1))
+
+def plan_is_current(plan, granularity_min=None, weeks=None):
+    """False when the plan needs a full re-plan: none yet, a new week, or a different (or over-long) grid."""
+    if plan is None or plan.week_start != current_week_start() or plan.weeks > MAX_WEEKS:
+        return False
+    return not ((granularity_min and granularity_min != plan.granularity_min)
+                or (weeks and weeks != plan.weeks))
+
+def has_missed_tasks(plan):
+    return db.session.query(missed_tasks_query(plan).exists()).scalar()
+
+def fill_plan(plan, allocator):
+    """Places unscheduled tasks (and re-places missed ones) into the free cells."""
+    for task_id, scheduled_time, minutes in missed_tasks_query(plan).with_entities(
+            Task.id, Task.scheduled_time, Task.predicted_time_min):
+        allocator.release(to_cell(plan, scheduled_time), allocator.cells_for(minutes or 30))
+    allocator.block_until(current_plan_cell(plan))
+    rows, scheduled_ids = [], set()
+    for task_id, due_date, minutes, my_day_date, scheduled_time in db.session.query(
+            Task.id, Task.due_date, Task.predicted_time_min, Task.my_day_date, Task.scheduled_time).filter(
+            Task.user_id == plan.user_id, Task.status == 'pending',
+            or_(Task.scheduled_time.is_(None), Task.scheduled_time < to_time(plan, current_plan_cell(plan) - 1))):
+        rows.append((task_id, due_date, minutes, my_day_date))
+        if scheduled_time is not None:
+            scheduled_ids.add(task_id)
+    placements = place_requests(allocator, *plan_requests(plan, rows))
+    save_placements(plan, placements, scheduled_ids - placements.keys())
+    return placements
+
+def apply_plan_changes(plan, add, remove, fill):
+    allocator = plan_allocator(plan)
+    for task in remove:
+        cell = to_cell(plan, task.scheduled_time)
+        if cell is not None:
+            allocator.release(cell, allocator.cells_for(task.predicted_time_min or 30))
+    allocator.block_until(current_plan_cell(plan))
+    if add:
+        rows = [(t.id, t.due_date, t.predicted_time_min, t.my_day_date) for t in add]
+        placements = place_requests(allocator, *plan_requests(plan, rows))
+        for task in add:
+            start = placements.get(task.id)
+            task.scheduled_time = to_time(plan, start[0]) if start else None
+    if fill:
+        fill_plan(plan, allocator)
+    bump_plan(plan)
+
+def update_plan(user_id, add=(), remove=(), fill=False):
+    """
+    Incremental re-plan of the user's schedule inside the caller's
+    transaction: frees the cells of `remove` tasks, places the pending
+    `add` tasks, optionally fills freed space with tasks that did not fit
+    before (always when a planned start was missed), and bumps the plan version.
+    """
+    with _plan_lock:
+        plan = db.session.get(SchedulePlan, user_id)
+        if not plan_is_current(plan):
+            rebuild_plan(user_id)
+            return
+        try:
+            apply_plan_changes(plan, add, remove, fill or has_missed_tasks(plan))
+        except Exception:
+            plan_cache(user_id)['key'] = None  # the cached allocator may be half-updated
+            raise
+
+def invalidate_plan(user_id=None):
+    """Forces every worker to rebuild the user's allocator, or everyone's (e.g. after a profile changed)."""
+    with _plan_lock:
+        if user_id is None:
+            SchedulePlan.query.update({SchedulePlan.version: SchedulePlan.version + 1,
+                                       SchedulePlan.updated_at: utc_now()})
+            _plan_caches.clear()
+            return
+        plan = db.session.get(SchedulePlan, user_id)
+        if plan is not None:
+            bump_plan(plan)
+        plan_cache(user_id)['key'] = None
+
+EXPIRED_WEEK_START = datetime(1970, 1, 5)  # a Monday no plan is current for
+
+def expire_plans():
+    """Marks every user's plan stale (after bulk loads): each is fully re-planned on its next use."""
+    with _plan_lock:
+        SchedulePlan.query.update({SchedulePlan.week_start: EXPIRED_WEEK_START,
+                                   SchedulePlan.version: SchedulePlan.version + 1,
+                                   SchedulePlan.updated_at: utc_now()})
+        _plan_caches.clear()
+
 @app.route("/api/v1/smart-schedule", methods=["GET"])
 def get_smart_schedule():
-    # --- 1. Load the User's Productivity Profile ---
-    profile_path = os.path.join(base_dir, 'user_profile.json')
-    productive_slots_deep = [] 
-    productive_slots_shallow = []
-    
-    if os.path.exists(profile_path):
+    """
+    Serves the persisted plan. Steady-state calls are read-only; the plan
+    is only rewritten when it is stale (new week, different grid, or a
+    planned task's start passed without it being completed).
+    ?granularity= / ?weeks= (at most SMT_SCHEDULE_MAX_WEEKS) become the
+    plan's grid, so a different grid is one re-plan, not one per call.
+    The ETag / X-Schedule-Version header is the plan version, so clients
+    can send If-None-Match and get 304 while nothing changed.
+    """
+    try:
+        granularity_min = int(request.args['granularity']) if 'granularity' in request.args else None
+        weeks = int(request.args['weeks']) if 'weeks' in request.args else None
+        if granularity_min is not None and granularity_min not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+        if weeks is not None and not 1 <= weeks <= MAX_WEEKS:
+            raise ValueError(f"weeks must be from 1 to {MAX_WEEKS}")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid calendar settings: {e}"}), 400
+
+    plan = db.session.get(SchedulePlan, g.user_id)
+    stale = not plan_is_current(plan, granularity_min, weeks)
+    if stale or has_missed_tasks(plan):
         try:
-            with open(profile_path, 'r') as f:
-                profile_data = json.load(f)
-                # Load both deep and shallow work slots
-                productive_slots_deep = profile_data.get('deep_work_slots', [])
-                productive_slots_shallow = profile_data.get('shallow_work_slots', [])
+            begin_write()
+            if stale:
+                rebuild_plan(g.user_id, granularity_min, weeks)
+            else:
+                update_plan(g.user_id, fill=True)
+            db.session.commit()
+            plan = db.session.get(SchedulePlan, g.user_id)
         except Exception as e:
-            print(f"Error loading user profile: {e}")
-            
-    # --- 2. Setup Calendar & Get Tasks ---
-    today = datetime.now(timezone.utc)
-    start_of_week = today - timedelta(days=today.weekday())
-    start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    current_slot = time_to_slot(today, start_of_week)
-    if current_slot is None: current_slot = 0 
+            db.session.rollback()
+            print(f"Error saving schedule: {e}")
+            return jsonify({"error": "Failed to save schedule"}), 500
 
-    pending_tasks = Task.query.filter_by(status='pending').all()
-    if not pending_tasks:
-        return jsonify([])
-    
-    current_calendar_state = np.zeros(168, dtype=np.int32)
-    already_scheduled_list = []
-    tasks_to_schedule = []
-
-    for slot in range(current_slot):
-        current_calendar_state[slot] = 1
-
-    for task in pending_tasks:
-        if task.scheduled_time:
-            slot = time_to_slot(task.scheduled_time, start_of_week)
-            if slot is not None and slot >= current_slot:
-                current_calendar_state[slot] = 1
-                already_scheduled_list.append(task)
-            else:
-                tasks_to_schedule.append(task)
-        else:
-            tasks_to_schedule.append(task)
-    
-    # --- 3. Loop and Schedule NEW tasks ---
-    newly_scheduled_list = []
-    for task in tasks_to_schedule:
-        
-        deadline_slot = time_to_slot(task.due_date, start_of_week)
-        if deadline_slot is None:
-            deadline_slot = 167 
-        
-        all_empty_slots = np.where(current_calendar_state == 0)[0]
-        valid_empty_slots = [s for s in all_empty_slots if s <= deadline_slot]
-        
-        if not valid_empty_slots:
-            continue 
+    etag = f'schedule-{plan.version}'
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        scheduled = Task.query.filter(
+            Task.user_id == g.user_id, Task.status == 'pending',
+            Task.scheduled_time >= plan.week_start, Task.scheduled_time < plan_end(plan)
+        ).order_by(Task.scheduled_time, Task.id).all()
+        response = jsonify([task.to_dict() for task in scheduled])
+    response.set_etag(etag)
+    response.headers['X-Schedule-Version'] = str(plan.version)
+    return response
 
-        # --- 3c. NEW: Find BEST slots based on work type ---
-        task_time = task.predicted_time_min or 30
-        
-        if task_time > 45: # Deep Work
-            productive_slots = productive_slots_deep
-        else: # Shallow Work
-            productive_slots = productive_slots_shallow
-            
-        smart_slots = [s for s in productive_slots if s in valid_empty_slots]
-        
-        chosen_slot = None
-        if smart_slots:
-            chosen_slot = np.random.choice(smart_slots)
-        else:
-            # Fallback: No smart slots, pick a "reasonable" slot
-            reasonable_slots = [s for s in valid_empty_slots if 11 <= (s % 24) <= 17] # 11am-5pm UTC
-            if reasonable_slots:
-                chosen_slot = np.random.choice(reasonable_slots)
-            elif valid_empty_slots:
-                chosen_slot = np.random.choice(valid_empty_slots)
-        
-        if chosen_slot is None:
-            continue
 
-        current_calendar_state[int(chosen_slot)] = 1
-        scheduled_time = start_of_week + timedelta(hours=int(chosen_slot))
-        task.scheduled_time = scheduled_time
-        newly_scheduled_list.append(task)
-    
-    try:
+# --- 6. Model Retraining (background jobs, UPGRADED) ---
+MIN_RETRAIN_TASKS = 5 # Lowered requirement to 5
+
+def completed_with_feedback(user_id=None):
+    """Completed tasks with reported times, of one user or (None) of everyone."""
+    query = Task.query.filter(Task.status == 'completed', Task.actual_time_taken_min.isnot(None))
+    return query if user_id is None else query.filter(Task.user_id == user_id)
+
+def retrain_scope(user_id):
+    """
+    The default user's retrain refits the shared global models (and
+    user_profile.json) on everyone's data, as in single-user installs;
+    any other user gets personal models trained on their own tasks.
+    """
+    return None if user_id == DEFAULT_USER_ID else user_id
+
+def run_retrain_job(job_id):
+    """Worker-pool entry point: trains, publishes new model versions and records the outcome."""
+    with app.app_context():
+        begin_write()
+        job = db.session.get(RetrainJob, job_id)
+        job.status = JOB_RUNNING
+        job.started_at = utc_now()
         db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error saving schedule: {e}")
-        return jsonify({"error": "Failed to save schedule"}), 500
-    
-    all_scheduled_tasks = already_scheduled_list + newly_scheduled_list
-    return jsonify([task.to_dict() for task in all_scheduled_tasks])
+        print(f"Retraining job {job_id} started...")
+        try:
+            job.model_version, job.message, timings = retrain_models_now(
+                retrain_scope(job.user_id or DEFAULT_USER_ID))
+            job.timings = json.dumps(timings)
+            job.status = JOB_SUCCEEDED
+        except Exception as e:
+            db.session.rollback()
+            print(f"Retraining job {job_id} failed: {e}")
+            g.db_write = True
+            job = db.session.get(RetrainJob, job_id)
+            job.status = JOB_FAILED
+            job.error = str(e)
+        job.finished_at = utc_now()
+        db.session.commit()
+
+def retrain_models_now(user_id=None):
+    """
+    Runs the unified training pipeline (time model, priority model,
+    productivity profile) and publishes the result: globally when
+    user_id is None, otherwise as that user's personal models.
+    Returns (model version, message, {stage: seconds}).
+    """
+    timer = StageTimer()
+    with timer.stage('load'):
+        g.db_write = False  # a plain read; publishing takes the write lock again
+        rows = completed_with_feedback(user_id).with_entities(
+            Task.task_name, Task.actual_time_taken_min, Task.due_date, Task.created_at, Task.completed_at).all()
+        # Training then runs outside any transaction, so it never holds up other readers or writers
+        db.session.commit()
+    if len(rows) < MIN_RETRAIN_TASKS:
+        raise ValueError(f"Not enough data. You need at least {MIN_RETRAIN_TASKS} completed tasks. You have {len(rows)}.")
+    print(f"Retraining {'all models' if user_id is None else f'the models of {user_id}'} with {len(rows)} data points.")
+    result = train_all(rows, timer=timer)
+
+    with timer.stage('publish'):
+        begin_write()
+        if user_id is None:
+            version = publish_global_models(result)
+        else:
+            version, artifacts = publish_user_models(user_id, result)
+        db.session.commit()
+        if user_id is not None:
+            user_models.set(user_id, version, result, artifacts)
+    print(f"Model version {version} published. Deep slots: {result['profile']['deep_work_slots']}, "
+          f"Shallow slots: {result['profile']['shallow_work_slots']}")
+    return version, f"All models retrained successfully on {result['n_samples']} tasks! I'm smarter now.", timer.timings
+
+def publish_global_models(result):
+    # New versioned files, written to temp names and renamed into place
+    artifacts = {name: models.store.save(name, result[name]) for name in ('time_model', 'priority_model')}
+    # Profile is written atomically too (readers never see half a file) and swapped in memory
+    profile_store.save(result['profile'])
+    # Flipping the pointer makes every worker hot-swap on its next request
+    version = models.store.publish(artifacts)
+    for name, artifact in artifacts.items():
+        models.set(name, result[name], artifact=artifact)
+    invalidate_plan()  # allocators score placements with the profile
+    return version
 
+def publish_user_models(user_id, result):
+    """Writes the user's artifacts, then points their UserModel / UserProfile rows at them (caller commits)."""
+    artifacts = user_models.save(user_id, result)
+    pointer = db.session.get(UserModel, user_id)
+    if pointer is None:
+        pointer = UserModel(user_id=user_id, version=0)
+        db.session.add(pointer)
+    pointer.version += 1
+    pointer.time_model = artifacts['time_model']
+    pointer.priority_model = artifacts['priority_model']
+    pointer.n_samples = result['n_samples']
+    profile = db.session.get(UserProfile, user_id)
+    if profile is None:
+        profile = UserProfile(user_id=user_id, version=0)
+        db.session.add(profile)
+    profile.version += 1
+    profile.last_trained = result['profile']['last_trained']
+    profile.deep_work_slots = json.dumps(result['profile']['deep_work_slots'])
+    profile.shallow_work_slots = json.dumps(result['profile']['shallow_work_slots'])
+    db.session.flush()
+    invalidate_plan(user_id)
+    return pointer.version, artifacts
+
+retrain_queue = RetrainQueue(run_retrain_job)
 
-# --- 6. Model Retraining Endpoint (UPGRADED) ---
 @app.route("/api/v1/retrain", methods=["POST"])
 def retrain_models():
-    global time_model # We need this to reload the model into memory
-    
-    print("Retraining process started...")
-    
+    """Queues a retrain of the requesting user's models and returns 202 with the job to poll."""
     try:
-        tasks = Task.query.filter(
-            Task.status == 'completed',
-            Task.actual_time_taken_min.isnot(None)
-        ).all()
+        n_tasks = completed_with_feedback(retrain_scope(g.user_id)).count()
     except Exception as e:
         print(f"DB Error: {e}")
         return jsonify({"error": "Could not access database."}), 500
 
-    if not tasks or len(tasks) < 5: # Lowered requirement to 5
-        print(f"Not enough data. Found {len(tasks)}, need 5.")
+    if n_tasks < MIN_RETRAIN_TASKS:
+        print(f"Not enough data. Found {n_tasks}, need {MIN_RETRAIN_TASKS}.")
         return jsonify({
-            "message": f"Not enough data. You need at least 5 completed tasks. You have {len(tasks)}."
+            "message": f"Not enough data. You need at least {MIN_RETRAIN_TASKS} completed tasks. You have {n_tasks}."
         }), 400
 
-    # === PART A: RETRAIN TIME PREDICTION MODEL ===
-    data_time = []
-    for t in tasks:
-        data_time.append({
-            'task_name': t.task_name,
-            'actual_time_min': t.actual_time_taken_min
-        })
-    df_time = pd.DataFrame(data_time)
-    print(f"Retraining time model with {len(df_time)} data points.")
-
-    model_pipeline = Pipeline([
-        ('tfidf', TfidfVectorizer(stop_words='english')),
-        ('regressor', RandomForestRegressor(n_estimators=10, random_state=42))
-    ])
-    model_pipeline.fit(df_time['task_name'], df_time['actual_time_min'])
-    joblib.dump(model_pipeline, time_model_path)
-    time_model = model_pipeline 
-    print("Time model retrained and reloaded.")
-    
-    # === PART B: RETRAIN "SMART SCHEDULER" (Clustering) ===
-    print("Retraining productivity profile...")
-    
-    # Helper function to find top slots for a dataframe
-    def get_top_slots(df, k=1):
-        if df.empty or len(df) < k:
-            return []
-            
-        numeric_cols = ['day_of_week', 'hour_of_day']
-        scaler = StandardScaler()
-        df_scaled = scaler.fit_transform(df[numeric_cols])
-        
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(df_scaled)
-        centers_original = scaler.inverse_transform(kmeans.cluster_centers_)
-        
-        top_slots = []
-        for center in centers_original:
-            day_of_week = int(round(center[0]))
-            hour_of_day = int(round(center[1]))
-            for i in range(-1, 2): # 3-hour window
-                slot_hour = (hour_of_day + i) % 24
-                slot = (day_of_week * 24) + slot_hour
-                if slot not in top_slots:
-                    top_slots.append(slot)
-        return top_slots
-
-    # 1. Prepare data, separating by work type
-    data_deep = []
-    data_shallow = []
-    for t in tasks:
-        if t.completed_at and t.actual_time_taken_min:
-            completed_time = t.completed_at.astimezone(timezone.utc)
-            record = {'day_of_week': completed_time.weekday(), 'hour_of_day': completed_time.hour}
-            
-            if t.actual_time_taken_min > 45:
-                data_deep.append(record)
-            else:
-                data_shallow.append(record)
-    
-    df_deep = pd.DataFrame(data_deep)
-    df_shallow = pd.DataFrame(data_shallow)
-    
-    # 2. Get top slots for each
-    top_slots_deep = get_top_slots(df_deep, k=2) # Find 2 deep work habits
-    top_slots_shallow = get_top_slots(df_shallow, k=1) # Find 1 shallow work habit
-                
-    # 3. Save this profile to a file
-    profile_data = {
-        'last_trained': datetime.now().isoformat(),
-        'deep_work_slots': top_slots_deep,
-        'shallow_work_slots': top_slots_shallow
-    }
-    profile_path = os.path.join(base_dir, 'user_profile.json')
-    try:
-        with open(profile_path, 'w') as f:
-            json.dump(profile_data, f)
-        print(f"Productivity profile saved. Deep slots: {top_slots_deep}, Shallow slots: {top_slots_shallow}")
-    except Exception as e:
-        print(f"Error saving user profile: {e}")
-        return jsonify({"error": "Time model retrained, but failed to save productivity profile."}), 500
+    # One retrain per user at a time: a request while one is pending joins it
+    begin_write()
+    job = RetrainJob.query.filter(
+        RetrainJob.user_id == g.user_id,
+        RetrainJob.status.in_(ACTIVE_STATES), RetrainJob.created_at >= utc_now() - JOB_TIMEOUT
+    ).order_by(RetrainJob.created_at.desc()).first()
+    if job is None:
+        job = RetrainJob(id=new_job_id(), user_id=g.user_id, status=JOB_QUEUED)
+        db.session.add(job)
+        db.session.commit()
+        retrain_queue.submit(job.id)
+        message = "Retraining started. I'll be smarter in a moment."
+    else:
+        message = "Retraining is already in progress."
+    response = jsonify({**job.to_dict(), "message": message})
+    response.status_code = 202
+    response.headers['Location'] = f"/api/v1/retrain/{job.id}"
+    return response
 
-    return jsonify({
-        "message": f"All models retrained successfully on {len(df_time)} tasks! I'm smarter now."
-    })
+@app.route("/api/v1/retrain/<job_id>", methods=["GET"])
+def get_retrain_job(job_id):
+    job = db.session.get(RetrainJob, job_id)
+    if not job or (job.user_id or DEFAULT_USER_ID) != g.user_id:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
 
 
 
 # --- 7. Run the App ---
-if __name__ == "__main__":
+# Models a serving process needs on its first request: loading them in
+# the gunicorn master (preload_app) lets forked workers share them copy-on-write.
+# The predictors pull in the joblib pipelines only when they cannot be memory-mapped.
+PRELOAD_MODELS = ('nlp', 'time_predictor', 'priority_predictor', 'slot_policy')
+
+def preload_enabled():
+    return os.environ.get('SMT_PRELOAD', '1').lower() in ('1', 'true', 'yes')
+
+def create_app(preload=None):
+    """
+    Production entry point (see wsgi.py / gunicorn.conf.py). Migrates the
+    database and, unless SMT_PRELOAD=0, loads spaCy, the model predictors,
+    the slot policy and the profile up front so no request pays for them.
+    """
+    if preload is None:
+        preload = preload_enabled()
     with app.app_context():
-        db.create_all()
-        rl_agent, tf_env = create_agent()
-        
+        init_db()
+        # Connections opened by the migration must not be inherited by forked workers
+        db.engine.dispose()
+    if preload:
+        # With a parse pool spaCy lives in the pool's processes, not in the server
+        models.preload([name for name in PRELOAD_MODELS if not (name == 'nlp' and PARSE_WORKERS > 0)])
+        profile_store.current
+        # smart-schedule serves the NumPy slot policy; the TF-Agents agent is only built on request
+        if rl_enabled():
+            models.rl_agent
+    return app
+
+if __name__ == "__main__":
+    # Flask's development server; use gunicorn (wsgi:app) in production.
+    # The reloader imports the app twice, so it is off whenever TF is loaded.
+    create_app(preload=rl_enabled())
     print("--- Server is ready, starting... ---")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, use_reloader=not rl_enabled(), host='0.0.0.0', port=5000)
@@ -0,0 +1,195 @@
+"""
+Model Artifact Report for Smart Task Manager
+
+Compares the two ways a worker can hold the time and priority models:
+1. joblib - unpickle time_predictor.joblib / priority_model.joblib and
+            compile the predictors (private memory in every worker)
+2. mapped - model_artifact.load_mapped() on the .npmodel directories
+            (read-only memory maps, shared through the page cache)
+
+It reports the size on disk of each artifact (joblib, .npmodel with
+float64 thresholds, .npmodel with float32 thresholds), checks that the
+mapped predictors give exactly the pipelines' predictions, then starts
+--workers processes per mode that load the models and predict, and
+reads each one's RSS, PSS (shared pages split between the processes
+mapping them) and private memory from /proc/<pid>/smaps_rollup while
+all of them are alive. Memory is reported as growth over the worker's
+footprint before loading the models.
+
+By default it uses the live models (the shipped ones, or the latest
+retrain); --rows N instead fits both models on N synthetic completed
+tasks, which grows the forests the way a large history does.
+
+Usage (from SMT_server/):
+    python benchmarks/artifact_report.py --workers 4
+    python benchmarks/artifact_report.py --rows 20000 --workers 4
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+from model_artifact import artifact_size, export_pipeline, load_mapped, mapped_path  # noqa: E402
+
+MODEL_NAMES = ('time_model', 'priority_model')
+MODES = ('joblib', 'mapped')
+
+
+# --- 1. Models ---
+def live_pipelines():
+    """{name: joblib path} of the models a server would load right now."""
+    from model_store import ModelStore
+    store = ModelStore(os.path.join(os.environ.get('SMT_STATE_DIR', SERVER_DIR), 'ml_models'))
+    shipped = {'time_model': 'time_predictor.joblib', 'priority_model': 'priority_model.joblib'}
+    return {name: store.resolve(name, os.path.join(SERVER_DIR, 'ml_models', shipped[name]))[1]
+            for name in MODEL_NAMES}
+
+
+def synthetic_rows(n, seed, vocabulary=2000):
+    """n completed tasks with varied names, durations and deadlines (rows for train_all)."""
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(vocabulary)]
+    now = datetime.now()
+    rows = []
+    for _ in range(n):
+        name = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        created = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+        minutes = rng.randint(5, 240)
+        due = created + timedelta(hours=rng.uniform(0.5, 300)) if rng.random() < 0.8 else None
+        rows.append((name, minutes, due, created, created + timedelta(minutes=minutes)))
+    return rows
+
+
+def fitted_pipelines(rows, directory):
+    import joblib
+    from training_pipeline import train_all
+    result = train_all(rows)
+    paths = {}
+    for name in MODEL_NAMES:
+        paths[name] = os.path.join(directory, f'{name}.joblib')
+        joblib.dump(result[name], paths[name])
+    return paths
+
+
+# --- 2. Workers ---
+def memory_kb(pid):
+    """{'rss', 'pss', 'private'} in KB from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {'rss': fields['Rss'], 'pss': fields['Pss'],
+            'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)}
+
+
+def worker(mode, paths, names, ready, done):
+    sys.path.insert(0, SERVER_DIR)
+    import joblib  # noqa: F401 - imported before the baseline in both modes
+    import sklearn.ensemble  # noqa: F401
+    import fast_predictor
+    baseline = memory_kb(os.getpid())
+    if mode == 'joblib':
+        time_predictor = fast_predictor.compile_time_model(joblib.load(paths['time_model']))
+        priority_predictor = fast_predictor.compile_priority_model(joblib.load(paths['priority_model']))
+    else:
+        time_predictor = load_mapped(mapped_path(paths['time_model']))
+        priority_predictor = load_mapped(mapped_path(paths['priority_model']))
+    # Touch every page a server would: predictions over a spread of inputs
+    minutes = time_predictor.predict(names)
+    priority_predictor.predict(names, np.linspace(0, 400, len(names)), minutes)
+    ready.put((os.getpid(), baseline))
+    done.wait()
+
+
+def measure_mode(mode, paths, names, workers):
+    ctx = multiprocessing.get_context('spawn')
+    ready, done = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=worker, args=(mode, paths, names, ready, done)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    try:
+        baselines = [ready.get(timeout=600) for _ in procs]
+        # Every worker is alive and loaded, so PSS splits the shared pages between all of them
+        growth = []
+        for pid, baseline in baselines:
+            now = memory_kb(pid)
+            growth.append({key: now[key] - baseline[key] for key in now})
+    finally:
+        done.set()
+        for p in procs:
+            p.join()
+    return {key: float(np.mean([g[key] for g in growth])) / 1024 for key in growth[0]}
+
+
+# --- 3. Report ---
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--workers', type=int, default=4, help='worker processes per mode')
+    parser.add_argument('--rows', type=int, default=0, help='fit on this many synthetic tasks (0: live models)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    import joblib
+    from fast_predictor import compile_priority_model
+    from feature_schema import model_columns, priority_frame
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.rows:
+            print(f"Fitting both models on {args.rows} synthetic tasks...")
+            sources = fitted_pipelines(synthetic_rows(args.rows, args.seed), directory)
+        else:
+            sources = live_pipelines()
+        paths, results = {}, {'sizes_kb': {}}
+        for name, source in sources.items():
+            pipeline = joblib.load(source)
+            paths[name] = os.path.join(directory, os.path.basename(source))
+            if paths[name] != source:
+                joblib.dump(pipeline, paths[name])
+            f64 = export_pipeline(pipeline, os.path.join(directory, f'{name}-f64.npmodel'), float32_thresholds=False)
+            f32 = export_pipeline(pipeline, mapped_path(paths[name]), float32_thresholds=True)
+            if f32 is None:
+                raise SystemExit(f"{name} has no compiled form, nothing to map")
+            sizes = results['sizes_kb'][name] = {
+                'joblib': artifact_size(paths[name]) / 1024,
+                'mapped_f64': artifact_size(f64) / 1024,
+                'mapped_f32': artifact_size(f32) / 1024,
+            }
+            print(f"{name:>14}: joblib {sizes['joblib']:9.0f} KB, mapped float64 {sizes['mapped_f64']:9.0f} KB, "
+                  f"mapped float32 {sizes['mapped_f32']:9.0f} KB")
+
+        # Same predictions from the mapped (float32-threshold) predictors as from the pipelines
+        time_pipeline, priority_pipeline = (joblib.load(paths[name]) for name in MODEL_NAMES)
+        compiled = compile_priority_model(priority_pipeline)
+        rng = random.Random(args.seed)
+        words = list(compiled.tfidf.vocabulary) + ['unknownword']
+        names = [' '.join(rng.choice(words) for _ in range(rng.randint(1, 5))) for _ in range(2000)]
+        hours = [rng.uniform(0, 400) for _ in names]
+        estimates = [rng.choice(range(5, 245, 5)) for _ in names]
+        mapped_time = load_mapped(mapped_path(paths['time_model']))
+        mapped_priority = load_mapped(mapped_path(paths['priority_model']))
+        assert np.array_equal(mapped_time.predict(names), time_pipeline.predict(names)), "time predictions differ"
+        expected = priority_pipeline.predict(priority_frame(names, hours, estimates, model_columns(priority_pipeline)))
+        assert np.array_equal(mapped_priority.predict(names, hours, estimates), expected), "priority predictions differ"
+        print(f"Parity OK on {len(names)} rows (mapped float32 vs sklearn pipelines).")
+
+        for mode in MODES:
+            m = results[mode] = measure_mode(mode, paths, names, args.workers)
+            print(f"{mode:>6} x{args.workers}: per worker +{m['rss']:7.1f} MB RSS, +{m['pss']:7.1f} MB PSS, "
+                  f"+{m['private']:7.1f} MB private")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Slot Clustering Benchmark for Smart Task Manager
+
+Compares the two ways of finding productive (day, hour) habits:
+1. per-task  - one DataFrame row per completed task, StandardScaler +
+               KMeans(n_init=10) over all rows (the old path)
+2. histogram - 168-bin histogram + weighted KMeans (slot_clustering.py)
+
+For each history size it reports both timings and whether the
+resulting top slots agree.
+
+Usage (from SMT_server/):
+    python benchmarks/clustering_benchmark.py --sizes 1000 100000 1000000
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from slot_clustering import slot_histogram, top_slots  # noqa: E402
+
+
+def synthetic_completions(n, rng):
+    """Two habits (weekday evenings, Saturday afternoons) plus uniform noise."""
+    habit = rng.choice(3, size=n, p=[0.5, 0.3, 0.2])
+    days = np.where(habit == 0, rng.integers(0, 5, n), np.where(habit == 1, 5, rng.integers(0, 7, n)))
+    hours = np.where(habit == 0, rng.normal(20, 1.5, n), np.where(habit == 1, rng.normal(15, 2, n), rng.integers(0, 24, n)))
+    return days, np.clip(np.round(hours), 0, 23).astype(int)
+
+
+def per_task_top_slots(days, hours, k):
+    df = pd.DataFrame({'day_of_week': days, 'hour_of_day': hours})
+    scaler = StandardScaler()
+    scaled = scaler.fit_transform(df[['day_of_week', 'hour_of_day']])
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10).fit(scaled)
+    slots = []
+    for center in scaler.inverse_transform(kmeans.cluster_centers_):
+        day_of_week, hour_of_day = int(round(center[0])), int(round(center[1]))
+        for i in range(-1, 2):
+            slot = day_of_week * 24 + (hour_of_day + i) % 24
+            if slot not in slots:
+                slots.append(slot)
+    return slots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--k', type=int, default=2, help='number of habits (clusters)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'tasks':>10} {'per-task (s)':>13} {'histogram (s)':>14} {'speedup':>8}  same slots")
+    results = []
+    for n in args.sizes:
+        days, hours = synthetic_completions(n, rng)
+
+        start = time.perf_counter()
+        old_slots = per_task_top_slots(days, hours, args.k)
+        old_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_slots = top_slots(slot_histogram(days, hours), args.k)
+        new_seconds = time.perf_counter() - start
+
+        same = sorted(old_slots) == sorted(new_slots)
+        results.append({'tasks': n, 'per_task_s': old_seconds, 'histogram_s': new_seconds, 'same_slots': same})
+        print(f"{n:>10} {old_seconds:>13.3f} {new_seconds:>14.4f} {old_seconds / new_seconds:>7.0f}x  {same}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
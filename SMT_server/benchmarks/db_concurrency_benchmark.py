@@ -0,0 +1,144 @@
+"""
+Database Concurrency Benchmark for Smart Task Manager
+
+Runs the write endpoints from several worker processes at once, like
+gunicorn workers sharing tasks.db, once per database setup:
+1. default - SMT_DB_TUNING=0: rollback journal, pysqlite's DEFERRED
+             transactions, no pool sizing (the old configuration)
+2. tuned   - db_config.py: WAL, synchronous=NORMAL, busy_timeout,
+             mmap_size, pooled connections and BEGIN IMMEDIATE writers
+
+Every worker loops over create task -> add to My Day -> complete ->
+GET smart-schedule (each one a write) for --duration seconds against
+its own copy of tasks.db per mode. Reports requests/sec, p50 / p99
+latency and how many requests failed (HTTP 5xx or "database is locked").
+
+Usage (from SMT_server/):
+    python benchmarks/db_concurrency_benchmark.py --workers 4 --duration 10
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every worker acts as its own user
+MODES = {
+    'default': {'SMT_DB_TUNING': '0', 'SMT_TRUST_USER_HEADER': '1'},
+    'tuned': {'SMT_DB_TUNING': '1', 'SMT_TRUST_USER_HEADER': '1'},
+}
+
+
+def worker(worker_id, duration, ready, go, results):
+    sys.path.insert(0, SERVER_DIR)
+    sys.stdout = sys.stderr = open(os.devnull, 'w')  # endpoints log every request and error
+    from app import app  # imported here, after the parent set DATABASE_URL
+
+    client = app.test_client()
+    headers = {'X-User-Id': f'bench{worker_id}'}
+    latencies, failures = [], 0
+
+    def call(method, url, **kwargs):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            response = client.open(url, method=method, headers=headers, **kwargs)
+            ok = response.status_code < 500
+        except Exception:  # noqa: BLE001 - unhandled OperationalError in a view
+            response, ok = None, False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            failures += 1
+        return response
+
+    ready.put(worker_id)
+    go.wait()  # every worker has imported the app
+    stop_at = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < stop_at:
+        i += 1
+        created = call('POST', '/api/v1/tasks', json={'task_name': f'bench task {worker_id}-{i}'})
+        if created is not None and created.status_code == 201:
+            task_id = created.get_json()['id']
+            call('POST', f'/api/v1/tasks/{task_id}/myday')
+            call('PUT', f'/api/v1/tasks/{task_id}/complete', json={'actual_time_min': 30})
+        call('GET', '/api/v1/smart-schedule')
+    results.put((latencies, failures))
+
+
+def prepare_db(source, directory, mode):
+    path = os.path.join(directory, f'{mode}.db')
+    shutil.copyfile(source, path)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=DELETE')  # the copy may come from a WAL database
+    conn.close()
+    # Run the migrations once, before the workers race for them
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + path, **MODES[mode])
+    code = "from app import app, init_db\nwith app.app_context(): init_db()"
+    subprocess.run([sys.executable, '-c', code], cwd=SERVER_DIR, env=env, check=True, capture_output=True)
+    return path
+
+
+def run_mode(mode, path, args):
+    ctx = multiprocessing.get_context('spawn')
+    saved = dict(os.environ)
+    # Spawned children read their configuration from the environment at import
+    os.environ.update(DATABASE_URL='sqlite:///' + path, **MODES[mode])
+    try:
+        ready, go, results = ctx.Queue(), ctx.Event(), ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(w, args.duration, ready, go, results))
+                 for w in range(args.workers)]
+        for p in procs:
+            p.start()
+        for _ in procs:
+            ready.get()
+        go.set()
+        collected = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+    latencies = np.array([x for lat, _ in collected for x in lat]) * 1000
+    failures = sum(f for _, f in collected)
+    return {
+        'requests': int(latencies.size),
+        'failed': failures,
+        'rps': latencies.size / args.duration,
+        'p50_ms': float(np.percentile(latencies, 50)) if latencies.size else 0.0,
+        'p99_ms': float(np.percentile(latencies, 99)) if latencies.size else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--workers', type=int, default=4, help='concurrent worker processes')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per mode')
+    parser.add_argument('--db', default=os.path.join(SERVER_DIR, 'tasks.db'), help='database to copy')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in MODES:
+            path = prepare_db(args.db, directory, mode)
+            r = results[mode] = run_mode(mode, path, args)
+            print(f"{mode:>7}: {r['rps']:7.1f} req/s, p50 {r['p50_ms']:7.2f} ms, "
+                  f"p99 {r['p99_ms']:8.2f} ms, {r['requests']} ok / {r['failed']} failed")
+    return results
+
+
+if __name__ == "__main__":
+    main()
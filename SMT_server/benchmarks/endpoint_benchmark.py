@@ -0,0 +1,337 @@
+"""
+Endpoint Benchmark Suite for Smart Task Manager
+
+Reproducible end-to-end numbers for every main endpoint, at several
+database sizes, written to a JSON baseline that can be diffed between
+commits:
+1. Seeding - for each --scales entry (1k, 100k, 1M tasks, ...) a fresh
+             SQLite database is generated once with generate_data.py
+             (fixed --seed) and cached in --data-dir; every run works on
+             a throwaway copy of it
+2. Drivers - client: the Flask test client in a child process (no
+             network, no server); http: real HTTP against gunicorn
+             (--workers, keep-alive connection)
+3. Endpoints - POST /api/v1/parse-task, GET /api/v1/tasks,
+             GET /api/v1/insights, GET /api/v1/smart-schedule and
+             POST /api/v1/retrain (timed until the job finishes,
+             --retrains jobs)
+
+For each scale / driver / endpoint it records requests/sec, p50 / p99
+latency and errors, plus the peak RSS of the serving process (for http
+the largest of the gunicorn master and its workers). Retrained models
+and the profile go to a temporary SMT_STATE_DIR, so the repo's
+ml_models/ and user_profile.json are never touched.
+
+Usage (from SMT_server/):
+    python benchmarks/endpoint_benchmark.py --scales 1k,100k --out baseline.json
+    python benchmarks/endpoint_benchmark.py --scales 1k,100k --compare baseline.json
+    python benchmarks/endpoint_benchmark.py --diff old.json new.json
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+from load_test import TEXTS, free_port, wait_ready  # noqa: E402  (benchmarks/ is on sys.path)
+
+ENDPOINTS = ('parse-task', 'tasks', 'insights', 'smart-schedule', 'retrain')
+DRIVERS = ('client', 'http')
+HISTORY_DAYS = 365
+FINISHED = ('succeeded', 'failed')
+
+# Runs in a brand-new interpreter (so its peak RSS is the server's) and prints one JSON line
+CHILD = """
+import io, json, sys
+from contextlib import redirect_stdout
+sys.path.insert(0, 'benchmarks')
+from endpoint_benchmark import measure
+with redirect_stdout(io.StringIO()):  # the endpoints log every request
+    from app import create_app
+    client = create_app().test_client()
+
+    def call(method, path, body):
+        response = client.open(path, method=method, data=body, content_type='application/json')
+        return response.status_code, response.get_data()
+    results = measure(call, {endpoints!r}, {requests}, {warmup}, {retrains})
+print(json.dumps(results))
+"""
+
+
+# --- 1. Seeding ---
+def parse_scale(label):
+    """'1k' -> 1000, '100k' -> 100000, '1M' -> 1000000."""
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(label[-1].lower(), 1)
+    return int(float(label.rstrip('kKmM')) * multiplier)
+
+
+def seed_plan(n_tasks):
+    """(days, users) for generate_data.py to produce roughly n_tasks completed tasks."""
+    from generate_data import profile_weekday_probability
+    per_user_day = profile_weekday_probability().sum(axis=0).mean()
+    days = min(HISTORY_DAYS, max(1, math.ceil(n_tasks / per_user_day)))
+    users = max(1, round(n_tasks / (per_user_day * days)))
+    return days, users
+
+
+def seed_db(label, data_dir, seed, reseed=False):
+    """Path of the cached database for a scale, generating it first if needed."""
+    path = os.path.join(data_dir, f'tasks-{label}-seed{seed}.db')
+    if os.path.exists(path) and not reseed:
+        return path
+    days, users = seed_plan(parse_scale(label))
+    print(f"Seeding {label}: {days} days x {users} user(s) -> {path}")
+    partial = path + '.partial'
+    for stale in (partial, partial + '-wal', partial + '-shm'):
+        if os.path.exists(stale):
+            os.remove(stale)
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + partial)
+    subprocess.run([sys.executable, 'generate_data.py', '--days', str(days), '--users', str(users),
+                    '--seed', str(seed)], cwd=SERVER_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    conn = sqlite3.connect(partial)
+    conn.execute('PRAGMA journal_mode=DELETE')  # folds the WAL back in, so the file can be copied
+    conn.close()
+    os.replace(partial, path)
+    return path
+
+
+def count_tasks(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM task').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def fresh_state(db_path, directory):
+    """Environment for one run: a copy of the seeded database and an empty state dir."""
+    db_copy = os.path.join(directory, 'tasks.db')
+    shutil.copyfile(db_path, db_copy)
+    state_dir = os.path.join(directory, 'state')
+    os.makedirs(state_dir)
+    shutil.copyfile(os.path.join(SERVER_DIR, 'user_profile.json'), os.path.join(state_dir, 'user_profile.json'))
+    return dict(os.environ, DATABASE_URL='sqlite:///' + db_copy, SMT_STATE_DIR=state_dir)
+
+
+# --- 2. Measuring ---
+def make_request(endpoint, i):
+    """(method, path, body) of the i-th request to an endpoint."""
+    if endpoint == 'parse-task':
+        return 'POST', '/api/v1/parse-task', json.dumps({'text': TEXTS[i % len(TEXTS)]})
+    if endpoint == 'retrain':
+        return 'POST', '/api/v1/retrain', None
+    return 'GET', f'/api/v1/{endpoint}', None
+
+
+def retrain_once(call):
+    """Queues a retrain and polls it to completion; True if the job succeeded."""
+    status, body = call(*make_request('retrain', 0))
+    if status != 202:
+        return False
+    job_id = json.loads(body)['job_id']
+    while True:
+        status, body = call('GET', f'/api/v1/retrain/{job_id}', None)
+        if status != 200:
+            return False
+        job_status = json.loads(body)['status']
+        if job_status in FINISHED:
+            return job_status == 'succeeded'
+        time.sleep(0.05)
+
+
+def summarize(latencies, errors, elapsed):
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p99_ms': float(np.percentile(ms, 99)),
+    }
+
+
+def measure(call, endpoints, requests, warmup, retrains):
+    """
+    Times each endpoint with sequential requests through call(method,
+    path, body) -> (status, body). A retrain sample is the whole job:
+    the POST plus polling until it has finished.
+    """
+    results = {}
+    for endpoint in endpoints:
+        if endpoint == 'retrain':
+            one, n = (lambda i: retrain_once(call)), retrains
+        else:
+            def one(i, endpoint=endpoint):
+                return call(*make_request(endpoint, i))[0] < 400
+            n = requests
+        for i in range(warmup if endpoint != 'retrain' else 0):
+            one(i)
+        latencies, errors = [], 0
+        started = time.perf_counter()
+        for i in range(n):
+            t = time.perf_counter()
+            ok = one(i)
+            if ok:
+                latencies.append(time.perf_counter() - t)
+            else:
+                errors += 1
+        results[endpoint] = summarize(latencies, errors, time.perf_counter() - started)
+    return results
+
+
+def wait_rusage(proc):
+    """Reaps a child and returns its peak RSS in MB (including its own reaped children)."""
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return usage.ru_maxrss / 1024  # KB on Linux
+
+
+# --- 3. Drivers ---
+def run_client(env, args):
+    code = CHILD.format(endpoints=args.endpoints, requests=args.requests, warmup=args.warmup,
+                        retrains=args.retrains)
+    proc = subprocess.Popen([sys.executable, '-c', code], cwd=SERVER_DIR, env=env,
+                            stdout=subprocess.PIPE, text=True)
+    out = proc.stdout.read()
+    peak_rss = wait_rusage(proc)
+    if proc.returncode != 0:
+        raise RuntimeError(f"client driver exited with {proc.returncode}")
+    return {'endpoints': json.loads(out.strip().splitlines()[-1]), 'peak_rss_mb': peak_rss}
+
+
+def run_http(env, args):
+    port = free_port()
+    env = dict(env, SMT_BIND=f'127.0.0.1:{port}', SMT_WORKERS=str(args.workers))
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                              cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL)
+    conn = None
+    try:
+        wait_ready('127.0.0.1', port)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+
+        def call(method, path, body):
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            return response.status, response.read()
+        results = measure(call, args.endpoints, args.requests, args.warmup, args.retrains)
+    finally:
+        if conn is not None:
+            conn.close()
+        server.terminate()
+    return {'endpoints': results, 'peak_rss_mb': wait_rusage(server)}
+
+
+# --- 4. Baselines ---
+def git_commit():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=SERVER_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(label, driver, run):
+    print(f"[{label} / {driver}] peak RSS {run['peak_rss_mb']:.0f} MB")
+    for endpoint, r in run['endpoints'].items():
+        print(f"  {endpoint:>14}: {r['rps']:8.1f} req/s, p50 {r['p50_ms']:8.2f} ms, "
+              f"p99 {r['p99_ms']:8.2f} ms, {r['requests']} ok / {r['errors']} errors")
+
+
+def change(old, new):
+    return f"{100 * (new - old) / old:+6.1f}%" if old else '     n/a'
+
+
+def diff(old, new):
+    """Prints every scale / driver / endpoint present in both baselines with its relative change."""
+    print(f"Comparing {old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    for label, drivers in new['results'].items():
+        for driver, run in drivers.items():
+            base = old['results'].get(label, {}).get(driver)
+            if base is None:
+                continue
+            print(f"[{label} / {driver}] peak RSS {base['peak_rss_mb']:.0f} -> {run['peak_rss_mb']:.0f} MB "
+                  f"({change(base['peak_rss_mb'], run['peak_rss_mb'])})")
+            for endpoint, r in run['endpoints'].items():
+                b = base['endpoints'].get(endpoint)
+                if b is None:
+                    continue
+                print(f"  {endpoint:>14}: req/s {change(b['rps'], r['rps'])}, "
+                      f"p50 {change(b['p50_ms'], r['p50_ms'])}, p99 {change(b['p99_ms'], r['p99_ms'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scales', default='1k,100k,1M', help='database sizes in tasks (k / M suffixes)')
+    parser.add_argument('--drivers', default=','.join(DRIVERS))
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed requests per endpoint first')
+    parser.add_argument('--retrains', type=int, default=3, help='retrain jobs per run')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn workers for the http driver')
+    parser.add_argument('--seed', type=int, default=7, help='generate_data.py seed')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'smt-bench'),
+                        help='where seeded databases are cached')
+    parser.add_argument('--reseed', action='store_true', help='regenerate cached databases')
+    parser.add_argument('--out', help='write the results to this JSON baseline')
+    parser.add_argument('--compare', help='baseline JSON to diff these results against')
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'), help='only diff two baselines')
+    args = parser.parse_args()
+
+    if args.diff:
+        with open(args.diff[0]) as f_old, open(args.diff[1]) as f_new:
+            diff(json.load(f_old), json.load(f_new))
+        return None
+    args.endpoints = [e for e in args.endpoints.split(',') if e]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoint(s): {', '.join(sorted(unknown))}")
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    baseline = {
+        'meta': {
+            'commit': git_commit(),
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('out', 'compare', 'diff', 'data_dir', 'reseed')},
+        },
+        'results': {},
+    }
+    runners = {'client': run_client, 'http': run_http}
+    for label in args.scales.split(','):
+        db_path = seed_db(label, args.data_dir, args.seed, args.reseed)
+        runs = baseline['results'][label] = {}
+        for driver in args.drivers.split(','):
+            with tempfile.TemporaryDirectory() as directory:
+                run = runs[driver] = runners[driver](fresh_state(db_path, directory), args)
+            run['tasks'] = count_tasks(db_path)
+            print_run(label, driver, run)
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            diff(json.load(f), baseline)
+    return baseline
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Calendar Environment Benchmark for Smart Task Manager
+
+Measures RL rollout throughput as task placements (calendar steps) per
+second, with random actions:
+1. legacy     - ml_models/rl_schedular.CalendarEnv: one calendar, one
+                single-step episode (reset + step) per placement
+2. legacy_tf  - the same through TFPyEnvironment, as create_agent() uses it
+3. batched    - slot_policy.VectorCalendarEnv: N calendars as one
+                (N, 168) array, every calendar stepped by one call, with
+                --tasks placements per episode
+4. batched_py - rl_schedular.BatchedCalendarEnv, the same calendars as a
+                batched TF-Agents py_environment
+5. batched_tf - BatchedCalendarEnv through TFPyEnvironment
+
+The legacy and TF-Agents modes need tensorflow / tf_agents and are
+skipped when they are not installed.
+
+Usage (from SMT_server/):
+    python benchmarks/env_benchmark.py --sizes 1,64,256,1024 --tasks 5
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+from slot_policy import N_SLOTS, VectorCalendarEnv  # noqa: E402
+
+TASK_MINUTES = (30, 60, 90, 120)
+
+
+def timed(step, placements_per_call, seconds):
+    """Placements per second of step(i), called until `seconds` have passed (after 10 warm-up calls)."""
+    for i in range(10):
+        step(i)
+    calls, start = 0, time.perf_counter()
+    while True:
+        for _ in range(100):
+            step(calls)
+            calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls * placements_per_call / elapsed
+
+
+def random_actions(n, batch=1, seed=0):
+    return np.random.default_rng(seed).integers(N_SLOTS, size=(n, batch)).astype(np.int32)
+
+
+# --- 1. Current environment ---
+def legacy_steps(seconds, tf_wrapper):
+    from ml_models.rl_schedular import CalendarEnv
+    actions = random_actions(1024)
+    env = CalendarEnv()
+    if tf_wrapper:
+        import tensorflow as tf
+        from tf_agents.environments import tf_py_environment
+        env = tf_py_environment.TFPyEnvironment(env)
+        actions = [tf.constant(a) for a in actions]
+    else:
+        actions = [a[0] for a in actions]
+
+    def step(i):
+        env.reset()  # every episode is one placement
+        env.step(actions[i % len(actions)])
+    return timed(step, 1, seconds)
+
+
+# --- 2. Batched environment ---
+def batched_steps(n, tasks, seconds):
+    env = VectorCalendarEnv(np.ones((2, N_SLOTS)), TASK_MINUTES, n_envs=n, tasks_per_episode=tasks)
+    actions = random_actions(64, n)
+    env.reset()
+
+    def step(i):
+        _, _, done = env.step(actions[i % len(actions)])
+        if done.all():
+            env.reset()
+    return timed(step, n, seconds)
+
+
+def batched_env_steps(n, tasks, seconds, tf_wrapper):
+    from ml_models.rl_schedular import BatchedCalendarEnv
+    env = BatchedCalendarEnv(batch_size=n, tasks_per_episode=tasks)
+    actions = random_actions(64, n)
+    if tf_wrapper:
+        import tensorflow as tf
+        from tf_agents.environments import tf_py_environment
+        env = tf_py_environment.TFPyEnvironment(env)
+        actions = [tf.constant(a) for a in actions]
+    env.reset()
+    # The environments reset themselves after the last task of an episode
+    return timed(lambda i: env.step(actions[i % len(actions)]), n, seconds)
+
+
+# --- 3. Report ---
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', default='1,64,256,1024', help='comma-separated batch sizes (calendars)')
+    parser.add_argument('--tasks', type=int, default=5, help='placements per batched episode')
+    parser.add_argument('--seconds', type=float, default=2.0, help='time per measurement')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    try:
+        import tf_agents  # noqa: F401
+        have_tf = True
+    except ImportError:
+        have_tf = False
+        print("tensorflow / tf_agents not installed: legacy and TF-Agents modes skipped.")
+
+    results = {}
+    if have_tf:
+        results['legacy'] = {1: legacy_steps(args.seconds, tf_wrapper=False)}
+        results['legacy_tf'] = {1: legacy_steps(args.seconds, tf_wrapper=True)}
+    results['batched'] = {n: batched_steps(n, args.tasks, args.seconds) for n in sizes}
+    if have_tf:
+        results['batched_py'] = {n: batched_env_steps(n, args.tasks, args.seconds, False) for n in sizes}
+        results['batched_tf'] = {n: batched_env_steps(n, args.tasks, args.seconds, True) for n in sizes}
+
+    for mode, by_size in results.items():
+        for n, rate in by_size.items():
+            print(f"{mode:>10} N={n:<5}: {rate:13,.0f} steps/s")
+    if 'legacy' in results:
+        best = max(results['batched'].values())
+        print(f"Batched vs legacy: {best / results['legacy'][1]:.0f}x "
+              f"({best / results['legacy_tf'][1]:.0f}x vs legacy through TFPyEnvironment)")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Feature Parity Check for Smart Task Manager
+
+Verifies that training and serving build the same priority features
+from feature_schema.py, on synthetic completed tasks:
+1. matrix    - the compiled serving features (numeric_matrix + TF-IDF)
+               equal the fitted ColumnTransformer's training matrix
+2. predict   - compiled predictor, sklearn fallback and Pipeline.predict
+               on priority_frame return identical labels
+3. legacy    - a pipeline fitted with the old predicted_time_min column
+               still compiles and matches its own sklearn predictions
+4. time      - the compiled time predictor matches Pipeline.predict
+
+Exits with status 1 on the first mismatch.
+
+Usage (from SMT_server/):
+    python benchmarks/feature_parity_check.py --tasks 2000
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fast_predictor import (CompiledPriorityPredictor, CompiledTimePredictor,  # noqa: E402
+                            PipelinePriorityPredictor)
+from feature_schema import (COLUMN_ALIASES, PRIORITY_COLUMNS, hours_until_due,  # noqa: E402
+                            numeric_matrix, priority_frame)
+from training_pipeline import assign_real_priority, create_priority_pipeline, train_all  # noqa: E402
+from training_benchmark import synthetic_rows  # noqa: E402
+
+
+def check(label, ok):
+    print(f"{label:>8}: {'OK' if ok else 'MISMATCH'}")
+    if not ok:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.tasks, np.random.default_rng(args.seed))
+    names = [r[0] for r in rows]
+    minutes = [r[1] for r in rows]
+    hours = [hours_until_due(r[2], r[3]) for r in rows]
+    result = train_all(rows, n_jobs=1)
+    priority_model = result['priority_model']
+
+    # --- 1. Training matrix vs serving features ---
+    X_train = priority_model.named_steps['preprocessor'].transform(priority_frame(names, hours, minutes))
+    compiled = CompiledPriorityPredictor(priority_model)
+    X_serve = compiled.features(names, numeric_matrix(hours, minutes, compiled.numeric_columns))
+    X_train = X_train[:, compiled.forest.used_features].toarray().astype(np.float32)
+    check('matrix', np.array_equal(X_train, X_serve))
+
+    # --- 2. Serving paths ---
+    reference = priority_model.predict(priority_frame(names, hours, minutes))
+    check('predict', np.array_equal(reference, compiled.predict(names, hours, minutes))
+          and np.array_equal(reference, PipelinePriorityPredictor(priority_model).predict(names, hours, minutes)))
+
+    # --- 3. Artifacts saved with legacy column names ---
+    legacy_name = {v: k for k, v in COLUMN_ALIASES.items()}
+    legacy_columns = [legacy_name.get(c, c) for c in PRIORITY_COLUMNS]
+    legacy = create_priority_pipeline()
+    transformers = legacy.named_steps['preprocessor'].transformers
+    transformers[0] = ('num', transformers[0][1], [legacy_name.get(c, c) for c in transformers[0][2]])
+    legacy_frame = priority_frame(names, hours, minutes, legacy_columns)
+    legacy.fit(legacy_frame, [assign_real_priority(h) for h in hours])
+    legacy_reference = legacy.predict(legacy_frame)
+    check('legacy', np.array_equal(legacy_reference, CompiledPriorityPredictor(legacy).predict(names, hours, minutes))
+          and np.array_equal(legacy_reference, PipelinePriorityPredictor(legacy).predict(names, hours, minutes)))
+
+    # --- 4. Time model ---
+    time_model = result['time_model']
+    check('time', np.array_equal(time_model.predict(names), CompiledTimePredictor(time_model).predict(names)))
+    print(f"Features match on {len(rows)} tasks ({', '.join(PRIORITY_COLUMNS)}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+HTTP Load Test for Smart Task Manager
+
+Drives a running server over real HTTP and reports, per endpoint,
+requests/sec, p50 / p99 latency and errors:
+1. tasks       - GET /api/v1/tasks (the app's main list)
+2. parse-task  - POST /api/v1/parse-task with rotating task texts
+                 (--unique makes every text new, defeating the
+                 prediction cache)
+
+Each endpoint is hammered on its own for --duration seconds by
+--concurrency client threads, each with its own keep-alive connection.
+Without --url the script starts `gunicorn -c gunicorn.conf.py wsgi:app`
+itself with --workers workers (gunicorn must be installed; its stdout
+is discarded, gunicorn's own log goes to stderr).
+
+Usage (from SMT_server/):
+    python benchmarks/load_test.py --workers 4 --concurrency 16 --duration 10
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --endpoints tasks
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEXTS = (
+    "Submit OS assignment tomorrow",
+    "Call mom",
+    "Debug the main feature by next week",
+    "Prepare slides for Friday meeting",
+    "Buy groceries tonight",
+    "Review pull request in 2 days",
+    "Write the project report by Monday",
+    "Book dentist appointment",
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(workers, port):
+    env = dict(os.environ, SMT_BIND=f'127.0.0.1:{port}', SMT_WORKERS=str(workers), SMT_TRUST_USER_HEADER='1')
+    return subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                            cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL)
+
+
+def wait_ready(host, port, timeout=180):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            conn.request('GET', '/api/v1/parse-task/cache')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server on {host}:{port} did not become ready in {timeout}s")
+
+
+def make_request(endpoint, i, unique):
+    """(method, path, body) for the i-th request of an endpoint."""
+    if endpoint == 'tasks':
+        return 'GET', '/api/v1/tasks', None
+    text = TEXTS[i % len(TEXTS)]
+    if unique:
+        text = f"{text} {i}"
+    return 'POST', '/api/v1/parse-task', json.dumps({'text': text})
+
+
+def client(host, port, endpoint, user, counter, unique, stop_at, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {'Content-Type': 'application/json', 'X-User-Id': user}
+    while time.perf_counter() < stop_at:
+        method, path, body = make_request(endpoint, next(counter), unique)
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            conn.close()  # reconnects on the next request
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(1)
+    conn.close()
+
+
+def run_endpoint(host, port, endpoint, args):
+    counter = itertools.count()
+    # Warm up (first parse loads nothing when the server preloads, but fills caches)
+    client(host, port, endpoint, args.user, counter, args.unique, time.perf_counter() + 1, [], [])
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    stop_at = start + args.duration
+    threads = [threading.Thread(target=client, args=(host, port, endpoint, args.user, counter,
+                                                    args.unique, stop_at, latencies, errors))
+               for _ in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(lat_ms, 50)),
+        'p99_ms': float(np.percentile(lat_ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', help='existing server; if omitted, gunicorn is started')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers (ignored with --url)')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per endpoint')
+    parser.add_argument('--endpoints', default='tasks,parse-task')
+    parser.add_argument('--user', default='default', help='X-User-Id sent with every request')
+    parser.add_argument('--unique', action='store_true', help='never repeat a parse-task text')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = start_gunicorn(args.workers, port)
+    try:
+        wait_ready(host, port)
+        results = {}
+        for endpoint in args.endpoints.split(','):
+            r = results[endpoint] = run_endpoint(host, port, endpoint, args)
+            print(f"{endpoint:>10}: {r['rps']:8.1f} req/s, p50 {r['p50_ms']:7.2f} ms, "
+                  f"p99 {r['p99_ms']:7.2f} ms, {r['requests']} ok / {r['errors']} errors")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'workers': None if args.url else args.workers, 'concurrency': args.concurrency,
+                       'duration': args.duration, 'results': results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Metrics Overhead Benchmark for Smart Task Manager
+
+Measures what the instrumentation in metrics.py costs, in fresh
+processes with SMT_METRICS=1 and SMT_METRICS=0:
+1. span     - one empty `with span(...)` block (the per-stage cost)
+2. requests - median latency of POST /api/v1/parse-task and
+              GET /api/v1/tasks through the Flask test client (request
+              middleware + model / parse / DB spans)
+
+Usage (from SMT_server/):
+    python benchmarks/metrics_overhead_benchmark.py --requests 500
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a brand-new interpreter and prints one JSON line
+CHILD = """
+import io, json, statistics, sys, time
+from contextlib import redirect_stdout
+from metrics import span
+n = 200000
+start = time.perf_counter()
+for _ in range(n):
+    with span('bench.empty'):
+        pass
+span_ns = (time.perf_counter() - start) / n * 1e9
+
+from app import app, init_db
+with app.app_context():
+    init_db()
+client = app.test_client()
+result = {{'span_ns': span_ns}}
+for label, call in (('parse_task', lambda i: client.post('/api/v1/parse-task', json={{'text': f'write report {{i % 50}} by friday'}})),
+                    ('tasks', lambda i: client.get('/api/v1/tasks'))):
+    samples = []
+    with redirect_stdout(io.StringIO()):  # the endpoints log every request
+        for i in range({requests}):
+            t = time.perf_counter()
+            call(i)
+            samples.append(time.perf_counter() - t)
+    result[label + '_ms'] = statistics.median(samples[20:]) * 1000
+print(json.dumps(result))
+"""
+
+
+def run(enabled, requests):
+    env = dict(os.environ, SMT_METRICS='1' if enabled else '0')
+    out = subprocess.run([sys.executable, '-c', CHILD.format(requests=requests)], cwd=SERVER_DIR,
+                         env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=500, help='requests per endpoint')
+    args = parser.parse_args()
+
+    results = {'on': run(True, args.requests), 'off': run(False, args.requests)}
+    for mode, r in results.items():
+        print(f"{mode:>3}: span {r['span_ns']:6.0f} ns, parse-task {r['parse_task_ms']:.3f} ms, "
+              f"tasks {r['tasks_ms']:.3f} ms (median)")
+    on, off = results['on'], results['off']
+    print(f"Overhead: parse-task {on['parse_task_ms'] - off['parse_task_ms']:+.3f} ms, "
+          f"tasks {on['tasks_ms'] - off['tasks_ms']:+.3f} ms per request")
+    return results
+
+
+if __name__ == "__main__":
+    main()
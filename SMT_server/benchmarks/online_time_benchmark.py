@@ -0,0 +1,101 @@
+"""
+Online Time Model Benchmark for Smart Task Manager
+
+Replays a synthetic stream of task completions (per-name habits plus
+noise, with some habits drifting halfway through) and predicts each
+task's duration just before its feedback arrives:
+1. static   - forest trained once on the initial history
+2. refit    - forest refit on the full history every --refit-every
+              completions (the /api/v1/retrain path)
+3. online   - static forest blended with O(1) running stats per name
+              (online_time_model.py, SMT_ONLINE_TIME=1)
+
+Reports mean absolute error per strategy and what an update costs:
+microseconds per online update vs seconds per full refit.
+
+Usage (from SMT_server/):
+    python benchmarks/online_time_benchmark.py --history 500 --stream 3000
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from online_time_model import RunningTimeStats  # noqa: E402
+from prediction_cache import normalize_task_name  # noqa: E402
+from training_pipeline import create_time_pipeline  # noqa: E402
+
+VERBS = ['write', 'review', 'debug', 'plan', 'call', 'study', 'email', 'clean', 'prepare', 'read']
+NOUNS = ['report', 'essay', 'slides', 'sprint', 'mom', 'kitchen', 'notes', 'proposal', 'bug', 'chapter']
+
+
+def synthetic_stream(n, names, rng, drift_at):
+    habits = dict(zip(names, rng.uniform(10, 180, len(names))))
+    drifting = set(rng.choice(names, len(names) // 4, replace=False))
+    events = []
+    for i in range(n):
+        name = names[int(rng.integers(len(names)))]
+        minutes = habits[name] * (1.6 if i >= drift_at and name in drifting else 1.0)
+        events.append((name, max(5, int(minutes * rng.lognormal(0, 0.2)))))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--history', type=int, default=500, help='completions before the stream starts')
+    parser.add_argument('--stream', type=int, default=3000, help='completions replayed one by one')
+    parser.add_argument('--refit-every', type=int, default=250)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    names = [f"{v} {n}" for v in VERBS for n in NOUNS]
+    events = synthetic_stream(args.history + args.stream, names, rng, drift_at=args.history + args.stream // 2)
+    history, stream = events[:args.history], events[args.history:]
+
+    static = create_time_pipeline().fit([e[0] for e in history], [e[1] for e in history])
+    refit = static
+    online = RunningTimeStats()
+    for name, minutes in history:
+        online.update(normalize_task_name(name), minutes)
+    forest_cache = {}
+
+    errors = {'static': [], 'refit': [], 'online': []}
+    refit_seconds, online_seconds = [], []
+    seen = list(history)
+    for i, (name, minutes) in enumerate(stream):
+        if name not in forest_cache:
+            forest_cache[name] = static.predict([name])[0]
+        errors['static'].append(abs(forest_cache[name] - minutes))
+        errors['refit'].append(abs(refit.predict([name])[0] - minutes))
+        errors['online'].append(abs(online.predict(normalize_task_name(name), forest_cache[name]) - minutes))
+
+        # Feedback arrives
+        start = time.perf_counter()
+        online.update(normalize_task_name(name), minutes)
+        online_seconds.append(time.perf_counter() - start)
+        seen.append((name, minutes))
+        if (i + 1) % args.refit_every == 0:
+            start = time.perf_counter()
+            refit = create_time_pipeline().fit([e[0] for e in seen], [e[1] for e in seen])
+            refit_seconds.append(time.perf_counter() - start)
+
+    print(f"{len(stream)} completions after {len(history)} of history, {len(names)} distinct names")
+    for label, errs in errors.items():
+        half = len(errs) // 2
+        print(f"{label:>7}: MAE {np.mean(errs):6.1f} min (before drift {np.mean(errs[:half]):6.1f}, "
+              f"after {np.mean(errs[half:]):6.1f})")
+    print(f"online update: {np.median(online_seconds) * 1e6:.2f} us (median)")
+    if refit_seconds:
+        print(f"full refit:    {np.mean(refit_seconds):.3f} s each, last one {refit_seconds[-1]:.3f} s "
+              f"on {len(seen)} tasks (grows with history)")
+
+
+if __name__ == "__main__":
+    main()
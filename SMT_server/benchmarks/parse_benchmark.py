@@ -0,0 +1,121 @@
+"""
+Parse Latency Benchmark for Smart Task Manager
+
+Parses a corpus of typed task strings ("Submit OS assignment by friday
+at 5pm", "call mom", ...) one at a time, like parse-task does, and
+reports the per-text latency distribution (p50 / p90 / p99 / max):
+1. full     - the whole en_core_web_sm pipeline + dateparser for every
+              date phrase (the old path)
+2. ner      - task_parser: NER-only spaCy + the regex fast path, with
+              dateparser only for uncommon phrases
+3. pool     - the same through ParsePool worker processes (--workers),
+              including the inter-process round trip
+
+It also reports how many date phrases the regex resolved and checks
+that it agrees with dateparser on every phrase both understand.
+
+Usage (from SMT_server/):
+    python benchmarks/parse_benchmark.py --texts 2000 --workers 2
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from task_parser import (SPACY_MODEL, ParsePool, first_date_entity, load_ner,  # noqa: E402
+                         parse_date, parse_texts, quick_parse)
+
+TASKS = (
+    "Submit OS assignment", "call mom", "Debug the main feature", "Prepare slides for the meeting",
+    "buy groceries", "Review pull request", "Write the project report", "Book dentist appointment",
+    "pay rent", "finish reading chapter 4", "email professor about grades", "clean the kitchen",
+)
+PHRASES = (
+    None, None, "today", "tonight", "tomorrow", "by tomorrow", "by friday", "on monday", "next week",
+    "at 5pm", "by 5pm", "tomorrow at 9am", "friday 5pm", "in 2 days", "in 3 hours", "in a week",
+    "at noon", "sunday", "day after tomorrow",
+    # Uncommon phrases: left to dateparser
+    "next month", "on 12 March", "by the end of the month", "December 3rd",
+)
+
+
+def corpus(n, seed):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        task, phrase = rng.choice(TASKS), rng.choice(PHRASES)
+        texts.append(f"{task} {phrase}" if phrase else task)
+    return texts
+
+
+def latencies(parse_one, texts, warmup=20):
+    for text in texts[:warmup]:
+        parse_one(text)
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        parse_one(text)
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000
+
+
+def report(label, ms):
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    print(f"{label:>5}: p50 {p50:7.3f} ms, p90 {p90:7.3f} ms, p99 {p99:8.3f} ms, "
+          f"max {ms.max():8.2f} ms, mean {ms.mean():7.3f} ms")
+    return {'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99, 'max_ms': float(ms.max()), 'mean_ms': float(ms.mean())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=2, help='ParsePool processes (0 skips the pool run)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    import dateparser
+    import spacy
+    texts = corpus(args.texts, args.seed)
+    results = {}
+
+    # --- 1. Old path ---
+    full_nlp = spacy.load(SPACY_MODEL)
+
+    def parse_full(text):
+        date_text = first_date_entity(full_nlp(text))
+        return date_text, dateparser.parse(date_text, settings={'PREFER_DATES_FROM': 'future'}) if date_text else None
+    results['full'] = report('full', latencies(parse_full, texts))
+
+    # --- 2. NER only + regex ---
+    ner = load_ner()
+    results['ner'] = report('ner', latencies(lambda text: parse_texts(ner, [text]), texts))
+
+    # --- 3. Process pool ---
+    if args.workers > 0:
+        pool = ParsePool(None, workers=args.workers)
+        try:
+            results['pool'] = report('pool', latencies(lambda text: pool.parse([text]), texts))
+        finally:
+            pool.shutdown()
+
+    # --- Fast-path coverage and agreement with dateparser ---
+    now = datetime.now()
+    phrases = [p for p in (first_date_entity(doc) for doc in ner.pipe(texts)) if p]
+    fast = [p for p in phrases if quick_parse(p, now) is not None]
+    disagree = sorted({p for p in fast if (d := dateparser.parse(
+        p, settings={'PREFER_DATES_FROM': 'future', 'RELATIVE_BASE': now})) is not None and d != parse_date(p, now)})
+    print(f"Regex resolved {len(fast)} of {len(phrases)} date phrases "
+          f"({100 * len(fast) / max(1, len(phrases)):.0f}%); disagreements with dateparser: {disagree or 'none'}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Predictor Microbenchmark for Smart Task Manager
+
+Compares the single-row prediction hot path used by parse_task:
+1. sklearn   - pd.DataFrame + Pipeline.predict (the old path)
+2. compiled  - fast_predictor compiled TF-IDF + packed forest
+
+It first checks that both paths return identical predictions on a
+random sample of task names / deadlines / estimates, then reports the
+median per-call latency for the priority and time models, plus batch
+throughput.
+
+Usage (from SMT_server/):
+    python benchmarks/predictor_benchmark.py --calls 2000
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fast_predictor import CompiledPriorityPredictor, CompiledTimePredictor  # noqa: E402
+from feature_schema import priority_frame  # noqa: E402
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ml_models')
+
+
+def random_inputs(vocabulary, n, seed):
+    rng = random.Random(seed)
+    words = list(vocabulary) + ['the', 'a', 'unknownword']
+    names = [' '.join(rng.choice(words) for _ in range(rng.randint(1, 5))) for _ in range(n)]
+    hours = [rng.uniform(0, 400) for _ in range(n)]
+    minutes = [rng.choice([5, 10, 25, 45, 60, 120, 240]) for _ in range(n)]
+    return names, hours, minutes
+
+
+def per_call_us(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--calls', type=int, default=2000, help='single-row calls per path')
+    parser.add_argument('--batch', type=int, default=10000, help='rows for the batch comparison')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    priority_model = joblib.load(os.path.join(MODELS_DIR, 'priority_model.joblib'))
+    time_model = joblib.load(os.path.join(MODELS_DIR, 'time_predictor.joblib'))
+    fast_priority = CompiledPriorityPredictor(priority_model)
+    fast_time = CompiledTimePredictor(time_model)
+
+    # --- 1. Parity check ---
+    names, hours, minutes = random_inputs(fast_priority.tfidf.vocabulary, args.batch, args.seed)
+    reference = priority_model.predict(priority_frame(names, hours, minutes))
+    compiled = fast_priority.predict(names, hours, minutes)
+    assert np.array_equal(reference, compiled), "priority fast path diverged from Pipeline.predict"
+    assert np.array_equal(time_model.predict(names), fast_time.predict(names)), "time fast path diverged"
+    print(f"Parity OK on {len(names)} random rows (priority + time).")
+
+    # --- 2. Single-row latency ---
+    rows = list(zip(names, hours, minutes))[:args.calls]
+
+    def sklearn_priority(name, h, m):
+        return priority_model.predict(priority_frame([name], [h], [m]))[0]
+
+    results = {
+        'priority sklearn': per_call_us(sklearn_priority, rows),
+        'priority compiled': per_call_us(fast_priority.predict_one, rows),
+        'time sklearn': per_call_us(lambda n: time_model.predict([n])[0], [(r[0],) for r in rows]),
+        'time compiled': per_call_us(lambda n: fast_time.predict([n])[0], [(r[0],) for r in rows]),
+    }
+    for label, us in results.items():
+        print(f"{label:>18}: {us:9.1f} us/call (median)")
+    print(f"Priority speedup: {results['priority sklearn'] / results['priority compiled']:.1f}x, "
+          f"time speedup: {results['time sklearn'] / results['time compiled']:.1f}x")
+
+    # --- 3. Batch throughput ---
+    start = time.perf_counter()
+    priority_model.predict(priority_frame(names, hours, minutes))
+    sklearn_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    fast_priority.predict(names, hours, minutes)
+    compiled_batch = time.perf_counter() - start
+    print(f"Batch of {len(names)}: sklearn {sklearn_batch * 1000:.1f} ms, compiled {compiled_batch * 1000:.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    main()
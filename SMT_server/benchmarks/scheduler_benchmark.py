@@ -0,0 +1,113 @@
+"""
+Scheduler Benchmark for Smart Task Manager
+
+Times the slot-placement step of /api/v1/smart-schedule for a growing
+number of pending tasks:
+1. list-scan  - the old loop (np.where -> Python list per task, `in`
+                scans, np.random.choice), one hour per task, one week
+2. allocator  - scheduler.SlotAllocator: multi-cell intervals, EDF, seeded
+
+Both run on the old grid (60 min cells, one week) with the same tasks;
+a second row per task count times the allocator alone on the
+--granularity / --weeks horizon. Every allocator run is repeated to
+confirm the schedule is deterministic and checked for overlapping
+intervals.
+
+Usage (from SMT_server/):
+    python benchmarks/scheduler_benchmark.py --tasks 100 1000 5000 --granularity 15 --weeks 4
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduler import SlotAllocator, allocate_all  # noqa: E402
+
+DEEP_SLOTS = [130, 131, 132, 30, 31, 32]
+SHALLOW_SLOTS = [80, 81, 82]
+
+
+def list_scan_schedule(requests, current_slot):
+    calendar = np.zeros(168, dtype=np.int32)
+    calendar[:current_slot] = 1
+    placed = {}
+    for task_id, deadline_slot, minutes in requests:
+        deadline_slot = 167 if deadline_slot is None else deadline_slot
+        valid_empty_slots = [s for s in np.where(calendar == 0)[0] if s <= deadline_slot]
+        if not valid_empty_slots:
+            continue
+        productive = DEEP_SLOTS if minutes > 45 else SHALLOW_SLOTS
+        smart_slots = [s for s in productive if s in valid_empty_slots]
+        if smart_slots:
+            chosen = np.random.choice(smart_slots)
+        else:
+            reasonable = [s for s in valid_empty_slots if 11 <= (s % 24) <= 17]
+            chosen = np.random.choice(reasonable if reasonable else valid_empty_slots)
+        calendar[int(chosen)] = 1
+        placed[task_id] = int(chosen)
+    return placed
+
+
+def allocator_schedule(requests, current_cell, granularity_min, weeks):
+    allocator = SlotAllocator(DEEP_SLOTS, SHALLOW_SLOTS, granularity_min=granularity_min, weeks=weeks)
+    allocator.block_until(current_cell)
+    return allocate_all(allocator, requests)
+
+
+def make_requests(deadline_hours, minutes, granularity_min, weeks):
+    """(task_id, deadline cell or None, minutes) on the given grid; deadlines past the horizon become None."""
+    cells_per_hour, horizon_hours = 60 // granularity_min, 168 * weeks
+    return [(i, int(d) * cells_per_hour if d < horizon_hours else None, int(m))
+            for i, (d, m) in enumerate(zip(deadline_hours, minutes))]
+
+
+def time_allocator(requests, current_slot, granularity_min, weeks):
+    """(ms, placements, deterministic) of one allocator run from hour current_slot."""
+    current_cell = current_slot * (60 // granularity_min)
+    start = time.perf_counter()
+    placements = allocator_schedule(requests, current_cell, granularity_min, weeks)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return elapsed_ms, placements, placements == allocator_schedule(requests, current_cell, granularity_min, weeks)
+
+
+def has_overlap(placements):
+    intervals = sorted(placements.values())
+    return any(start + length > next_start for (start, length), (next_start, _) in zip(intervals, intervals[1:]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--granularity', type=int, default=15, help='allocator cell size in minutes')
+    parser.add_argument('--weeks', type=int, default=4, help='allocator horizon in weeks')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    current_slot = 40
+    grids = [(60, 1), (args.granularity, args.weeks)]
+    print(f"{'tasks':>7} {'grid':>10} {'list-scan (ms)':>15} {'allocator (ms)':>15} {'placed':>7}  deterministic  overlap")
+    for n in args.tasks:
+        minutes = rng.integers(5, 240, n)
+        for granularity_min, weeks in dict.fromkeys(grids):
+            deadline_hours = rng.integers(current_slot, 168 * weeks + 24, n)
+            requests = make_requests(deadline_hours, minutes, granularity_min, weeks)
+            old_ms = '-'
+            if (granularity_min, weeks) == (60, 1):
+                start = time.perf_counter()
+                list_scan_schedule(requests, current_slot)
+                old_ms = f"{(time.perf_counter() - start) * 1000:.2f}"
+            new_ms, placements, deterministic = time_allocator(requests, current_slot, granularity_min, weeks)
+            grid = f"{weeks}w/{granularity_min}min"
+            print(f"{n:>7} {grid:>10} {old_ms:>15} {new_ms:>15.2f} {len(placements):>7}  "
+                  f"{str(deterministic):>13}  {has_overlap(placements)}")
+
+
+if __name__ == "__main__":
+    main()
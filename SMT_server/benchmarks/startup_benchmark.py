@@ -0,0 +1,89 @@
+"""
+Startup Benchmark for Smart Task Manager
+
+Measures the cold-start cost of importing the server in a fresh
+Python process, in two modes:
+1. lazy  - `import app` only (what generate_data.py, retrain scripts
+           and every worker boot now pay)
+2. eager - `import app` + loading spaCy, both joblib models and,
+           when installed, TensorFlow/TF-Agents (the old behaviour)
+
+For each mode it reports the median wall time and peak RSS.
+
+Usage (from SMT_server/):
+    python benchmarks/startup_benchmark.py --runs 5
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each snippet runs in a brand-new interpreter and prints one JSON line
+CHILD_TEMPLATE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app
+{extra}
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss_kb //= 1024
+print(json.dumps({{'seconds': elapsed, 'rss_mb': rss_kb / 1024.0, 'tf': 'tensorflow' in sys.modules}}))
+"""
+
+EAGER_EXTRA = """
+app.models.preload()
+try:
+    import tensorflow, tf_agents.agents.dqn.dqn_agent
+except ImportError:
+    pass
+"""
+
+MODES = {
+    'lazy': CHILD_TEMPLATE.format(extra=''),
+    'eager': CHILD_TEMPLATE.format(extra=EAGER_EXTRA),
+}
+
+
+def run_once(code):
+    env = dict(os.environ, SMT_ENABLE_RL='0')
+    out = subprocess.run(
+        [sys.executable, '-c', code], cwd=SERVER_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    # Model loaders print progress lines; the result is the last line
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=5, help='cold starts per mode')
+    args = parser.parse_args()
+
+    results = {}
+    for mode, code in MODES.items():
+        samples = [run_once(code) for _ in range(args.runs)]
+        results[mode] = {
+            'median_seconds': statistics.median(s['seconds'] for s in samples),
+            'median_rss_mb': statistics.median(s['rss_mb'] for s in samples),
+            'tensorflow_loaded': any(s['tf'] for s in samples),
+        }
+        print(f"{mode:>5}: {results[mode]['median_seconds']:.3f}s, "
+              f"{results[mode]['median_rss_mb']:.1f} MB RSS, "
+              f"TF loaded: {results[mode]['tensorflow_loaded']}")
+
+    lazy, eager = results['lazy'], results['eager']
+    print(f"Cold start saved: {eager['median_seconds'] - lazy['median_seconds']:.3f}s, "
+          f"{eager['median_rss_mb'] - lazy['median_rss_mb']:.1f} MB")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Training Pipeline Benchmark for Smart Task Manager
+
+Compares the two ways of retraining on the same synthetic history:
+1. separate - time Pipeline.fit and priority Pipeline.fit, each with its
+              own TF-IDF pass, single-threaded (the old retrain +
+              retrain_prioritymodel.py)
+2. unified  - training_pipeline.train_all: one shared TF-IDF pass,
+              forests fit with n_jobs, per-stage timings
+
+It also checks that both produce the same predictions.
+
+Usage (from SMT_server/):
+    python benchmarks/training_benchmark.py --tasks 1000 20000 --jobs -1
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_schema import hours_until_due, priority_frame  # noqa: E402
+from training_pipeline import (assign_real_priority, create_priority_pipeline,  # noqa: E402
+                               create_time_pipeline, train_all)
+
+WORDS = ['report', 'email', 'debug', 'call', 'mom', 'gym', 'write', 'review', 'plan', 'sprint',
+         'meeting', 'groceries', 'code', 'essay', 'study', 'assignment', 'slides', 'laundry']
+
+
+def synthetic_rows(n, rng):
+    """(task_name, actual_time_min, due_date, created_at, completed_at) like the Task table."""
+    start = datetime(2025, 1, 6)
+    rows = []
+    for _ in range(n):
+        created = start + timedelta(hours=int(rng.integers(0, 24 * 90)))
+        due = created + timedelta(hours=int(rng.integers(1, 300))) if rng.random() < 0.8 else None
+        rows.append((' '.join(rng.choice(WORDS, rng.integers(1, 5))), int(rng.integers(5, 240)),
+                     due, created, created + timedelta(hours=int(rng.integers(0, 200)))))
+    return rows
+
+
+def separate_fit(rows):
+    names = [r[0] for r in rows]
+    minutes = [r[1] for r in rows]
+    hours = [hours_until_due(r[2], r[3]) for r in rows]
+    time_model = create_time_pipeline().fit(names, minutes)
+    priority_model = create_priority_pipeline().fit(
+        priority_frame(names, hours, minutes),
+        [assign_real_priority(h) for h in hours])
+    return time_model, priority_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[1000, 20000])
+    parser.add_argument('--jobs', type=int, default=-1, help='n_jobs for the unified forests')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'tasks':>7} {'separate (s)':>13} {'unified (s)':>12}  same predictions  stages")
+    for n in args.tasks:
+        rows = synthetic_rows(n, rng)
+        start = time.perf_counter()
+        time_model, priority_model = separate_fit(rows)
+        separate_s = time.perf_counter() - start
+        start = time.perf_counter()
+        result = train_all(rows, n_jobs=args.jobs)
+        unified_s = time.perf_counter() - start
+
+        sample = rows[:500]
+        names = [r[0] for r in sample]
+        features = priority_frame(names, [hours_until_due(r[2], r[3]) for r in sample], [r[1] for r in sample])
+        same = (np.allclose(time_model.predict(names), result['time_model'].predict(names))
+                and np.array_equal(priority_model.predict(features), result['priority_model'].predict(features)))
+        print(f"{n:>7} {separate_s:>13.2f} {unified_s:>12.2f}  {str(same):>16}  {result['timings']}")
+
+
+if __name__ == "__main__":
+    main()
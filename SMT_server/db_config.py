@@ -0,0 +1,100 @@
+"""
+Database Configuration for Smart Task Manager
+
+tasks.db used to be opened with SQLite's defaults (rollback journal,
+synchronous=FULL, no busy timeout), so concurrent writes from
+complete_task, toggle_my_day or the smart schedule failed straight
+away with "database is locked". This module owns the engine setup:
+1. URL - DATABASE_URL selects the database (default: sqlite tasks.db
+   next to app.py); postgres:// URLs work too (needs psycopg2)
+2. Pooling - every worker process gets its own pool, sized by
+   SMT_DB_POOL_SIZE / SMT_DB_MAX_OVERFLOW (Postgres connections are
+   pre-pinged and recycled)
+3. SQLite pragmas on every new connection: journal_mode=WAL (readers
+   never block the writer), synchronous=NORMAL (safe with WAL, no fsync
+   per commit), busy_timeout (writers wait instead of failing) and
+   mmap_size (reads served from the page cache)
+4. Write transactions - write requests open with BEGIN IMMEDIATE, so
+   they queue on the write lock up front (honouring busy_timeout)
+   instead of failing when a read transaction has to upgrade
+
+benchmarks/db_concurrency_benchmark.py compares the default
+(SMT_DB_TUNING=0) and the tuned setup under concurrent writers.
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+
+from sqlalchemy import event
+
+POOL_SIZE = int(os.environ.get('SMT_DB_POOL_SIZE', 5))
+MAX_OVERFLOW = int(os.environ.get('SMT_DB_MAX_OVERFLOW', 10))
+POOL_TIMEOUT = int(os.environ.get('SMT_DB_POOL_TIMEOUT', 30))
+POOL_RECYCLE_SEC = int(os.environ.get('SMT_DB_POOL_RECYCLE_SEC', 1800))
+BUSY_TIMEOUT_MS = int(os.environ.get('SMT_SQLITE_BUSY_TIMEOUT_MS', 5000))
+MMAP_MB = int(os.environ.get('SMT_SQLITE_MMAP_MB', 256))
+# SMT_DB_TUNING=0 restores SQLAlchemy's defaults (for comparisons)
+TUNING_ENABLED = os.environ.get('SMT_DB_TUNING', '1').lower() in ('1', 'true', 'yes')
+
+
+def database_url(base_dir):
+    """DATABASE_URL, or the bundled SQLite file."""
+    url = os.environ.get('DATABASE_URL')
+    if not url:
+        return 'sqlite:///' + os.path.join(base_dir, 'tasks.db')
+    # Heroku-style URLs; SQLAlchemy only accepts the postgresql:// scheme
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def is_sqlite(url):
+    return str(url).startswith('sqlite')
+
+
+def engine_options(url):
+    """SQLALCHEMY_ENGINE_OPTIONS for the given URL."""
+    if not TUNING_ENABLED:
+        return {}
+    if is_sqlite(url):
+        if url in ('sqlite://', 'sqlite:///:memory:'):
+            return {}  # SQLAlchemy picks a single shared connection for :memory:
+        # sqlite3's own lock wait matches busy_timeout (it is in seconds)
+        return {'pool_size': POOL_SIZE, 'max_overflow': MAX_OVERFLOW, 'pool_timeout': POOL_TIMEOUT,
+                'connect_args': {'timeout': BUSY_TIMEOUT_MS / 1000, 'check_same_thread': False}}
+    return {'pool_size': POOL_SIZE, 'max_overflow': MAX_OVERFLOW, 'pool_timeout': POOL_TIMEOUT,
+            'pool_pre_ping': True, 'pool_recycle': POOL_RECYCLE_SEC}
+
+
+def sqlite_pragmas(busy_timeout_ms=BUSY_TIMEOUT_MS, mmap_mb=MMAP_MB):
+    return (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('busy_timeout', busy_timeout_ms),
+        ('mmap_size', mmap_mb * 1024 * 1024),
+    )
+
+
+def install(engine, immediate=None, pragmas=None):
+    """
+    Registers the SQLite connect / begin hooks on an engine (no-op for
+    other databases). immediate() is asked at the start of every
+    transaction and returns True for ones that will write.
+    """
+    if engine.dialect.name != 'sqlite' or not TUNING_ENABLED:
+        return
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        # Let the hooks below issue BEGIN (pysqlite's implicit one is always DEFERRED)
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def on_begin(conn):
+        conn.exec_driver_sql('BEGIN IMMEDIATE' if immediate and immediate() else 'BEGIN')
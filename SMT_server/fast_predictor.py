@@ -0,0 +1,416 @@
+"""
+Fast-Path Predictors for Smart Task Manager
+
+The fitted sklearn pipelines are convenient but slow for a single row:
+building a pandas DataFrame and going through ColumnTransformer column
+lookup costs more than the RandomForest itself. This module "compiles"
+an already-fitted pipeline into plain NumPy arrays:
+1. CompiledTfidf  - vocabulary + idf weights, pure-Python tokenizing
+2. CompiledForest - every tree's nodes packed into flat arrays and
+                    traversed for all trees at once with NumPy
+3. CompiledPriorityPredictor / CompiledTimePredictor - the two
+   pipelines the server uses, scoring raw Python values or arrays
+
+Predictions are identical to Pipeline.predict: the same float64 TF-IDF
+and scaling arithmetic, the same float32 cast before the tree
+comparisons, and the same tree-by-tree accumulation order.
+
+Every compiled predictor can also be reduced to state(): JSON metadata
+plus a dict of flat NumPy arrays, and rebuilt with from_state() (see
+model_artifact.py, which stores those arrays as memory-mappable files).
+
+Author: Gojo-Satoru-git
+"""
+
+import math
+
+import numpy as np
+
+from feature_schema import canonical_column, model_columns, numeric_matrix, priority_frame
+from metrics import span
+
+# Vectorizer settings that, with the vocabulary, fully determine a 'word' analyzer
+ANALYZER_PARAMS = ('lowercase', 'strip_accents', 'token_pattern', 'stop_words', 'ngram_range')
+
+
+class MappedVocabulary:
+    """
+    token -> column lookup over two flat arrays (sorted UTF-8 tokens and
+    their columns) instead of a dict, so it can live in a shared mmap.
+    """
+
+    def __init__(self, tokens, columns):
+        self.tokens = tokens
+        self.columns = columns
+
+    @classmethod
+    def from_dict(cls, vocabulary):
+        items = sorted((token.encode('utf-8'), col) for token, col in vocabulary.items())
+        return cls(np.array([token for token, _ in items], dtype=bytes),
+                   np.array([col for _, col in items], dtype=np.int32))
+
+    def get(self, token):
+        key = token.encode('utf-8')
+        i = int(np.searchsorted(self.tokens, key))
+        if i < len(self.tokens) and self.tokens[i] == key:
+            return int(self.columns[i])
+        return None
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __iter__(self):
+        return (token.decode('utf-8') for token in self.tokens)
+
+
+def floor_float32(values):
+    """
+    float64 -> the largest float32 <= each value. For float32 inputs x,
+    `x <= t` and `x <= floor_float32(t)` always agree, so thresholds
+    stored this way give exactly the same tree decisions at half the size.
+    """
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+class CompiledTfidf:
+    """Re-implements a fitted TfidfVectorizer.transform for the columns we need."""
+
+    def __init__(self, vectorizer):
+        if vectorizer.norm not in ('l2', 'l1', None):
+            raise ValueError(f"Unsupported TF-IDF norm: {vectorizer.norm!r}")
+        self.analyzer = vectorizer.build_analyzer()
+        self.vocabulary = dict(vectorizer.vocabulary_)
+        self.n_features = len(self.vocabulary)
+        self.idf = [float(v) for v in vectorizer.idf_] if vectorizer.use_idf else None
+        self.norm = vectorizer.norm
+        self.binary = vectorizer.binary
+        self.sublinear_tf = vectorizer.sublinear_tf
+        self.analyzer_params = ({name: getattr(vectorizer, name) for name in ANALYZER_PARAMS}
+                                if vectorizer.analyzer == 'word' and vectorizer.preprocessor is None
+                                and vectorizer.tokenizer is None else None)
+
+    def state(self):
+        if self.analyzer_params is None:
+            raise ValueError("Only the built-in 'word' analyzer can be stored as arrays")
+        params = dict(self.analyzer_params)
+        params['ngram_range'] = list(params['ngram_range'])
+        if params['stop_words'] is not None and not isinstance(params['stop_words'], str):
+            params['stop_words'] = sorted(params['stop_words'])
+        vocabulary = (self.vocabulary if isinstance(self.vocabulary, MappedVocabulary)
+                      else MappedVocabulary.from_dict(self.vocabulary))
+        meta = {'analyzer': params, 'n_features': self.n_features, 'norm': self.norm,
+                'binary': self.binary, 'sublinear_tf': self.sublinear_tf, 'use_idf': self.idf is not None}
+        arrays = {'vocab_tokens': vocabulary.tokens, 'vocab_columns': vocabulary.columns}
+        if self.idf is not None:
+            arrays['idf'] = np.asarray(self.idf, dtype=np.float64)
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        self = cls.__new__(cls)
+        params = dict(meta['analyzer'], ngram_range=tuple(meta['analyzer']['ngram_range']))
+        self.analyzer_params = params
+        self.analyzer = TfidfVectorizer(**params).build_analyzer()
+        self.vocabulary = MappedVocabulary(arrays['vocab_tokens'], arrays['vocab_columns'])
+        self.n_features = meta['n_features']
+        self.idf = arrays['idf'] if meta['use_idf'] else None
+        self.norm = meta['norm']
+        self.binary = meta['binary']
+        self.sublinear_tf = meta['sublinear_tf']
+        return self
+
+    def row(self, text):
+        """Returns [(column, value)] sorted by column, exactly like one CSR row."""
+        counts = {}
+        for token in self.analyzer(text):
+            col = self.vocabulary.get(token)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        entries = []
+        for col in sorted(counts):
+            value = 1.0 if self.binary else float(counts[col])
+            if self.sublinear_tf:
+                value = math.log(value) + 1.0
+            if self.idf is not None:
+                value = value * self.idf[col]
+            entries.append((col, value))
+        if self.norm and entries:
+            # Same sequential accumulation as sklearn's inplace row normalizers
+            total = 0.0
+            for _, value in entries:
+                total += value * value if self.norm == 'l2' else abs(value)
+            if self.norm == 'l2':
+                total = math.sqrt(total)
+            if total != 0.0:
+                entries = [(col, value / total) for col, value in entries]
+        return entries
+
+
+class CompiledForest:
+    """A fitted RandomForest{Classifier,Regressor} packed into flat NumPy arrays."""
+
+    def __init__(self, forest, used_features=None):
+        self.is_classifier = hasattr(forest, 'classes_')
+        self.classes_ = getattr(forest, 'classes_', None)
+        self.n_estimators = len(forest.estimators_)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n)
+            # Leaves point at themselves, so extra traversal steps are no-ops
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            if self.is_classifier:
+                value = tree.value[:, 0, :].astype(np.float64)
+                normalizer = value.sum(axis=1, keepdims=True)
+                normalizer[normalizer == 0.0] = 1.0
+                values.append(value / normalizer)
+            else:
+                values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        feature = np.concatenate(features).astype(np.intp)
+        # Only the features the trees split on need to be materialised
+        if used_features is None:
+            used_features = np.unique(feature)
+        self.used_features = np.asarray(used_features, dtype=np.intp)
+        remap = {int(f): i for i, f in enumerate(self.used_features)}
+        self.feature = np.array([remap[int(f)] for f in feature], dtype=np.intp)
+        self.threshold = np.concatenate(thresholds).astype(np.float64)
+        self.left = np.concatenate(lefts).astype(np.intp)
+        self.right = np.concatenate(rights).astype(np.intp)
+        self.children = np.stack([self.left, self.right], axis=1).ravel()
+        self.value = np.concatenate(values)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = max_depth
+        self.feature_index = remap
+
+    def state(self, float32_thresholds=False):
+        """Node arrays with int32 indices; float32_thresholds stores floor_float32(threshold)."""
+        meta = {'n_estimators': self.n_estimators, 'max_depth': self.max_depth,
+                'is_classifier': self.is_classifier, 'classes': None}
+        arrays = {
+            'feature': self.feature.astype(np.int32),
+            'threshold': floor_float32(self.threshold) if float32_thresholds else self.threshold,
+            'children': self.children.astype(np.int32),
+            'value': self.value,
+            'roots': self.roots.astype(np.int32),
+            'used_features': self.used_features.astype(np.int32),
+        }
+        if self.is_classifier:
+            meta['classes'] = self.classes_.tolist()
+            meta['classes_dtype'] = self.classes_.dtype.str if self.classes_.dtype != object else None
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        self = cls.__new__(cls)
+        self.is_classifier = meta['is_classifier']
+        self.classes_ = (np.array(meta['classes'], dtype=meta.get('classes_dtype') or object)
+                         if self.is_classifier else None)
+        self.n_estimators = meta['n_estimators']
+        self.max_depth = meta['max_depth']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.children = arrays['children']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.used_features = arrays['used_features']
+        self.feature_index = {int(f): i for i, f in enumerate(self.used_features)}
+        return self
+
+    def leaves(self, X):
+        """X: (n_samples, n_used_features) float32. Returns leaf ids, shape (n, n_trees)."""
+        n = X.shape[0]
+        X_flat = np.ascontiguousarray(X).ravel()
+        row_base = (np.arange(n, dtype=np.intp) * X.shape[1])[:, None]
+        nodes = np.broadcast_to(self.roots, (n, self.n_estimators)).copy()
+        for _ in range(self.max_depth):
+            # sklearn goes left when x <= threshold; leaves have threshold=inf
+            go_right = X_flat.take(row_base + self.feature.take(nodes)) > self.threshold.take(nodes)
+            nodes = self.children.take(nodes * 2 + go_right)
+        return nodes
+
+    def _accumulate(self, X):
+        # cumsum adds tree by tree, matching sklearn's `out += prediction` loop
+        per_tree = self.value[self.leaves(X)]
+        return np.cumsum(per_tree, axis=1)[:, -1] / self.n_estimators
+
+    def predict_proba(self, X):
+        return self._accumulate(X)
+
+    def predict(self, X):
+        if self.is_classifier:
+            return self.classes_.take(np.argmax(self._accumulate(X), axis=1), axis=0)
+        return self._accumulate(X)
+
+
+class CompiledTimePredictor:
+    """Fast path for the time model: Pipeline([tfidf, RandomForestRegressor])."""
+
+    def __init__(self, pipeline):
+        self.tfidf = CompiledTfidf(pipeline.named_steps['tfidf'])
+        self.forest = CompiledForest(pipeline.named_steps['regressor'])
+
+    def features(self, task_names):
+        index = self.forest.feature_index
+        X = np.zeros((len(task_names), len(index)), dtype=np.float64)
+        for i, name in enumerate(task_names):
+            for col, value in self.tfidf.row(name):
+                j = index.get(col)
+                if j is not None:
+                    X[i, j] = value
+        return X.astype(np.float32)
+
+    def predict(self, task_names):
+        with span('time_model.tfidf'):
+            X = self.features(list(task_names))
+        with span('time_model.forest'):
+            return self.forest.predict(X)
+
+    def state(self, float32_thresholds=False):
+        return _prefixed_state({}, tfidf=self.tfidf.state(), forest=self.forest.state(float32_thresholds))
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        self = cls.__new__(cls)
+        self.tfidf = CompiledTfidf.from_state(meta['tfidf'], _unprefixed(arrays, 'tfidf'))
+        self.forest = CompiledForest.from_state(meta['forest'], _unprefixed(arrays, 'forest'))
+        return self
+
+
+class CompiledPriorityPredictor:
+    """
+    Fast path for the priority model:
+    Pipeline([ColumnTransformer([num: StandardScaler, text: TF-IDF]), RandomForestClassifier])
+    """
+
+    def __init__(self, pipeline):
+        preprocessor = pipeline.named_steps['preprocessor']
+        num_columns = text_column = None
+        for name, _, columns in preprocessor.transformers_:
+            if name == 'num':
+                num_columns = list(columns)
+            elif name == 'text':
+                text_column = columns
+            elif name != 'remainder':
+                raise ValueError(f"Unexpected transformer in priority pipeline: {name!r}")
+        # Schema names, so models saved with legacy column names still compile
+        self.numeric_columns = [canonical_column(c) for c in num_columns]
+        self.text_column = canonical_column(text_column)
+        scaler = preprocessor.named_transformers_['num'].named_steps['scaler']
+        self.mean = scaler.mean_ if scaler.with_mean else np.zeros(len(num_columns))
+        self.scale = scaler.scale_ if scaler.with_std else np.ones(len(num_columns))
+        self.text_offset = preprocessor.output_indices_['text'].start
+        self.num_offset = preprocessor.output_indices_['num'].start
+        self.tfidf = CompiledTfidf(preprocessor.named_transformers_['text'].named_steps['tfidf'])
+        self.forest = CompiledForest(pipeline.named_steps['classifier'])
+        self.classes_ = self.forest.classes_
+
+    def features(self, task_names, numeric):
+        """numeric: (n, n_numeric) in self.numeric_columns order."""
+        index = self.forest.feature_index
+        numeric = (np.asarray(numeric, dtype=np.float64) - self.mean) / self.scale
+        X = np.zeros((len(task_names), len(index)), dtype=np.float64)
+        for k in range(numeric.shape[1]):
+            j = index.get(self.num_offset + k)
+            if j is not None:
+                X[:, j] = numeric[:, k]
+        for i, name in enumerate(task_names):
+            for col, value in self.tfidf.row(name):
+                j = index.get(self.text_offset + col)
+                if j is not None:
+                    X[i, j] = value
+        return X.astype(np.float32)
+
+    def predict(self, task_names, time_until_due_hours, time_estimate_min):
+        """Vectorized: three equal-length sequences (lists or NumPy arrays)."""
+        with span('priority_model.features'):
+            numeric = numeric_matrix(time_until_due_hours, time_estimate_min, self.numeric_columns)
+            X = self.features(list(task_names), numeric)
+        with span('priority_model.forest'):
+            return self.forest.predict(X)
+
+    def predict_one(self, task_name, time_until_due_hours, time_estimate_min):
+        return self.predict([task_name], [time_until_due_hours], [time_estimate_min])[0]
+
+    def state(self, float32_thresholds=False):
+        meta = {'numeric_columns': self.numeric_columns, 'text_column': self.text_column,
+                'text_offset': int(self.text_offset), 'num_offset': int(self.num_offset)}
+        meta, arrays = _prefixed_state(meta, tfidf=self.tfidf.state(), forest=self.forest.state(float32_thresholds))
+        arrays['mean'] = np.asarray(self.mean, dtype=np.float64)
+        arrays['scale'] = np.asarray(self.scale, dtype=np.float64)
+        return meta, arrays
+
+    @classmethod
+    def from_state(cls, meta, arrays):
+        self = cls.__new__(cls)
+        self.numeric_columns = list(meta['numeric_columns'])
+        self.text_column = meta['text_column']
+        self.text_offset = meta['text_offset']
+        self.num_offset = meta['num_offset']
+        self.mean = arrays['mean']
+        self.scale = arrays['scale']
+        self.tfidf = CompiledTfidf.from_state(meta['tfidf'], _unprefixed(arrays, 'tfidf'))
+        self.forest = CompiledForest.from_state(meta['forest'], _unprefixed(arrays, 'forest'))
+        self.classes_ = self.forest.classes_
+        return self
+
+
+def _prefixed_state(meta, **parts):
+    """Merges (meta, arrays) of sub-components: meta nested by name, arrays flattened as '<name>.<array>'."""
+    arrays = {}
+    for name, (part_meta, part_arrays) in parts.items():
+        meta[name] = part_meta
+        arrays.update({f'{name}.{key}': value for key, value in part_arrays.items()})
+    return meta, arrays
+
+
+def _unprefixed(arrays, name):
+    prefix = name + '.'
+    return {key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)}
+
+
+class PipelinePriorityPredictor:
+    """Fallback with the same interface, used if a pipeline cannot be compiled."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.classes_ = pipeline.classes_
+        self.columns = model_columns(pipeline)
+
+    def predict(self, task_names, time_until_due_hours, time_estimate_min):
+        with span('priority_model.sklearn'):
+            return self.pipeline.predict(priority_frame(task_names, time_until_due_hours, time_estimate_min, self.columns))
+
+    def predict_one(self, task_name, time_until_due_hours, time_estimate_min):
+        return self.predict([task_name], [time_until_due_hours], [time_estimate_min])[0]
+
+
+def compile_priority_model(pipeline):
+    try:
+        return CompiledPriorityPredictor(pipeline)
+    except (AttributeError, KeyError, ValueError) as e:
+        print(f"Priority fast path unavailable, using sklearn pipeline: {e}")
+        return PipelinePriorityPredictor(pipeline)
+
+
+def compile_time_model(pipeline):
+    try:
+        return CompiledTimePredictor(pipeline)
+    except (AttributeError, KeyError, ValueError) as e:
+        print(f"Time fast path unavailable, using sklearn pipeline: {e}")
+        return pipeline
@@ -0,0 +1,79 @@
+"""
+Feature Schema for Smart Task Manager
+
+The priority model was fed by four hand-written DataFrames that did not
+agree on column names (generate_data and ml_models/priority_model.py
+said predicted_time_min, parse-task and the retrain said
+time_estimate_min). This module owns the schema, and every script that
+trains or serves a model builds its features here:
+1. Columns - TEXT_COLUMN + NUMERIC_COLUMNS (in that order) for the
+   priority model, TEXT_COLUMN -> TIME_TARGET for the time model
+2. Numeric features - numeric_matrix() stacks time_until_due_hours and
+   time_estimate_min into one float64 (n, 2) array; hours_until_due()
+   is the single definition of the deadline feature
+3. sklearn input - priority_frame() wraps the same matrix in a DataFrame
+   with the columns a fitted pipeline was trained on, so artifacts saved
+   with the old predicted_time_min name keep working (COLUMN_ALIASES)
+
+benchmarks/feature_parity_check.py checks that the training matrix and
+both serving paths (compiled and sklearn) agree.
+
+Author: Gojo-Satoru-git
+"""
+
+from datetime import timezone
+
+import numpy as np
+
+TEXT_COLUMN = 'task_name'
+NUMERIC_COLUMNS = ('time_until_due_hours', 'time_estimate_min')
+PRIORITY_COLUMNS = (TEXT_COLUMN,) + NUMERIC_COLUMNS
+TIME_TARGET = 'actual_time_min'
+PRIORITY_TARGET = 'priority'
+
+# Older names for the same features (models trained before the schema existed)
+COLUMN_ALIASES = {'predicted_time_min': 'time_estimate_min'}
+
+NO_DEADLINE_HOURS = 24 * 7  # tasks without a due date count as due in a week
+
+
+def canonical_column(column):
+    """Maps a (possibly legacy) column name to its schema name; ValueError if unknown."""
+    column = COLUMN_ALIASES.get(column, column)
+    if column not in PRIORITY_COLUMNS:
+        raise ValueError(f"Unknown feature column: {column!r}")
+    return column
+
+
+def hours_until_due(due_date, reference):
+    """Hours from reference (creation time or now) to the deadline, >= 0. Naive datetimes are UTC."""
+    if not (due_date and reference):
+        return NO_DEADLINE_HOURS
+    if due_date.tzinfo is None:
+        due_date = due_date.replace(tzinfo=timezone.utc)
+    if reference.tzinfo is None:
+        reference = reference.replace(tzinfo=timezone.utc)
+    return max(0, (due_date - reference).total_seconds() / 3600)
+
+
+def numeric_matrix(time_until_due_hours, time_estimate_min, columns=NUMERIC_COLUMNS):
+    """(n, len(columns)) float64 numeric features in the given column order."""
+    values = {'time_until_due_hours': time_until_due_hours, 'time_estimate_min': time_estimate_min}
+    return np.column_stack([np.asarray(values[canonical_column(c)], dtype=np.float64).ravel()
+                            for c in columns])
+
+
+def model_columns(pipeline):
+    """The input columns a fitted sklearn pipeline expects (schema order if it does not say)."""
+    columns = getattr(pipeline, 'feature_names_in_', None)
+    return PRIORITY_COLUMNS if columns is None else tuple(columns)
+
+
+def priority_frame(task_names, time_until_due_hours, time_estimate_min, columns=PRIORITY_COLUMNS):
+    """The priority features as the DataFrame sklearn's ColumnTransformer selects from."""
+    import pandas as pd
+    numeric_columns = [c for c in columns if canonical_column(c) != TEXT_COLUMN]
+    numeric = numeric_matrix(time_until_due_hours, time_estimate_min, numeric_columns)
+    frame = {c: numeric[:, i] for i, c in enumerate(numeric_columns)}
+    frame[TEXT_COLUMN] = list(task_names)
+    return pd.DataFrame(frame, columns=list(columns))
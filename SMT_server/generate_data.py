@@ -12,24 +12,34 @@ The data is generated based on realistic task profiles with:
 - Random completion patterns
 - ML-predicted attributes
 
+Generation is vectorized so it scales to benchmark-sized histories:
+every (user, day, profile) draw, timestamp and duration is one NumPy
+array operation, each model predicts once per unique input, and rows
+are written with Core executemany inserts in batches.
+
+Usage (from SMT_server/):
+    python generate_data.py                       # 30 days, 1 user
+    python generate_data.py --days 365 --users 100 --seed 7
+
 Note: This script must be run from the same directory as app.py
 as it imports the database models and ML components.
 
 Author: Gojo-Satoru-git
 """
 
-import os
-import random
-import pandas as pd
-from datetime import datetime, time, timedelta, timezone
+import argparse
+import time as timer
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
 
 # --- IMPORTANT ---
 # This script MUST be in the same folder as app.py
 # It imports your app, models, and DB structure
-from app import (
-    app, db, Task, 
-    nlp, time_model, priority_model
-)
+from app import (app, db, Task, models, init_db, rebuild_completion_stats, rebuild_time_stats, expire_plans,
+                 DEFAULT_USER_ID)
+from feature_schema import NO_DEADLINE_HOURS, hours_until_due
+from prediction_cache import bucket_hours
 
 # --- Task Profile Templates ---
 """
@@ -61,154 +71,205 @@ TASK_PROFILES = [
     {'name': 'Get laundry', 'time_min': 25, 'time_max': 35, 'freq': 'urgent'},
 ]
 
-# --- 2. Helper function to run our ML models ---
+# Chance that a profile produces a task on a given day
+FREQ_PROBABILITY = {'daily': 1.0, 'daily_evening': 0.8, 'occasional': 0.3, 'urgent': 0.1}
+CONTEST_WEEKDAY = {'contest_sat': 5, 'contest_sun': 6}
+MY_DAY_PROBABILITY = 0.4
+
+PROFILE_NAMES = [p['name'] for p in TASK_PROFILES]
+PROFILE_TIME_MIN = np.array([p['time_min'] for p in TASK_PROFILES])
+PROFILE_TIME_MAX = np.array([p['time_max'] for p in TASK_PROFILES])
+PROFILE_IS_DAILY = np.array(['daily' in p['freq'] for p in TASK_PROFILES])
+PROFILE_IS_URGENT = np.array(['urgent' in p['freq'] for p in TASK_PROFILES])
+
+
+def profile_weekday_probability():
+    """(n_profiles, 7) chance of each profile producing a task on each weekday."""
+    probability = np.zeros((len(TASK_PROFILES), 7))
+    for i, profile in enumerate(TASK_PROFILES):
+        if profile['freq'] in FREQ_PROBABILITY:
+            probability[i, :] = FREQ_PROBABILITY[profile['freq']]
+        elif profile['freq'] in CONTEST_WEEKDAY:
+            probability[i, CONTEST_WEEKDAY[profile['freq']]] = 1.0
+    return probability
+
+
+# --- 2. Helper functions to run our ML models ---
 def get_ml_predictions(task_name, due_date, created_at):
     """
     Runs the ML models to get realistic predictions
     for our generated task.
     """
-    # 1. Time Prediction Model
-    predicted_time_raw = time_model.predict([task_name])[0]
+    # 1. Time Prediction Model (compiled fast path, no pandas)
+    predicted_time_raw = models.time_predictor.predict([task_name])[0]
     predicted_time_min = int(round(predicted_time_raw / 5.0) * 5.0)
 
-    # 2. Priority Prediction Model
-    if due_date:
-        time_diff_seconds = (due_date - created_at).total_seconds()
-        time_until_due_hours = max(0, time_diff_seconds / 3600)
-    else:
-        time_until_due_hours = 24 * 7 # 1 week
-    
-    priority_input_df = pd.DataFrame({
-        'task_name': [task_name],
-        'time_until_due_hours': [time_until_due_hours],
-        'predicted_time_min': [predicted_time_min]
-    })
-    predicted_priority = priority_model.predict(priority_input_df)[0]
+    # 2. Priority Prediction Model (the stored predicted_time_min is its time_estimate_min feature)
+    predicted_priority = str(models.priority_predictor.predict_one(
+        task_name, time_until_due_hours=hours_until_due(due_date, created_at),
+        time_estimate_min=predicted_time_min))
     
     return predicted_time_min, predicted_priority
 
+
+def batch_ml_predictions(profile_idx, due_hours):
+    """
+    Vectorized get_ml_predictions: the time model runs once per profile
+    and the priority model once per unique (profile, deadline bucket),
+    the same bucketing parse-task uses for its cache.
+    """
+    time_raw = models.time_predictor.predict(PROFILE_NAMES)
+    profile_time = (np.round(np.asarray(time_raw) / 5.0) * 5.0).astype(int)
+
+    unique_hours, hours_inverse = np.unique(due_hours, return_inverse=True)
+    hour_buckets = np.array([bucket_hours(h) for h in unique_hours])[hours_inverse]
+    keys = np.stack([profile_idx, hour_buckets]).T
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    key_profiles = unique_keys[:, 0].astype(int)
+    priorities = models.priority_predictor.predict(
+        [PROFILE_NAMES[i] for i in key_profiles], time_until_due_hours=unique_keys[:, 1].tolist(),
+        time_estimate_min=profile_time[key_profiles].tolist())
+    return profile_time[profile_idx], np.asarray(priorities).astype(str)[inverse.ravel()]
+
+
+def user_ids(users):
+    """The first simulated user is the default one (what the app sees without an X-User-Id header)."""
+    return [DEFAULT_USER_ID] + [f"user{i:05d}" for i in range(1, users)]
+
+
+def generate_history(now, days, users, rng):
+    """Column arrays for every completed task over the last `days` days, for `users` simulated users."""
+    today = np.datetime64(now.date(), 'D')
+    day_dates = today - np.arange(days, 0, -1)  # 30 days ago ... yesterday
+    weekdays = (day_dates.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    probability = profile_weekday_probability()[:, weekdays].T  # (days, profiles)
+
+    # --- Decide which tasks to create: one draw per (user, day, profile) ---
+    chosen = rng.random((users, days, len(TASK_PROFILES))) < probability
+    user_idx, day_idx, profile_idx = np.nonzero(chosen)
+    n = len(profile_idx)
+
+    # --- Create realistic timestamps ---
+    # Created at a random time between 8:00 and 20:59 on that day
+    minute_of_day = rng.integers(8, 21, n) * 60 + rng.integers(0, 60, n)
+    day_start = day_dates[day_idx].astype('datetime64[m]')
+    created_at = day_start + minute_of_day.astype('timedelta64[m]')
+    # Completed 'actual_time_taken' minutes later
+    actual_time_taken = rng.integers(PROFILE_TIME_MIN[profile_idx], PROFILE_TIME_MAX[profile_idx] + 1)
+    completed_at = created_at + actual_time_taken.astype('timedelta64[m]')
+
+    # Daily tasks are due at 23:59 that day, urgent ones a day later, the rest never
+    due_date = np.full(n, np.datetime64('NaT'), dtype='datetime64[m]')
+    is_daily = PROFILE_IS_DAILY[profile_idx]
+    is_urgent = PROFILE_IS_URGENT[profile_idx]
+    due_date[is_daily] = day_start[is_daily] + np.timedelta64(23 * 60 + 59, 'm')
+    due_date[is_urgent] = created_at[is_urgent] + np.timedelta64(1, 'D')
+
+    due_hours = np.full(n, float(NO_DEADLINE_HOURS))
+    has_due = ~np.isnat(due_date)
+    due_hours[has_due] = np.maximum(0, (due_date[has_due] - created_at[has_due]).astype(np.int64) / 60)
+
+    # Randomly add to "My Day"
+    my_day_date = np.where(rng.random(n) < MY_DAY_PROBABILITY,
+                           created_at.astype('datetime64[D]'), np.datetime64('NaT', 'D'))
+
+    predicted_time, predicted_priority = batch_ml_predictions(profile_idx, due_hours)
+    return {
+        'user_id': np.array(user_ids(users), dtype=object)[user_idx],
+        'task_name': np.array(PROFILE_NAMES, dtype=object)[profile_idx],
+        'due_date': due_date,
+        'predicted_time_min': predicted_time,
+        'predicted_priority': predicted_priority,
+        'created_at': created_at,
+        'completed_at': completed_at,
+        'updated_at': completed_at,
+        'actual_time_taken_min': actual_time_taken,
+        'my_day_date': my_day_date,
+    }
+
+
+def to_python(values):
+    """NumPy column -> list of Python values (datetime64 -> datetime/date, NaT -> None)."""
+    if np.issubdtype(values.dtype, np.datetime64):
+        unit = 'D' if values.dtype == np.dtype('datetime64[D]') else 'us'
+        return values.astype(f'datetime64[{unit}]').astype(object).tolist()
+    return values.tolist()
+
+
+def insert_columns(columns, batch_size, **constants):
+    """
+    Core executemany INSERT of column arrays, batch_size rows per statement.
+    Only the current batch is ever converted to Python objects.
+    """
+    names = list(columns)
+    n = len(columns[names[0]]) if names else 0
+    insert = Task.__table__.insert()
+    for start in range(0, n, batch_size):
+        batch = [to_python(columns[name][start:start + batch_size]) for name in names]
+        rows = [dict(zip(names, values), **constants) for values in zip(*batch)]
+        db.session.execute(insert, rows)
+    return n
+
+
 # --- 3. Main Data Generation Function ---
-def generate_data():
+def generate_data(days=30, users=1, seed=None, batch_size=50000):
     print("Starting data generation...")
+    rng = np.random.default_rng(seed)
+    started = timer.perf_counter()
     
     # This ensures we're working inside the Flask app context
     with app.app_context():
+        init_db()
+
         # --- 4. Clear old data ---
         print("Clearing old tasks...")
         db.session.query(Task).delete()
         db.session.commit()
 
         # --- 5. Generate historical "Completed" tasks ---
-        print("Generating 30 days of historical 'completed' tasks...")
-        
+        print(f"Generating {days} days of historical 'completed' tasks for {users} user(s)...")
         now = datetime.now(timezone.utc)
-        
-        for days_ago in range(30, 0, -1): # Loop from 30 days ago up to yesterday
-            # Get the date for this day
-            day = now - timedelta(days=days_ago)
-            
-            for profile in TASK_PROFILES:
-                # --- Decide if we should create this task ---
-                create_task = False
-                if profile['freq'] == 'daily':
-                    create_task = True
-                elif profile['freq'] == 'daily_evening' and random.random() < 0.8: # 80% chance
-                    create_task = True
-                elif profile['freq'] == 'occasional' and random.random() < 0.3: # 30% chance
-                    create_task = True
-                elif profile['freq'] == 'urgent' and random.random() < 0.1: # 10% chance
-                    create_task = True
-                elif profile['freq'] == 'contest_sat' and day.weekday() == 5: # 5 = Saturday
-                    create_task = True
-                elif profile['freq'] == 'contest_sun' and day.weekday() == 6: # 6 = Sunday
-                    create_task = True
-
-                if create_task:
-                    # --- 6. Create realistic timestamps ---
-                    
-                    # Created at a random time on that day
-                    rand_hour = random.randint(8, 20)
-                    rand_minute = random.randint(0, 59)
-                    created_at = day.replace(hour=rand_hour, minute=rand_minute, second=0, microsecond=0)
-                    
-                    # Calculate actual time taken
-                    actual_time_taken = random.randint(profile['time_min'], profile['time_max'])
-                    
-                    # Completed 'actual_time_taken' minutes later
-                    completed_at = created_at + timedelta(minutes=actual_time_taken)
-                    
-                    # Calculate a realistic due date
-                    due_date = None
-                    if 'daily' in profile['freq']:
-                        due_date = created_at.replace(hour=23, minute=59)
-                    elif 'urgent' in profile['freq']:
-                        due_date = created_at + timedelta(days=1)
-                    
-                    # --- 7. Run ML Models ---
-                    pred_time, pred_priority = get_ml_predictions(profile['name'], due_date, created_at)
-                    
-                    # Randomly add to "My Day"
-                    my_day = created_at.date() if random.random() < 0.4 else None # 40% chance
-                    
-                    # --- 8. Create and Add Task to DB ---
-                    task = Task(
-                        task_name=profile['name'],
-                        due_date=due_date,
-                        predicted_time_min=pred_time,
-                        predicted_priority=pred_priority,
-                        status='completed',
-                        created_at=created_at,
-                        completed_at=completed_at,
-                        actual_time_taken_min=actual_time_taken,
-                        my_day_date=my_day
-                    )
-                    db.session.add(task)
-
-        # --- 9. Generate "Pending" tasks for today ---
+        history = generate_history(now, days, users, rng)
+        n_completed = insert_columns(history, batch_size, status='completed')
+        print(f"Inserted {n_completed} completed tasks ({timer.perf_counter() - started:.1f}s).")
+
+        # --- 6. Generate "Pending" tasks for today ---
         print("Generating 'pending' tasks for today and tomorrow...")
-        
-        # Leetcode contest (Sunday 8am)
-        contest_due = now.replace(hour=8, minute=0)
-        pred_time, pred_prio = get_ml_predictions("Join Leetcode contest", contest_due, now)
-        db.session.add(Task(
-            task_name="Join Leetcode contest", due_date=contest_due,
-            predicted_time_min=pred_time, predicted_priority=pred_prio,
-            my_day_date=now.date() # Add to My Day
-        ))
-
-        # AI Lab Record (Due tomorrow)
-        lab_due = (now + timedelta(days=1)).replace(hour=17, minute=0)
-        pred_time, pred_prio = get_ml_predictions("Submit AI lab record", lab_due, now)
-        db.session.add(Task(
-            task_name="Submit AI lab record", due_date=lab_due,
-            predicted_time_min=pred_time, predicted_priority=pred_prio
-        ))
-        
-        # Get laundry (Due today)
-        laundry_due = now.replace(hour=22, minute=0)
-        pred_time, pred_prio = get_ml_predictions("Get laundry", laundry_due, now)
-        db.session.add(Task(
-            task_name="Get laundry", due_date=laundry_due,
-            predicted_time_min=pred_time, predicted_priority=pred_prio,
-            my_day_date=now.date() # Add to My Day
-        ))
-        
-        # Call mom (Daily)
-        call_due = now.replace(hour=23, minute=0)
-        pred_time, pred_prio = get_ml_predictions("Call mom", call_due, now)
-        db.session.add(Task(
-            task_name="Call mom", due_date=call_due,
-            predicted_time_min=pred_time, predicted_priority=pred_prio,
-            my_day_date=now.date() # Add to My Day
-        ))
-
-        # --- 10. Commit all changes ---
+        naive_now = now.replace(tzinfo=None)
+        pending = [
+            # (name, due date, add to My Day)
+            ("Join Leetcode contest", now.replace(hour=8, minute=0), True), # Leetcode contest (Sunday 8am)
+            ("Submit AI lab record", (now + timedelta(days=1)).replace(hour=17, minute=0), False), # Due tomorrow
+            ("Get laundry", now.replace(hour=22, minute=0), True), # Due today
+            ("Call mom", now.replace(hour=23, minute=0), True), # Daily
+        ]
+        rows = []
+        for task_name, due_date, my_day in pending:
+            pred_time, pred_prio = get_ml_predictions(task_name, due_date, now)
+            rows.append({'task_name': task_name, 'due_date': due_date.replace(tzinfo=None),
+                         'predicted_time_min': pred_time, 'predicted_priority': pred_prio,
+                         'my_day_date': now.date() if my_day else None, 'status': 'pending',
+                         'created_at': naive_now, 'updated_at': naive_now})
+        db.session.execute(Task.__table__.insert(), [dict(row, user_id=user_id)
+                                                     for user_id in user_ids(users) for row in rows])
+
+        # --- 7. Commit all changes ---
+        db.session.commit()
+        rebuild_completion_stats()
+        rebuild_time_stats()
+        expire_plans()  # every user is re-planned on next use; running servers drop their cached plans
         db.session.commit()
         print("---------------------------------")
-        print("✅ Success! Database has been populated.")
+        print(f"✅ Success! Database has been populated in {timer.perf_counter() - started:.1f}s.")
         print("---------------------------------")
 
 
-# --- 11. Run the function ---
+# --- 8. Run the function ---
 if __name__ == "__main__":
-    generate_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--days', type=int, default=30, help='days of completed history')
+    parser.add_argument('--users', type=int, default=1, help='simulated users, each with its own history and user_id (the first is the default user)')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for a reproducible dataset')
+    parser.add_argument('--batch-size', type=int, default=50000, help='rows per INSERT executemany')
+    args = parser.parse_args()
+    generate_data(days=args.days, users=args.users, seed=args.seed, batch_size=args.batch_size)
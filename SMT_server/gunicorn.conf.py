@@ -0,0 +1,39 @@
+"""
+Gunicorn Configuration for Smart Task Manager
+
+Production serving mode (the `python app.py` dev server is a single
+process with the reloader):
+1. preload_app - the master imports wsgi.py, so spaCy, the joblib models
+   and the compiled predictors are loaded once and shared copy-on-write
+   by every forked worker instead of being loaded per worker
+2. gc.freeze() before forking moves the preloaded objects out of the
+   garbage collector's reach, so collections in a worker do not touch
+   (and copy) the shared pages
+3. Workers, threads, bind address and timeout come from SMT_WORKERS,
+   SMT_THREADS, SMT_BIND and SMT_WORKER_TIMEOUT
+
+Usage (from SMT_server/):
+    gunicorn -c gunicorn.conf.py wsgi:app
+    SMT_WORKERS=4 gunicorn -c gunicorn.conf.py wsgi:app
+
+Author: Gojo-Satoru-git
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('SMT_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('SMT_WORKERS', 2 * multiprocessing.cpu_count() + 1))
+threads = int(os.environ.get('SMT_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('SMT_WORKER_TIMEOUT', 30))
+preload_app = True
+accesslog = os.environ.get('SMT_ACCESS_LOG')  # e.g. '-' for stdout; off by default
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker forks
+    gc.freeze()
+    server.log.info(f"Models preloaded; forking {workers} worker(s).")
+
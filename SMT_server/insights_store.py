@@ -0,0 +1,102 @@
+"""
+Insights Store for Smart Task Manager
+
+/api/v1/insights used to load every completed task, build a DataFrame
+and run StandardScaler + KMeans on each call. Instead, the server now
+keeps an incremental completion histogram (7 days x 24 hours, split by
+priority) that complete_task updates in the same transaction. This
+module turns that histogram into the insight:
+1. Daily summary and per-cluster counts are read straight from the
+   histogram (168 bins, independent of history size)
+2. Weighted KMeans (slot_clustering.py) is only refit when the
+   histogram's shape has changed meaningfully since the last fit;
+   otherwise the cached bin -> cluster assignment is reused
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+import threading
+from datetime import timezone
+
+import numpy as np
+
+from slot_clustering import weighted_slot_kmeans
+
+MIN_COMPLETED = 3
+
+
+def completion_slot(completed_at):
+    """(day_of_week, hour_of_day) in UTC. Naive DB datetimes are already UTC."""
+    if completed_at.tzinfo is None:
+        completed_at = completed_at.replace(tzinfo=timezone.utc)
+    else:
+        completed_at = completed_at.astimezone(timezone.utc)
+    return completed_at.weekday(), completed_at.hour
+
+
+def histogram_distance(a, b):
+    """Total-variation distance between two histograms' normalized shapes (0..1)."""
+    a_total, b_total = a.sum(), b.sum()
+    if not a_total or not b_total:
+        return 1.0
+    return 0.5 * float(np.abs(a / a_total - b / b_total).sum())
+
+
+class InsightsStore:
+    """Caches the last clustering and refits only on meaningful histogram change."""
+
+    def __init__(self, tolerance=None):
+        # Refit when more than `tolerance` of the distribution's mass has moved
+        self.tolerance = tolerance if tolerance is not None else float(os.environ.get('SMT_INSIGHTS_TOLERANCE', 0.02))
+        self.fits = 0
+        self._fitted_counts = None
+        self._bin_labels = None
+        self._centers = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._fitted_counts = None
+
+    def _clusters(self, counts):
+        with self._lock:
+            stale = (self._fitted_counts is None
+                     or histogram_distance(counts, self._fitted_counts) > self.tolerance)
+            if stale:
+                self._bin_labels, self._centers = weighted_slot_kmeans(counts, n_clusters=2)
+                self._fitted_counts = counts.copy()
+                self.fits += 1
+            return self._bin_labels, self._centers
+
+    def summarize(self, priority_histograms):
+        """
+        priority_histograms: {priority: int array of shape (168,)}.
+        Returns None if there is not enough data, else a dict with
+        day_counts, main_center, task_count and priority_habit.
+        """
+        if not priority_histograms:
+            return None
+        counts = np.sum(list(priority_histograms.values()), axis=0)
+        if counts.sum() < MIN_COMPLETED:
+            return None
+        day_counts = counts.reshape(7, 24).sum(axis=1)
+
+        bin_labels, centers = self._clusters(counts)
+        cluster_sizes = np.bincount(bin_labels, weights=counts, minlength=len(centers))
+        main_cluster = int(np.argmax(cluster_sizes))
+        in_cluster = bin_labels == main_cluster
+
+        # Most common priority in the main cluster (ties -> alphabetical, like pandas mode)
+        priority_habit = "tasks"
+        best = 0
+        for priority in sorted(priority_histograms):
+            n = int(priority_histograms[priority][in_cluster].sum())
+            if n > best:
+                priority_habit, best = priority, n
+        return {
+            'day_counts': [int(c) for c in day_counts],
+            'main_center': centers[main_cluster],
+            'task_count': int(cluster_sizes[main_cluster]),
+            'priority_habit': priority_habit,
+        }
@@ -0,0 +1,224 @@
+"""
+Metrics for Smart Task Manager
+
+Timing instrumentation for the hot paths, exported in the Prometheus
+text format at GET /metrics:
+1. Request middleware - every request's wall time, labelled by Flask
+   endpoint, method and status (smt_request_duration_seconds); recorded
+   at teardown, so requests whose view raised count as 500s
+2. Named spans - `with span('time_model.forest'):` around each model
+   call, spaCy / date parsing, KMeans fits, the allocator and training
+   stages (smt_span_duration_seconds{span=...})
+3. Database - every SQL statement by verb (db.select, db.begin, ...)
+   and every session commit (db.commit), from SQLAlchemy events
+
+Histograms have fixed buckets: an observation is one bisect plus three
+additions under a lock. Numbers are per process (each gunicorn worker
+reports its own).
+
+SMT_METRICS=0 turns everything off: span() hands back one shared no-op
+context manager, no hooks or events are installed and /metrics is not
+registered.
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+METRICS_ENABLED = os.environ.get('SMT_METRICS', '1').lower() in ('1', 'true', 'yes')
+
+# Seconds; the last bucket (+Inf) is implicit
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_METRIC = 'smt_request_duration_seconds'
+SPAN_METRIC = 'smt_span_duration_seconds'
+_HELP = {
+    REQUEST_METRIC: 'HTTP request wall time by endpoint, method and status.',
+    SPAN_METRIC: 'Wall time of named hot-path stages (models, parsing, database, clustering).',
+}
+
+
+class Histogram:
+    """Cumulative-on-export histogram over fixed buckets."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Registry:
+    """Histogram families keyed by (metric name, label values)."""
+
+    def __init__(self):
+        self._histograms = {}  # (name, ((label, value), ...)) -> Histogram
+        self._lock = threading.Lock()
+
+    def histogram(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def clear(self):
+        """Zeroes every histogram (they stay registered, so cached references keep working)."""
+        with self._lock:
+            for histogram in self._histograms.values():
+                with histogram._lock:
+                    histogram.counts = [0] * len(histogram.counts)
+                    histogram.sum = 0.0
+                    histogram.count = 0
+
+    def render(self):
+        """All histograms in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        current = None
+        # A copy taken under the lock: a new label set registering mid-render would change the dict's size
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        for (name, labels), histogram in histograms:
+            if name != current:
+                current = name
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            counts, total, count = histogram.snapshot()
+            label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, n in zip(histogram.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{label_text}}} {total!r}")
+            lines.append(f"{name}_count{{{label_text}}} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+# --- Spans ---
+class _Span:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+_NULL_SPAN = nullcontext()
+_span_histograms = {}
+
+
+def _span_histogram(name):
+    histogram = _span_histograms.get(name)
+    if histogram is None:
+        histogram = _span_histograms[name] = registry.histogram(SPAN_METRIC, span=name)
+    return histogram
+
+
+def span(name):
+    """Context manager timing one named stage; a shared no-op when metrics are off."""
+    if not METRICS_ENABLED:
+        return _NULL_SPAN
+    return _Span(_span_histogram(name))
+
+
+def observe_span(name, seconds):
+    """Records a stage timed elsewhere (e.g. StageTimer)."""
+    if METRICS_ENABLED:
+        _span_histogram(name).observe(seconds)
+
+
+# --- Flask and SQLAlchemy hooks ---
+def instrument_app(app):
+    """Request timing middleware plus GET /metrics (nothing when metrics are off)."""
+    if not METRICS_ENABLED:
+        return
+    from flask import g, request
+
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    def note_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    def record_request(exc):
+        # Teardown runs even when a view raised (after_request may not): those are the 500s
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            status = 500 if exc is not None else g.pop('metrics_status', 500)
+            registry.histogram(REQUEST_METRIC, endpoint=request.endpoint or 'unmatched',
+                               method=request.method, status=status
+                               ).observe(time.perf_counter() - start)
+
+    # First, so the timer also covers the other before_request hooks
+    app.before_request_funcs.setdefault(None, []).insert(0, start_request_timer)
+    app.after_request(note_status)
+    app.teardown_request(record_request)
+
+    @app.route('/metrics', methods=['GET'])
+    def get_metrics():
+        return app.response_class(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+def instrument_db(engine, session_class):
+    """Spans for every SQL statement (by verb) and every session commit."""
+    if not METRICS_ENABLED:
+        return
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['metrics_start'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop('metrics_start', None)
+        if start is not None:
+            verb = statement.split(None, 1)[0].lower() if statement else 'unknown'
+            _span_histogram(f'db.{verb}').observe(time.perf_counter() - start)
+
+    @event.listens_for(session_class, 'before_commit')
+    def before_commit(session):
+        session.info['metrics_commit'] = time.perf_counter()
+
+    @event.listens_for(session_class, 'after_commit')
+    def after_commit(session):
+        start = session.info.pop('metrics_commit', None)
+        if start is not None:
+            observe_span('db.commit', time.perf_counter() - start)
@@ -1,18 +1,19 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-import joblib
 import os
+import sys
+
+import joblib
+import pandas as pd
+
+# The feature schema and pipeline definition are shared with the server (SMT_server/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_schema import PRIORITY_COLUMNS, PRIORITY_TARGET, TEXT_COLUMN, priority_frame  # noqa: E402
+from training_pipeline import create_priority_pipeline  # noqa: E402
 
 # --- 1. Mock Training Data ---
 # This data is "multi-featured"
 # In a real app, you'd calculate 'time_until_due_hours' when the user completes a task.
 data = {
-    'task_name': [
+    TEXT_COLUMN: [
         'Submit OS assignment', 'Finish project report', 'Call mom', 'Debug the main feature',
         'Grocery shopping', 'Submit OS assignment', 'Call mom', 'Email Professor Smith',
         'Plan the new sprint', 'Finish project report'
@@ -20,47 +21,24 @@ data = {
     'time_until_due_hours': [
         4, 24, 48, 8, 20, 168, 1, 72, 36, 1
     ],
-    'predicted_time_min': [
+    'time_estimate_min': [
         120, 180, 10, 240, 60, 120, 10, 15, 50, 180
     ],
     # This is our "y" variable (the target)
-    'priority': [
+    PRIORITY_TARGET: [
         'High', 'High', 'Medium', 'High', 'Low', 'Low', 'High', 'Medium', 'Medium', 'Critical'
     ]
 }
 df = pd.DataFrame(data)
 
 # Define our features (X) and target (y)
-X = df[['task_name', 'time_until_due_hours', 'predicted_time_min']]
-y = df['priority']
+X = df[list(PRIORITY_COLUMNS)]
+y = df[PRIORITY_TARGET]
 
 # --- 2. Define the Model Pipeline ---
-# This pipeline is more complex because we have mixed data (text + numbers)
-
-# Define numeric features
-numeric_features = ['time_until_due_hours', 'predicted_time_min']
-numeric_transformer = Pipeline(steps=[
-    ('scaler', StandardScaler()) # Scale numeric features
-])
-
-# Define text features
-text_features = 'task_name'
-text_transformer = Pipeline(steps=[
-    ('tfidf', TfidfVectorizer(stop_words='english')) # Vectorize text
-])
-
-# Use ColumnTransformer to apply different transformers to different columns
-preprocessor = ColumnTransformer(
-    transformers=[
-        ('num', numeric_transformer, numeric_features),
-        ('text', text_transformer, text_features)
-    ])
-
-# Create the full pipeline with our classifier
-model_pipeline = Pipeline(steps=[
-    ('preprocessor', preprocessor),
-    ('classifier', RandomForestClassifier(random_state=42))
-])
+# Mixed data (text + numbers): StandardScaler on NUMERIC_COLUMNS, TF-IDF on TEXT_COLUMN,
+# the same pipeline the server's retrain fits (training_pipeline.py)
+model_pipeline = create_priority_pipeline()
 
 # --- 3. Train the Model ---
 print("Training the priority prediction model...")
@@ -74,11 +52,10 @@ joblib.dump(model_pipeline, model_path)
 print(f"Model saved to {model_path}")
 
 # --- 5. Test the Model (optional) ---
-test_data = pd.DataFrame({
-    'task_name': ['Debug a new bug', 'Write an email', 'Work on the assignment'],
-    'time_until_due_hours': [2, 72, 200], # 2 hours, 3 days, ~8 days
-    'predicted_time_min': [120, 15, 90]
-})
+test_data = priority_frame(
+    ['Debug a new bug', 'Write an email', 'Work on the assignment'],
+    time_until_due_hours=[2, 72, 200], # 2 hours, 3 days, ~8 days
+    time_estimate_min=[120, 15, 90])
 predictions = model_pipeline.predict(test_data)
 for i, row in test_data.iterrows():
-    print(f"Prediction for '{row['task_name']}' (due in {row['time_until_due_hours']}h): {predictions[i]}")
\ No newline at end of file
+    print(f"Prediction for '{row[TEXT_COLUMN]}' (due in {row['time_until_due_hours']}h): {predictions[i]}")
\ No newline at end of file
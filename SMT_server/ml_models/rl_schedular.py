@@ -1,5 +1,6 @@
 import tensorflow as tf
 import os
+import sys
 import numpy as np
 
 # All the imports we need
@@ -10,12 +11,16 @@ from tf_agents.specs import array_spec
 from tf_agents.utils import common
 from tf_agents.trajectories import time_step as ts
 
+# The vectorized calendars are shared with the server's slot policy (SMT_server/slot_policy.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from slot_policy import N_SLOTS, OBS_SIZE, VectorCalendarEnv  # noqa: E402
 
 
 
 class CalendarEnv(py_environment.PyEnvironment):
 
     def __init__(self):
+        super().__init__()
         # State: 168 hours in a week (7*24)
         # 0 = empty, 1 = full
         self._observation_spec = array_spec.BoundedArraySpec(
@@ -55,10 +60,59 @@ class CalendarEnv(py_environment.PyEnvironment):
         self._episode_ended = True
         return ts.termination(self._state, reward=reward)
 
+
+class BatchedCalendarEnv(py_environment.PyEnvironment):
+    """
+    batch_size calendars as one (batch_size, 168) array, all stepped by
+    one call (slot_policy.VectorCalendarEnv). An episode places a whole
+    pending list of tasks_per_episode tasks, one per step; observations
+    are the busy hours plus the current task. Without history rewards
+    every free hour is worth 1, like CalendarEnv's free / taken rewards.
+    """
+
+    def __init__(self, rewards=None, minutes=(30, 60, 90, 120), batch_size=64, tasks_per_episode=5, seed=42):
+        super().__init__(handle_auto_reset=True)
+        if rewards is None:
+            rewards = np.ones((2, N_SLOTS), dtype=np.float32)
+        self._env = VectorCalendarEnv(rewards, minutes, n_envs=batch_size,
+                                      tasks_per_episode=tasks_per_episode, seed=seed)
+        self._observation_spec = array_spec.BoundedArraySpec(
+            shape=(OBS_SIZE,), dtype=np.float32, minimum=0, maximum=1, name='calendar'
+        )
+        self._action_spec = array_spec.BoundedArraySpec(
+            shape=(), dtype=np.int32, minimum=0, maximum=N_SLOTS - 1, name='choose_slot'
+        )
+
+    @property
+    def batched(self):
+        return True
+
+    @property
+    def batch_size(self):
+        return self._env.n_envs
+
+    def action_spec(self):
+        return self._action_spec
+
+    def observation_spec(self):
+        return self._observation_spec
+
+    def _reset(self):
+        return ts.restart(self._env.reset(), batch_size=self.batch_size)
+
+    def _step(self, action):
+        observation, reward, done = self._env.step(action)
+        # Episodes end together; the base class resets on the next step
+        if done.all():
+            return ts.termination(observation, reward)
+        return ts.transition(observation, reward)
+
+
 # --- 2. Build the Agent (No Saving) ---
-def create_agent():
+def create_agent(batch_size=None):
+    """batch_size: train on that many BatchedCalendarEnv calendars instead of one CalendarEnv."""
     print("Setting up RL environment...")
-    train_py_env = CalendarEnv()
+    train_py_env = CalendarEnv() if batch_size is None else BatchedCalendarEnv(batch_size=batch_size)
     train_env = tf_py_environment.TFPyEnvironment(train_py_env)
 
     # Define the Neural Network
@@ -79,10 +133,10 @@ def create_agent():
     )
     agent.initialize()
     print("Agent initialized successfully in memory.")
-    return agent
+    return agent, train_env
 
 
 if __name__ == '__main__':
     print("--- Testing Agent Creation ---")
-    agent = create_agent()
+    agent, train_env = create_agent()
     print("--- Test Complete. Agent is buildable. ---")
\ No newline at end of file
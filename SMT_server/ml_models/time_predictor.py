@@ -1,21 +1,25 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.pipeline import Pipeline
-import joblib # For saving the model
 import os
+import sys
+
+import joblib # For saving the model
+import pandas as pd
+
+# The feature schema and pipeline definition are shared with the server (SMT_server/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_schema import TEXT_COLUMN, TIME_TARGET  # noqa: E402
+from training_pipeline import create_time_pipeline  # noqa: E402
 
 # --- 1. Mock Training Data ---
 # In a real app, this data would come from your user's task history.
 data = {
-    'task_name': [
+    TEXT_COLUMN: [
         'Submit OS assignment', 'Finish project report', 'Call mom',
         'Write proposal', 'Debug the main feature', 'Team meeting',
         'Review documentation', 'Email Professor Smith', 'Grocery shopping',
         'Finalize presentation slides', 'Plan the new sprint'
     ],
     # Time in minutes
-    'actual_time_min': [
+    TIME_TARGET: [
         120, 180, 10, 90, 240, 60, 45, 15, 60, 75, 50
     ]
 }
@@ -25,15 +29,12 @@ df = pd.DataFrame(data)
 # We'll create a "pipeline" that does two things:
 # 1. TfidfVectorizer: Converts task names (text) into numbers (vectors).
 # 2. RandomForestRegressor: A good "out-of-the-box" regression model.
-model_pipeline = Pipeline([
-    ('tfidf', TfidfVectorizer(stop_words='english')),
-    ('regressor', RandomForestRegressor(n_estimators=10, random_state=42))
-])
+model_pipeline = create_time_pipeline()
 
 # --- 3. Train the Model ---
 print("Training the time prediction model...")
 # We train the pipeline to predict 'actual_time_min' from 'task_name'
-model_pipeline.fit(df['task_name'], df['actual_time_min'])
+model_pipeline.fit(df[TEXT_COLUMN], df[TIME_TARGET])
 print("Model training complete.")
 
 # --- 4. Save the Model ---
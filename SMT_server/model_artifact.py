@@ -0,0 +1,148 @@
+"""
+Memory-Mappable Model Artifacts for Smart Task Manager
+
+A joblib pickle is unpickled into private memory, so every worker
+process that loads time_predictor.joblib / priority_model.joblib (or a
+retrained version) holds its own copy of the forests and the TF-IDF
+vocabulary. This module stores the compiled predictors (fast_predictor)
+as a directory of plain NumPy buffers instead:
+1. <name>.npmodel/manifest.json - format version, predictor kind and
+   the small metadata (analyzer settings, classes, offsets, depths)
+2. <name>.npmodel/<array>.npy - tree node arrays (int32 features and
+   children, thresholds, leaf values), the sorted vocabulary with its
+   columns and the idf / scaler vectors, each one contiguous buffer
+3. load_mapped() opens them with np.load(mmap_mode='r'): the pages come
+   from the OS page cache, so every worker mapping the same artifact
+   shares one copy, and nothing is unpickled
+
+Thresholds are stored as float32 by default (SMT_MAPPED_FLOAT32=1),
+rounded down so the tree decisions on float32 features are unchanged.
+ModelStore.save() writes the directory next to every new .joblib
+artifact (SMT_MAPPED_MODELS=0 turns both writing and loading off), and
+`python model_artifact.py` converts the shipped models in ml_models/.
+benchmarks/artifact_report.py reports artifact sizes and worker memory.
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MAPPED_SUFFIX = '.npmodel'
+MANIFEST = 'manifest.json'
+MAPPED_ENABLED = os.environ.get('SMT_MAPPED_MODELS', '1').lower() in ('1', 'true', 'yes')
+FLOAT32_THRESHOLDS = os.environ.get('SMT_MAPPED_FLOAT32', '1').lower() in ('1', 'true', 'yes')
+
+
+def mapped_path(path):
+    """ml_models/versions/time_model-....joblib -> ml_models/versions/time_model-....npmodel"""
+    return os.path.splitext(path)[0] + MAPPED_SUFFIX
+
+
+def has_mapped(path):
+    return MAPPED_ENABLED and os.path.isfile(os.path.join(mapped_path(path), MANIFEST))
+
+
+def _predictor_classes():
+    from fast_predictor import CompiledPriorityPredictor, CompiledTimePredictor
+    return {'time': CompiledTimePredictor, 'priority': CompiledPriorityPredictor}
+
+
+# --- 1. Writing ---
+def save_mapped(predictor, path, float32_thresholds=FLOAT32_THRESHOLDS):
+    """Writes a compiled predictor to the directory `path` (built aside, then renamed into place)."""
+    kinds = {cls: kind for kind, cls in _predictor_classes().items()}
+    meta, arrays = predictor.state(float32_thresholds)
+    parent = os.path.dirname(path) or '.'
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp-', suffix=MAPPED_SUFFIX)
+    try:
+        shapes = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            np.save(os.path.join(tmp_dir, name + '.npy'), array, allow_pickle=False)
+            shapes[name] = {'dtype': array.dtype.str, 'shape': list(array.shape)}
+        manifest = {'format': FORMAT_VERSION, 'kind': kinds[type(predictor)],
+                    'float32_thresholds': bool(float32_thresholds), 'meta': meta, 'arrays': shapes}
+        with open(os.path.join(tmp_dir, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        # A directory cannot be renamed over a non-empty one: move the old one aside first
+        old_dir = None
+        if os.path.exists(path):
+            old_dir = tempfile.mkdtemp(dir=parent, prefix='.old-')
+            os.replace(path, os.path.join(old_dir, 'artifact'))
+        os.replace(tmp_dir, path)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return path
+
+
+def export_pipeline(pipeline, path, float32_thresholds=FLOAT32_THRESHOLDS):
+    """
+    Compiles a fitted time / priority pipeline and saves it to `path`.
+    Returns the path, or None if the pipeline has no compiled form.
+    """
+    from fast_predictor import compile_priority_model, compile_time_model
+    steps = getattr(pipeline, 'named_steps', {})
+    if 'regressor' in steps:
+        predictor = compile_time_model(pipeline)
+    elif 'classifier' in steps:
+        predictor = compile_priority_model(pipeline)
+    else:
+        return None
+    if type(predictor) not in _predictor_classes().values():
+        return None
+    try:
+        return save_mapped(predictor, path, float32_thresholds)
+    except ValueError as e:  # e.g. a custom analyzer
+        print(f"Mapped artifact not written for {os.path.basename(path)}: {e}")
+        return None
+
+
+# --- 2. Loading ---
+def load_mapped(path, mmap=True):
+    """Compiled predictor from a .npmodel directory; arrays are read-only memory maps unless mmap=False."""
+    with open(os.path.join(path, MANIFEST), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported mapped artifact format: {manifest.get('format')!r}")
+    arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r' if mmap else None,
+                            allow_pickle=False)
+              for name in manifest['arrays']}
+    return _predictor_classes()[manifest['kind']].from_state(manifest['meta'], arrays)
+
+
+def artifact_size(path):
+    """Bytes on disk of a .joblib file or a .npmodel directory."""
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    return os.path.getsize(path)
+
+
+# --- 3. Converting the shipped models ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('paths', nargs='*', help='joblib pipelines (default: the shipped ml_models/*.joblib)')
+    parser.add_argument('--float64', action='store_true', help='keep float64 thresholds')
+    args = parser.parse_args()
+
+    import joblib
+    models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ml_models')
+    paths = args.paths or [os.path.join(models_dir, name) for name in ('time_predictor.joblib', 'priority_model.joblib')]
+    for path in paths:
+        written = export_pipeline(joblib.load(path), mapped_path(path), float32_thresholds=not args.float64)
+        if written:
+            print(f"{path} ({artifact_size(path) / 1024:.0f} KB) -> {written} ({artifact_size(written) / 1024:.0f} KB)")
+        else:
+            print(f"{path}: no compiled form, skipped")
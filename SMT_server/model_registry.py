@@ -0,0 +1,389 @@
+"""
+Lazy Model Registry for Smart Task Manager
+
+Holds every heavy ML dependency the server needs and loads each one
+on first use instead of at import time:
+1. spaCy NLP pipeline (en_core_web_sm, NER only)
+2. Time prediction model (time_predictor.joblib)
+3. Priority prediction model (priority_model.joblib)
+4. Slot policy for smart-schedule (slot_policy.py: NumPy weights,
+   trained offline by train_slot_policy.py; absent until one is published)
+5. RL scheduling agent (TensorFlow / TF-Agents, opt-in only)
+
+Importing app.py (directly, or through generate_data.py and
+retrain_prioritymodel.py) therefore costs only Flask + SQLAlchemy.
+TensorFlow is never imported unless the RL path is enabled with
+the SMT_ENABLE_RL=1 environment variable.
+
+The joblib models are resolved through the versioned ModelStore
+(model_store.py); refresh() hot-swaps them when another process
+publishes a new version. The compiled predictors the endpoints use are
+memory-mapped from the artifact's .npmodel directory when it has one
+(model_artifact.py), so serving a prediction never unpickles the
+pipeline and all workers share the same pages; the sklearn pipelines
+themselves then load only if something asks for them (the batch
+endpoint).
+
+UserModelRegistry adds per-user time / priority models on top: a
+bounded LRU of the users whose own models were trained, with every
+other user (and every lookup miss) served by the global models.
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import observe_span
+from model_artifact import has_mapped, load_mapped, mapped_path
+from model_store import ModelStore
+
+MODEL_POLL_SEC = float(os.environ.get('SMT_MODEL_POLL_SEC', 2))
+USER_MODEL_CACHE = int(os.environ.get('SMT_USER_MODEL_CACHE', 32))
+SLOT_POLICY_ENABLED = os.environ.get('SMT_SLOT_POLICY', '1').lower() in ('1', 'true', 'yes')
+
+
+def rl_enabled():
+    """True when the TF-Agents RL agent should be built (endpoints use the NumPy slot policy instead)."""
+    return os.environ.get('SMT_ENABLE_RL', '0').lower() in ('1', 'true', 'yes')
+
+
+class ModelRegistry:
+    """Loads models on first access and keeps them for the process lifetime."""
+
+    def __init__(self, base_dir, state_dir=None):
+        """base_dir: where the shipped models live; state_dir: where retrains publish (default: base_dir)."""
+        self.base_dir = base_dir
+        self.state_dir = state_dir or base_dir
+        self.time_model_path = os.path.join(base_dir, 'ml_models', 'time_predictor.joblib')
+        self.priority_model_path = os.path.join(base_dir, 'ml_models', 'priority_model.joblib')
+        self.store = ModelStore(os.path.join(self.state_dir, 'ml_models'))
+        self._models = {}
+        self._artifacts = {}  # name -> artifact it was loaded from (None = shipped file), predictors included
+        self._swap_listeners = []
+        # Reentrant: derived loaders (compiled predictors) get() their source model
+        self._lock = threading.RLock()
+        self._pointer_mtime = self.store.pointer_mtime()
+        self._next_poll = 0.0
+        self._reloading = False
+
+    # --- Loaders (imports stay local so nothing heavy loads at import) ---
+    def _load_nlp(self):
+        from task_parser import load_ner
+        return load_ner()
+
+    def _load_artifact(self, name, default_path):
+        import joblib
+        artifact, path = self.store.resolve(name, default_path)
+        model = joblib.load(path)
+        self._artifacts[name] = artifact
+        return model
+
+    def _load_time_model(self):
+        model = self._load_artifact('time_model', self.time_model_path)
+        print("Time prediction model loaded.")
+        return model
+
+    def _load_priority_model(self):
+        model = self._load_artifact('priority_model', self.priority_model_path)
+        print("Priority prediction model loaded.")
+        return model
+
+    # Compiled fast-path predictors: memory-mapped if the artifact has a
+    # .npmodel directory, otherwise compiled from the fitted pipeline
+    def _load_predictor(self, name, source, default_path, compile_model):
+        artifact, path = self.store.resolve(source, default_path)
+        if has_mapped(path):
+            try:
+                predictor = load_mapped(mapped_path(path))
+                self._artifacts[name] = artifact
+                return predictor
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Could not map {mapped_path(path)}, compiling {source} instead: {e}")
+        predictor = compile_model(self.get(source))
+        self._artifacts[name] = self._artifacts.get(source)
+        return predictor
+
+    def _load_time_predictor(self):
+        from fast_predictor import compile_time_model
+        return self._load_predictor('time_predictor', 'time_model', self.time_model_path, compile_time_model)
+
+    def _load_priority_predictor(self):
+        from fast_predictor import compile_priority_model
+        return self._load_predictor('priority_predictor', 'priority_model', self.priority_model_path,
+                                    compile_priority_model)
+
+    def _load_slot_policy(self):
+        # False (not None) when there is none, so get() caches the miss until a policy is published
+        artifact, path = self.store.resolve('slot_policy', None)
+        self._artifacts['slot_policy'] = artifact
+        if path is None or not SLOT_POLICY_ENABLED:
+            return False
+        from slot_policy import SlotPolicy
+        policy = SlotPolicy.load(path)
+        print("Slot policy loaded.")
+        return policy
+
+    def _load_rl_agent(self):
+        if not rl_enabled():
+            raise RuntimeError("RL agent is disabled. Set SMT_ENABLE_RL=1 to enable it.")
+        from ml_models.rl_schedular import create_agent
+        return create_agent()
+
+    _loaders = {
+        'nlp': _load_nlp,
+        'time_model': _load_time_model,
+        'priority_model': _load_priority_model,
+        'time_predictor': _load_time_predictor,
+        'priority_predictor': _load_priority_predictor,
+        'slot_policy': _load_slot_policy,
+        'rl_agent': _load_rl_agent,
+    }
+
+    # Derived entries are dropped (and recompiled lazily) when their source is swapped
+    _derived = {
+        'time_model': ('time_predictor',),
+        'priority_model': ('priority_predictor',),
+    }
+
+    def get(self, name):
+        """Returns the named model, loading it (once, thread-safe) if needed."""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                model = self._loaders[name](self)
+                self._models[name] = model
+        return model
+
+    def set(self, name, model, artifact=None):
+        """Swaps a model in memory (e.g. after retraining) and notifies listeners."""
+        if name not in self._loaders:
+            raise KeyError(name)
+        with self._lock:
+            self._models[name] = model
+            if artifact is not None:
+                self._artifacts[name] = artifact
+            for derived in self._derived.get(name, ()):
+                self._models.pop(derived, None)
+        for listener in self._swap_listeners:
+            listener(name, model)
+
+    def on_swap(self, listener):
+        """Registers listener(name, model), called after every set()."""
+        self._swap_listeners.append(listener)
+
+    def refresh(self):
+        """
+        Hot-swaps loaded models whose pointer entry changed. Cheap enough
+        to call on every request: it stats the pointer file at most once
+        per SMT_MODEL_POLL_SEC, and new artifacts are loaded on a
+        background thread while the current models keep serving; a failed
+        reload is retried on the next poll.
+        """
+        now = time.monotonic()
+        if now < self._next_poll or self._reloading:
+            return
+        self._next_poll = now + MODEL_POLL_SEC
+        mtime = self.store.pointer_mtime()
+        if mtime == self._pointer_mtime:
+            return
+        artifacts = self.store.read_pointer().get('artifacts', {})
+        stale = [name for name, artifact in artifacts.items()
+                 if any(loaded in self._models and self._artifacts.get(loaded) != artifact
+                        for loaded in (name, *self._derived.get(name, ())))]
+        if stale:
+            self._reloading = True
+            threading.Thread(target=self._reload, args=(stale, mtime), daemon=True).start()
+        else:
+            self._pointer_mtime = mtime
+
+    def _reload(self, names, mtime):
+        """Swaps in the new artifacts; the pointer only counts as seen once all of them loaded."""
+        start = time.perf_counter()
+        try:
+            for name in names:
+                artifact, _ = self.store.resolve(name, None)
+                if name in self._models:
+                    # The loader records the new artifact. Derived predictors are dropped too;
+                    # they are rebuilt from the new artifact on next use
+                    self.set(name, self._loaders[name](self))
+                else:
+                    # Only the (mapped) predictors are in use: map the new ones, never unpickle
+                    for derived in self._derived.get(name, ()):
+                        if derived in self._models:
+                            self.set(derived, self._loaders[derived](self))
+                print(f"Hot-swapped {name} to {artifact}.")
+            self._pointer_mtime = mtime
+            observe_span('models.reload', time.perf_counter() - start)
+        except Exception:
+            # Counted in smt_span_duration_seconds{span="models.reload_failed"}; the next poll retries
+            observe_span('models.reload_failed', time.perf_counter() - start)
+        finally:
+            self._reloading = False
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    @property
+    def scope(self):
+        """Prediction-cache scope; the cache is cleared whenever a global model is swapped."""
+        return 'global'
+
+    def preload(self, names=('nlp', 'time_model', 'priority_model')):
+        """Eagerly loads the given models (used by the benchmark and servers)."""
+        for name in names:
+            self.get(name)
+
+    # --- Convenience accessors used by the endpoints ---
+    @property
+    def nlp(self):
+        return self.get('nlp')
+
+    @property
+    def time_model(self):
+        return self.get('time_model')
+
+    @property
+    def priority_model(self):
+        return self.get('priority_model')
+
+    @property
+    def time_predictor(self):
+        """Compiled, pandas-free version of time_model (identical predictions)."""
+        return self.get('time_predictor')
+
+    @property
+    def priority_predictor(self):
+        """Compiled, pandas-free version of priority_model (identical predictions)."""
+        return self.get('priority_predictor')
+
+    @property
+    def slot_policy(self):
+        """Trained SlotPolicy for smart-schedule, or None if none is published."""
+        return self.get('slot_policy') or None
+
+    @property
+    def rl_agent(self):
+        """Returns (agent, tf_env). Only available when SMT_ENABLE_RL=1."""
+        return self.get('rl_agent')
+
+
+class UserModels:
+    """
+    One user's compiled predictors plus their fitted pipelines (same
+    interface as ModelRegistry). Built either from just-fitted pipelines
+    or from artifact paths; from paths, the predictors are memory-mapped
+    when possible and each pipeline is unpickled only on first access.
+    """
+
+    def __init__(self, user_id, version, fitted=None, paths=None):
+        from fast_predictor import compile_priority_model, compile_time_model
+        self.scope = (user_id, version)
+        self._fitted = dict(fitted or {})
+        self._paths = paths or {}
+        self._lock = threading.Lock()
+        self.time_predictor = self._predictor('time_model', compile_time_model)
+        self.priority_predictor = self._predictor('priority_model', compile_priority_model)
+
+    def _predictor(self, name, compile_model):
+        path = self._paths.get(name)
+        if name not in self._fitted and path and has_mapped(path):
+            return load_mapped(mapped_path(path))
+        return compile_model(self._pipeline(name))
+
+    def _pipeline(self, name):
+        with self._lock:
+            if name not in self._fitted:
+                import joblib
+                self._fitted[name] = joblib.load(self._paths[name])
+            return self._fitted[name]
+
+    @property
+    def time_model(self):
+        return self._pipeline('time_model')
+
+    @property
+    def priority_model(self):
+        return self._pipeline('priority_model')
+
+
+class UserModelRegistry:
+    """
+    Per-user models with bounded memory. get(user_id) returns the user's
+    UserModels, or the global registry if the user has none. At most
+    `capacity` users are kept (least recently used are evicted and
+    reloaded on their next request), and each user's published version
+    is looked up at most once per SMT_MODEL_POLL_SEC.
+
+    lookup(user_id) -> (version, {'time_model': artifact, 'priority_model': artifact}) or None
+    is supplied by the server (it reads the UserModel table).
+    """
+
+    MODEL_NAMES = ('time_model', 'priority_model')
+
+    def __init__(self, global_models, lookup, capacity=USER_MODEL_CACHE, poll_sec=MODEL_POLL_SEC):
+        self.global_models = global_models
+        self.lookup = lookup
+        self.capacity = capacity
+        self.poll_sec = poll_sec
+        self.store = ModelStore(os.path.join(global_models.state_dir, 'ml_models', 'users'))
+        self._entries = OrderedDict()  # user_id -> [version, UserModels or None, next_check]
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and now < entry[2]:
+                self._entries.move_to_end(user_id)
+                return entry[1] or self.global_models
+        found = self.lookup(user_id)
+        if found is None:
+            user_models = None
+        elif entry is not None and entry[0] == found[0] and entry[1] is not None:
+            user_models = entry[1]
+        else:
+            user_models = self._load(user_id, *found)
+        self._put(user_id, found[0] if found else None, user_models, now)
+        return user_models or self.global_models
+
+    def _load(self, user_id, version, artifacts):
+        try:
+            paths = {name: os.path.join(self.store.models_dir, artifacts[name]) for name in self.MODEL_NAMES}
+            user_models = UserModels(user_id, version, paths=paths)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Could not load models of user {user_id} (using the global ones): {e}")
+            return None
+        self.loads += 1
+        return user_models
+
+    def _put(self, user_id, version, user_models, now):
+        with self._lock:
+            self._entries[user_id] = [version, user_models, now + self.poll_sec]
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def save(self, user_id, fitted):
+        """Writes new artifacts for the user's models. Returns {name: artifact}."""
+        return {name: self.store.save(f"{user_id}__{name}", fitted[name]) for name in self.MODEL_NAMES}
+
+    def set(self, user_id, version, fitted, artifacts):
+        """Makes a just-published version current in this process and prunes the user's old artifacts."""
+        self._put(user_id, version, UserModels(user_id, version, fitted={name: fitted[name] for name in self.MODEL_NAMES}),
+                  time.monotonic())
+        self.store.prune(artifacts, names={f"{user_id}__{name}" for name in self.MODEL_NAMES})
+
+    def stats(self):
+        with self._lock:
+            loaded = sum(1 for entry in self._entries.values() if entry[1] is not None)
+        return {'users_cached': len(self._entries), 'users_with_models': loaded,
+                'capacity': self.capacity, 'loads': self.loads, 'evictions': self.evictions}
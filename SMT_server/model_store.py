@@ -0,0 +1,146 @@
+"""
+Versioned Model Store for Smart Task Manager
+
+Retraining used to joblib.dump straight over time_predictor.joblib, so
+a crash (or a worker restarting) mid-write could load a truncated file,
+and only the process that ran the retrain ever saw the new model. The
+store fixes both:
+1. Every artifact is written to a temp file in the same directory and
+   renamed into place (os.replace is atomic), under a unique versioned
+   name in ml_models/versions/ - existing files are never overwritten
+2. ml_models/model_versions.json is the model-version pointer: it maps
+   each model name to its current artifact and is replaced atomically
+   once all artifacts of a retrain are on disk
+3. Workers watch the pointer (ModelRegistry.refresh) and hot-swap to
+   the new artifacts while the old models keep serving
+
+Models without a pointer entry fall back to the files shipped in
+ml_models/ (time_predictor.joblib, priority_model.joblib).
+
+Next to each .joblib artifact, save() also writes the compiled
+predictor as a memory-mappable .npmodel directory (model_artifact.py),
+which workers load instead of unpickling the pipeline. The smart-schedule
+slot policy (slot_policy.py) is versioned the same way, as an .npz of
+its weights (save_policy).
+
+Author: Gojo-Satoru-git
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
+from model_artifact import MAPPED_ENABLED, export_pipeline, mapped_path
+
+KEEP_VERSIONS = int(os.environ.get('SMT_MODEL_KEEP_VERSIONS', 3))
+POLICY_SUFFIX = '.npz'
+
+
+def atomic_write(path, write):
+    """Calls write(file) on a temp file next to path, then renames it over path."""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path, data):
+    atomic_write(path, lambda f: f.write(json.dumps(data, indent=2).encode('utf-8')))
+
+
+class ModelStore:
+    """Versioned joblib artifacts plus the pointer file that selects the live ones."""
+
+    def __init__(self, models_dir, keep=KEEP_VERSIONS):
+        self.models_dir = models_dir
+        self.versions_dir = os.path.join(models_dir, 'versions')
+        self.pointer_path = os.path.join(models_dir, 'model_versions.json')
+        self.keep = keep
+
+    def read_pointer(self):
+        """{'version': int, 'published_at': str, 'artifacts': {name: relative path}} (empty if none)."""
+        try:
+            with open(self.pointer_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def pointer_mtime(self):
+        try:
+            return os.stat(self.pointer_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def resolve(self, name, default_path):
+        """(artifact, absolute path) of the live version of `name`; artifact is None for the shipped file."""
+        artifact = self.read_pointer().get('artifacts', {}).get(name)
+        if artifact is None:
+            return None, default_path
+        return artifact, os.path.join(self.models_dir, artifact)
+
+    def new_artifact(self, name, suffix):
+        """Unique relative path for a new version of `name` (the versions dir is created)."""
+        os.makedirs(self.versions_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        return os.path.join('versions', f"{name}-{stamp}-{uuid.uuid4().hex[:8]}{suffix}")
+
+    def save(self, name, model):
+        """Writes a new artifact (never overwriting one) and returns its relative path."""
+        import joblib
+        artifact = self.new_artifact(name, '.joblib')
+        path = os.path.join(self.models_dir, artifact)
+        atomic_write(path, lambda f: joblib.dump(model, f))
+        if MAPPED_ENABLED:
+            # Written before the pointer is published, so readers never see half of it
+            export_pipeline(model, mapped_path(path))
+        return artifact
+
+    def save_policy(self, name, policy):
+        """Writes a SlotPolicy's weights as a new .npz artifact and returns its relative path."""
+        artifact = self.new_artifact(name, POLICY_SUFFIX)
+        atomic_write(os.path.join(self.models_dir, artifact), policy.save)
+        return artifact
+
+    def publish(self, artifacts, **meta):
+        """Points the given names at their new artifacts (others keep theirs). Returns the new version."""
+        pointer = self.read_pointer()
+        merged = dict(pointer.get('artifacts', {}))
+        merged.update(artifacts)
+        version = pointer.get('version', 0) + 1
+        atomic_write_json(self.pointer_path, {
+            'version': version,
+            'published_at': datetime.now(timezone.utc).isoformat(),
+            'artifacts': merged,
+            **meta,
+        })
+        self.prune(merged)
+        return version
+
+    def prune(self, live_artifacts, names=None):
+        """Keeps the newest `keep` artifacts per model (and always the live ones), optionally only for `names`."""
+        if not os.path.isdir(self.versions_dir):
+            return
+        live = {os.path.basename(a) for a in live_artifacts.values()}
+        by_name = {}
+        for filename in os.listdir(self.versions_dir):
+            if filename.endswith(('.joblib', POLICY_SUFFIX)):
+                by_name.setdefault(filename.rsplit('-', 2)[0], []).append(filename)
+        for name, filenames in by_name.items():
+            if names is not None and name not in names:
+                continue
+            for filename in sorted(filenames, reverse=True)[self.keep:]:
+                if filename not in live:
+                    path = os.path.join(self.versions_dir, filename)
+                    os.remove(path)
+                    shutil.rmtree(mapped_path(path), ignore_errors=True)
@@ -0,0 +1,57 @@
+"""
+Online Time Model for Smart Task Manager
+
+The time predictor is a TF-IDF + RandomForest that only learns when
+/api/v1/retrain refits it on the whole history. With online learning
+enabled (SMT_ONLINE_TIME=1), every complete_task feedback event also
+updates a running estimate for that task name in O(1), and predictions
+blend the two:
+1. Running stats per normalized task name: a count and a mean that is
+   an exact average for the first SMT_ONLINE_WINDOW completions and an
+   exponential moving average after that, so habits can drift
+2. Blend: (prior * forest + n * mean) / (prior + n), so a name seen
+   once barely moves the forest's guess and a name seen often is
+   driven by the user's own history (SMT_ONLINE_PRIOR_WEIGHT = prior)
+
+Full refits become optional: the stats carry new feedback until the
+next retrain, and unseen names still get the forest's prediction.
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+
+ONLINE_ENABLED = os.environ.get('SMT_ONLINE_TIME', '0').lower() in ('1', 'true', 'yes')
+PRIOR_WEIGHT = float(os.environ.get('SMT_ONLINE_PRIOR_WEIGHT', 3))
+WINDOW = int(os.environ.get('SMT_ONLINE_WINDOW', 50))
+
+
+def running_update(count, mean, value, window=WINDOW):
+    """One feedback event: returns the new (count, mean). O(1)."""
+    count += 1
+    mean += (value - mean) / min(count, window)
+    return count, mean
+
+
+def blend(forest_minutes, count, mean, prior_weight=PRIOR_WEIGHT):
+    """Shrinks the per-name mean towards the forest's prediction."""
+    if not count:
+        return forest_minutes
+    return (prior_weight * forest_minutes + count * mean) / (prior_weight + count)
+
+
+class RunningTimeStats:
+    """In-memory {name: (count, mean)} (the server keeps the same numbers in the TimeStat table)."""
+
+    def __init__(self, window=WINDOW, prior_weight=PRIOR_WEIGHT):
+        self.window = window
+        self.prior_weight = prior_weight
+        self.stats = {}
+
+    def update(self, name, minutes):
+        count, mean = self.stats.get(name, (0, 0.0))
+        self.stats[name] = running_update(count, mean, minutes, self.window)
+
+    def predict(self, name, forest_minutes):
+        count, mean = self.stats.get(name, (0, 0.0))
+        return blend(forest_minutes, count, mean, self.prior_weight)
@@ -0,0 +1,119 @@
+"""
+Prediction Cache for Smart Task Manager
+
+The TaskModalScreen calls /api/v1/parse-task on every typing pause, so
+the same (or nearly the same) text is parsed over and over. This module
+provides a small bounded LRU + TTL cache and a PredictionCache that
+memoizes the three expensive steps of parse_task:
+1. spaCy entity extraction   - keyed on whitespace-normalized text
+2. Time model prediction     - keyed on the lower-cased task name
+3. Priority model prediction - keyed on (task name, time estimate,
+                               bucketed time_until_due_hours)
+
+dateparser is NOT cached because relative dates ("tomorrow") depend on
+the current time. Model caches are cleared when a model is retrained.
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional per-entry time-to-live."""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# --- Key helpers ---
+def normalize_text(text):
+    """Collapses whitespace. Case is kept because spaCy NER is case-sensitive."""
+    return ' '.join(text.split())
+
+
+def normalize_task_name(task_name):
+    """The TF-IDF vectorizers lower-case their input, so the models are case-blind."""
+    return ' '.join(task_name.lower().split())
+
+
+def bucket_hours(hours):
+    """
+    Buckets time_until_due_hours so nearby deadlines share a cache entry:
+    1h steps up to 2 days, 6h steps up to 1 week, 24h steps beyond.
+    The bucket value itself is what gets fed to the priority model.
+    """
+    if hours <= 48:
+        return float(round(hours))
+    if hours <= 168:
+        return float(round(hours / 6.0) * 6)
+    return float(round(hours / 24.0) * 24)
+
+
+class PredictionCache:
+    """Groups the per-stage caches used by parse_task."""
+
+    def __init__(self, maxsize=None, ttl=None):
+        maxsize = maxsize or int(os.environ.get('SMT_CACHE_SIZE', 2048))
+        ttl = ttl if ttl is not None else float(os.environ.get('SMT_CACHE_TTL', 3600))
+        self.entities = LRUCache(maxsize, ttl)
+        self.time = LRUCache(maxsize, ttl)
+        self.priority = LRUCache(maxsize, ttl)
+
+    def invalidate_models(self):
+        """Called after retraining: cached model outputs are no longer valid."""
+        self.time.clear()
+        self.priority.clear()
+
+    def stats(self):
+        return {
+            'entities': self.entities.stats(),
+            'time': self.time.stats(),
+            'priority': self.priority.stats(),
+        }
@@ -0,0 +1,134 @@
+"""
+Profile Store for Smart Task Manager
+
+The productivity profile (user_profile.json, written by the retrain)
+used to be opened and parsed every time the scheduler built an
+allocator, and a missing or malformed file went through the exception
+path on every call. The store keeps it in memory instead:
+1. The file is parsed once into a Profile: the deep / shallow work
+   slots plus their precomputed hour-of-week NumPy masks, which the
+   SlotAllocator uses as-is
+2. refresh() (called once per request, like ModelRegistry.refresh)
+   stats the file at most once per SMT_PROFILE_POLL_SEC and re-parses
+   it only when its mtime or size changed - a bad file is reported once
+   and served as the empty profile until it changes again
+3. save() bumps the profile's version, writes it atomically (temp file
+   + rename) and swaps the in-memory copy, so the writing process never
+   waits for the next poll
+
+Scheduling reads store.current and never touches the disk. Users with
+their own profile row (multi-user mode) get a Profile built from the
+row instead; the file is the shared fallback.
+
+Author: Gojo-Satoru-git
+"""
+
+import json
+import os
+import threading
+import time
+
+from model_store import atomic_write_json
+from scheduler import slots_to_mask
+
+PROFILE_POLL_SEC = float(os.environ.get('SMT_PROFILE_POLL_SEC', 2))
+
+
+class Profile:
+    """
+    Parsed profile; `key` changes whenever the content may have changed.
+    stamp: the file's mtime, or the updated_at of a per-user profile row.
+    personal: True for a user's own (retrained) profile row, False for user_profile.json.
+    """
+
+    def __init__(self, data=None, stamp=None, personal=False):
+        data = data or {}
+        self.personal = personal
+        self.version = int(data.get('version', 0))
+        self.last_trained = data.get('last_trained')
+        self.deep_slots = self._slots(data.get('deep_work_slots'))
+        self.shallow_slots = self._slots(data.get('shallow_work_slots'))
+        self.deep_mask = slots_to_mask(self.deep_slots)
+        self.shallow_mask = slots_to_mask(self.shallow_slots)
+        # Shared by every allocator: make accidental writes fail loudly
+        self.deep_mask.flags.writeable = False
+        self.shallow_mask.flags.writeable = False
+        self.key = (self.version, stamp)
+
+    @staticmethod
+    def _slots(slots):
+        if not isinstance(slots, list):
+            return ()
+        return tuple(s for s in slots if isinstance(s, int) and not isinstance(s, bool))
+
+    def to_dict(self):
+        return {'version': self.version, 'last_trained': self.last_trained,
+                'deep_work_slots': list(self.deep_slots), 'shallow_work_slots': list(self.shallow_slots)}
+
+
+class ProfileStore:
+    """In-memory user_profile.json, re-read only when the file changes."""
+
+    def __init__(self, path, poll_sec=PROFILE_POLL_SEC):
+        self.path = path
+        self.poll_sec = poll_sec
+        self._lock = threading.Lock()
+        self._profile = None
+        self._stat = None
+        self._next_poll = 0.0
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, stat):
+        if stat is None:
+            return Profile()
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("profile must be a JSON object")
+            return Profile(data, stamp=stat[0])
+        except (OSError, ValueError) as e:
+            print(f"Error loading user profile (using an empty one until it changes): {e}")
+            return Profile(stamp=stat[0])
+
+    @property
+    def current(self):
+        """The cached Profile (loaded on first use)."""
+        if self._profile is None:
+            with self._lock:
+                if self._profile is None:
+                    self._stat = self._file_stat()
+                    self._profile = self._load(self._stat)
+                    self._next_poll = time.monotonic() + self.poll_sec
+        return self._profile
+
+    def refresh(self):
+        """Reloads the profile if another process rewrote the file. At most one stat per poll interval."""
+        now = time.monotonic()
+        if self._profile is None or now < self._next_poll:
+            return
+        self._next_poll = now + self.poll_sec
+        stat = self._file_stat()
+        if stat == self._stat:
+            return
+        with self._lock:
+            self._stat = stat
+            self._profile = self._load(stat)
+
+    def save(self, data):
+        """Atomically writes a new profile version and makes it current. Returns the Profile."""
+        with self._lock:
+            current = self._profile
+            if current is None:
+                current = self._load(self._file_stat())
+            data = dict(data, version=current.version + 1)
+            atomic_write_json(self.path, data)
+            self._stat = self._file_stat()
+            self._profile = Profile(data, stamp=self._stat[0] if self._stat else None)
+            return self._profile
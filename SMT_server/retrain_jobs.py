@@ -0,0 +1,57 @@
+"""
+Retrain Job Queue for Smart Task Manager
+
+POST /api/v1/retrain used to fit every model inside the request
+thread. It now only records a RetrainJob row and hands its id to
+this queue:
+1. Jobs run on a small worker pool (SMT_RETRAIN_WORKERS threads,
+   default 1), so requests return immediately with a job id
+2. Job state lives in the database, so any server process can answer
+   GET /api/v1/retrain/<job_id>
+3. Finished models are published through the versioned ModelStore and
+   every process hot-swaps to them (see model_registry.refresh)
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+# A queued/running job older than this is assumed lost (e.g. its process died)
+JOB_TIMEOUT = timedelta(seconds=int(os.environ.get('SMT_RETRAIN_TIMEOUT_SEC', 3600)))
+
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+
+class RetrainQueue:
+    """Runs run_job(job_id) on a worker pool; errors are left to run_job to record."""
+
+    def __init__(self, run_job, max_workers=None):
+        self.run_job = run_job
+        self.max_workers = max_workers or int(os.environ.get('SMT_RETRAIN_WORKERS', 1))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, job_id):
+        # Created on first use so importing the app never starts threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='retrain')
+            return self._executor.submit(self.run_job, job_id)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
@@ -0,0 +1,276 @@
+"""
+Calendar Allocator for Smart Task Manager
+
+Engine behind /api/v1/smart-schedule. The planning horizon (one or more
+weeks starting Monday 00:00 UTC) is split into cells of a configurable
+granularity (15, 30 or 60 minutes), and every task occupies a
+contiguous run of cells covering its predicted duration:
+1. A segment tree (FreeRunTree) over 64-cell blocks of the free mask
+   tracks the longest free run, so "is there room for an N-cell task,
+   and where is the earliest one?" is answered by walking O(log cells)
+   nodes plus one block scan; placing a task re-pulls only the nodes
+   above the blocks it touches
+2. Tasks are placed earliest-deadline-first (EDF); tasks without a
+   deadline go last, ties broken by task id
+3. Candidate start cells - at most one week of them, from the earliest
+   fit up to the deadline, so the per-task cost does not grow with the
+   horizon - are scored by profile fit, summed over the
+   task's cells: +2 for one of the user's productive hours for the
+   task's work type (deep > 45 min, shallow otherwise), +1 inside the
+   "reasonable" 11:00-17:00 UTC window. Earlier weeks win ties and an
+   RNG seeded with the task's deadline and duration breaks the rest, so
+   a task lands in the same cells whatever the allocator placed before
+   (any worker, cached or rebuilt, gives the same plan)
+4. With a trained slot policy (slot_policy.py, published by
+   train_slot_policy.py) the candidates are scored by its Q-value for
+   the start hour instead; the policy sees the busy hours of the
+   candidate's week and the task. Ties are broken as above
+
+Author: Gojo-Satoru-git
+"""
+
+import math
+import os
+from datetime import timedelta, timezone
+
+import numpy as np
+
+from metrics import span
+
+HOURS_PER_WEEK = 7 * 24
+N_SLOTS = HOURS_PER_WEEK
+DEEP_WORK_MIN = 45
+REASONABLE_HOURS = (11, 17)  # inclusive, UTC
+GRANULARITIES = (15, 30, 60)
+DEFAULT_SEED = int(os.environ.get('SMT_SCHEDULE_SEED', 42))
+DEFAULT_GRANULARITY_MIN = int(os.environ.get('SMT_SCHEDULE_GRANULARITY_MIN', 30))
+DEFAULT_WEEKS = int(os.environ.get('SMT_SCHEDULE_WEEKS', 1))
+MAX_WEEKS = int(os.environ.get('SMT_SCHEDULE_MAX_WEEKS', 8))
+
+
+def slots_to_mask(slots, n_slots=N_SLOTS):
+    """Hour-of-week slot ids -> bool mask; a precomputed mask (ProfileStore) is used as-is."""
+    if isinstance(slots, np.ndarray) and slots.dtype == bool and slots.shape == (n_slots,):
+        return slots
+    mask = np.zeros(n_slots, dtype=bool)
+    slots = [s for s in slots if 0 <= s < n_slots]
+    mask[slots] = True
+    return mask
+
+
+def time_to_cell(dt, start, granularity_min, n_cells):
+    """Cell index containing dt (naive datetimes are UTC), or None outside the horizon."""
+    if not dt:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    cell = math.floor((dt - start).total_seconds() / (granularity_min * 60))
+    return cell if 0 <= cell < n_cells else None
+
+
+def cell_to_time(cell, start, granularity_min):
+    return start + timedelta(minutes=cell * granularity_min)
+
+
+class FreeRunTree:
+    """
+    Segment tree over free calendar cells. The cells live in a NumPy bool
+    mask (`free`); the leaves are BLOCK-cell blocks of it, summarized with
+    bytes operations (strip / split / find run in C), so an update costs
+    one summary per touched block plus one pull per ancestor. Each node stores the
+    free-run length touching its left edge (pref), its right edge (suff)
+    and the longest free run inside it (best).
+    """
+
+    BLOCK = 64
+
+    def __init__(self, n_cells):
+        self.n = n_cells
+        self.n_blocks = max(1, -(-n_cells // self.BLOCK))
+        size = 1
+        while size < self.n_blocks:
+            size *= 2
+        self.size = size
+        # Padding cells (past n_cells) are never free; `free` is a view of the real ones
+        self._cells = np.zeros(self.n_blocks * self.BLOCK, dtype=bool)
+        self.free = self._cells[:n_cells]
+        self.free[:] = True
+        self.span = [0] * (2 * size)
+        self.pref = [0] * (2 * size)
+        self.suff = [0] * (2 * size)
+        self.best = [0] * (2 * size)
+        for node in range(size, 2 * size):
+            self.span[node] = self.BLOCK
+        for node in range(size - 1, 0, -1):
+            self.span[node] = self.span[2 * node] * 2
+        self._refresh(0, self.n_blocks - 1)
+
+    def _summarize(self, block):
+        """(pref, suff, best) of one block, with bytes ops on its cells (1 = free)."""
+        cells = self._cells[block * self.BLOCK:(block + 1) * self.BLOCK].tobytes()
+        return (self.BLOCK - len(cells.lstrip(b'\x01')), self.BLOCK - len(cells.rstrip(b'\x01')),
+                max(map(len, cells.split(b'\x00'))))
+
+    def _pull(self, node):
+        left, right = 2 * node, 2 * node + 1
+        half = self.span[left]
+        self.pref[node] = self.pref[left] if self.pref[left] < half else half + self.pref[right]
+        self.suff[node] = self.suff[right] if self.suff[right] < half else half + self.suff[left]
+        self.best[node] = max(self.best[left], self.best[right], self.suff[left] + self.pref[right])
+
+    def _refresh(self, b0, b1):
+        """Re-summarizes blocks b0..b1 from the mask and pulls their ancestors."""
+        for block in range(b0, b1 + 1):
+            node = self.size + block
+            self.pref[node], self.suff[node], self.best[node] = self._summarize(block)
+        lo, hi = (self.size + b0) // 2, (self.size + b1) // 2
+        while lo >= 1:
+            for node in range(lo, hi + 1):
+                self._pull(node)
+            lo, hi = lo // 2, hi // 2
+
+    def assign(self, lo, hi, free):
+        """Marks cells [lo, hi) free or taken."""
+        lo, hi = max(0, lo), min(hi, self.n)
+        if lo >= hi:
+            return
+        self.free[lo:hi] = free
+        self._refresh(lo // self.BLOCK, (hi - 1) // self.BLOCK)
+
+    def longest_free(self):
+        return self.best[1]
+
+    def first_fit(self, length, limit=None):
+        """Start of the leftmost free run of at least `length` cells, or None (also if it starts after `limit`)."""
+        if self.best[1] < length:
+            return None
+        node, node_lo = 1, 0
+        while node < self.size:
+            if limit is not None and node_lo > limit:
+                return None
+            left, right = 2 * node, 2 * node + 1
+            mid = node_lo + self.span[left]
+            if self.best[left] >= length:
+                node = left
+            elif self.suff[left] + self.pref[right] >= length:
+                start = mid - self.suff[left]
+                return None if limit is not None and start > limit else start
+            else:
+                node, node_lo = right, mid
+        # The run lies inside this block: find it in the block's cells
+        start = node_lo + self._cells[node_lo:node_lo + self.BLOCK].tobytes().find(b'\x01' * length)
+        return None if limit is not None and start > limit else start
+
+
+class SlotAllocator:
+    """Free cells (NumPy mask + segment tree) plus the scoring tables for the horizon."""
+
+    def __init__(self, deep_slots=(), shallow_slots=(), seed=DEFAULT_SEED,
+                 granularity_min=DEFAULT_GRANULARITY_MIN, weeks=DEFAULT_WEEKS, policy=None):
+        if granularity_min not in GRANULARITIES:
+            raise ValueError(f"granularity_min must be one of {GRANULARITIES}")
+        if not 1 <= weeks <= MAX_WEEKS:
+            raise ValueError(f"weeks must be from 1 to {MAX_WEEKS}")
+        self.granularity_min = granularity_min
+        self.cells_per_hour = 60 // granularity_min
+        self.cells_per_week = HOURS_PER_WEEK * self.cells_per_hour
+        self.n_cells = weeks * self.cells_per_week
+        self.tree = FreeRunTree(self.n_cells)
+        self.free = self.tree.free  # read-only view for scoring; updates go through the tree
+        self.policy = policy
+
+        # Profile slots are hour-of-week ids (0-167); map every cell onto them
+        hour_of_week = self.hour_of_week = (np.arange(self.n_cells) // self.cells_per_hour) % HOURS_PER_WEEK
+        hour_of_day = hour_of_week % 24
+        reasonable = ((hour_of_day >= REASONABLE_HOURS[0]) & (hour_of_day <= REASONABLE_HOURS[1])).astype(np.int64)
+        # Prefix sums turn "score of cells [p, p+L)" into one subtraction
+        self.score_prefix = {}
+        for work_type, slots in (('deep', deep_slots), ('shallow', shallow_slots)):
+            cell_scores = 2 * slots_to_mask(slots)[hour_of_week].astype(np.int64) + reasonable
+            self.score_prefix[work_type] = np.concatenate([[0], np.cumsum(cell_scores)])
+        self.seed = seed
+
+    def cells_for(self, minutes):
+        return max(1, math.ceil((minutes or 0) / self.granularity_min))
+
+    def block_until(self, cell):
+        """Marks every cell before `cell` (the past) as taken."""
+        self.occupy(0, cell)
+
+    def occupy(self, start, length):
+        end = min(start + length, self.n_cells)
+        start = max(0, start)
+        if start < end:
+            self.tree.assign(start, end, False)
+
+    def release(self, start, length):
+        end = min(start + length, self.n_cells)
+        start = max(0, start)
+        if start < end:
+            self.tree.assign(start, end, True)
+
+    def allocate(self, deadline_cell, task_minutes):
+        """
+        Places a task as a contiguous run of cells starting no later than
+        deadline_cell, finishing by it when possible.
+        Returns (start_cell, n_cells) or None if it cannot start in time.
+        """
+        length = self.cells_for(task_minutes)
+        first = self.tree.first_fit(length, limit=deadline_cell)
+        if first is None:
+            return None
+        # Prefer finishing by the deadline; if impossible, take the earliest fit
+        latest_start = max(first, min(deadline_cell - length + 1, self.n_cells - length))
+        # One week of candidates holds every hour-of-week score (and every policy input)
+        latest_start = min(latest_start, first + self.cells_per_week - 1)
+        taken = ~self.free[first:latest_start + length]
+        taken_prefix = np.concatenate([[0], np.cumsum(taken)])
+        starts = first + np.flatnonzero(taken_prefix[length:] == taken_prefix[:-length])
+
+        if self.policy is not None:
+            scores = self.policy_scores(starts, task_minutes)
+        else:
+            work_type = 'deep' if task_minutes > DEEP_WORK_MIN else 'shallow'
+            prefix = self.score_prefix[work_type]
+            scores = prefix[starts + length] - prefix[starts]
+        best = starts[scores == scores.max()]
+        weeks = best // self.cells_per_week
+        best = best[weeks == weeks.min()]
+        if best.size > 1:
+            rng = np.random.default_rng((self.seed, max(int(deadline_cell), 0), int(task_minutes or 0)))
+            start = int(best[rng.integers(best.size)])
+        else:
+            start = int(best[0])
+        self.occupy(start, length)
+        return start, length
+
+    def policy_scores(self, starts, task_minutes):
+        """The slot policy's Q-value of every candidate start, given the busy hours of its week."""
+        scores = np.empty(starts.size)
+        weeks = starts // self.cells_per_week
+        for week in np.unique(weeks):
+            cells = self.free[week * self.cells_per_week:(week + 1) * self.cells_per_week]
+            busy_hours = ~cells.reshape(HOURS_PER_WEEK, self.cells_per_hour).all(axis=1)
+            q_values = self.policy.scores(busy_hours, task_minutes)
+            in_week = weeks == week
+            scores[in_week] = q_values[self.hour_of_week[starts[in_week]]]
+        return scores
+
+
+def edf_order(requests):
+    """requests: iterable of (task_id, deadline_cell or None, minutes). Earliest deadline first."""
+    return sorted(requests, key=lambda r: (r[1] is None, r[1] if r[1] is not None else 0, r[0]))
+
+
+def allocate_all(allocator, requests):
+    """Places every request in EDF order. Returns {task_id: (start_cell, n_cells)} for the ones that fit."""
+    placed = {}
+    with span('schedule.allocate'):
+        for task_id, deadline_cell, minutes in edf_order(requests):
+            if allocator.tree.longest_free() == 0:
+                break  # calendar full: nothing else can be placed
+            deadline = allocator.n_cells - 1 if deadline_cell is None else deadline_cell
+            placement = allocator.allocate(deadline, minutes)
+            if placement is not None:
+                placed[task_id] = placement
+    return placed
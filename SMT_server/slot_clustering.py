@@ -0,0 +1,73 @@
+"""
+Slot Clustering for Smart Task Manager
+
+Both /api/v1/insights and the productivity profile in /api/v1/retrain
+cluster completed tasks on (day_of_week, hour_of_day). Those points
+can only take 168 distinct values, so instead of one row per task we
+build a 168-bin histogram and run weighted KMeans over the non-empty
+bins (each bin weighted by its count). StandardScaler and KMeans both
+accept sample_weight, and the weighted objective is exactly the
+objective over the expanded points, so the result matches clustering
+every task while the cost depends only on the number of bins.
+
+Author: Gojo-Satoru-git
+"""
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from metrics import span
+
+N_SLOTS = 7 * 24
+
+# Bin coordinates: slot = day_of_week * 24 + hour_of_day
+SLOT_DAYS = np.repeat(np.arange(7), 24)
+SLOT_HOURS = np.tile(np.arange(24), 7)
+SLOT_POINTS = np.column_stack([SLOT_DAYS, SLOT_HOURS]).astype(float)
+
+
+def slot_histogram(days_of_week, hours_of_day):
+    """Counts completions per slot. Inputs are equal-length int sequences/arrays."""
+    slots = np.asarray(days_of_week, dtype=np.int64) * 24 + np.asarray(hours_of_day, dtype=np.int64)
+    return np.bincount(slots, minlength=N_SLOTS)
+
+
+def weighted_slot_kmeans(counts, n_clusters, random_state=42, n_init=10):
+    """
+    Weighted KMeans over the 168-bin histogram.
+    Returns (bin_labels[168], centers in original (day, hour) units).
+    """
+    counts = np.asarray(counts, dtype=float)
+    occupied = np.flatnonzero(counts)
+    # With fewer distinct bins than clusters the extra clusters would be duplicates
+    n_clusters = min(n_clusters, len(occupied))
+    points = SLOT_POINTS[occupied]
+    weights = counts[occupied]
+
+    scaler = StandardScaler()
+    scaled = scaler.fit_transform(points, sample_weight=weights)
+    kmeans = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=n_init)
+    with span('kmeans.fit'):
+        kmeans.fit(scaled, sample_weight=weights)
+    bin_labels = kmeans.predict(scaler.transform(SLOT_POINTS))
+    return bin_labels, scaler.inverse_transform(kmeans.cluster_centers_)
+
+
+def top_slots(counts, k=1):
+    """
+    Productivity profile: the k cluster centers, each widened to a
+    3-hour window of slot ids (same output as the old get_top_slots).
+    """
+    if np.sum(counts) < k or not np.any(counts):
+        return []
+    _, centers = weighted_slot_kmeans(counts, k)
+    slots = []
+    for center in centers:
+        day_of_week = int(round(center[0]))
+        hour_of_day = int(round(center[1]))
+        for i in range(-1, 2):  # 3-hour window
+            slot = (day_of_week * 24) + (hour_of_day + i) % 24
+            if slot not in slots:
+                slots.append(slot)
+    return slots
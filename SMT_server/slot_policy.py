@@ -0,0 +1,330 @@
+"""
+Slot Policy for Smart Task Manager
+
+The TF-Agents DQN in ml_models/rl_schedular.py was built but never
+trained or called, and serving it would mean importing TensorFlow in
+every worker. This module learns the same kind of policy (a Q-network
+over the 168 hour-of-week slots, fc layers 128 and 64 like
+create_agent()) with NumPy only:
+1. slot_rewards() - from completed tasks, how often a deep / shallow
+   task was worked on in each hour of the week, scaled to 0..1
+2. VectorCalendarEnv - N week calendars held as one (N, 168) array;
+   one step places a task in every calendar with a few NumPy ops, and
+   an episode places a whole pending list. The reward is the task's
+   mean slot reward over the hours it covers, or -1 when it overlaps a
+   busy hour or runs past the end of the week
+3. QNetwork - forward pass, Huber TD-loss gradients and Adam in NumPy
+4. train_policy() - DQN over the vectorized environments (epsilon-greedy
+   exploration, replay buffer, target network)
+5. SlotPolicy - the exported weights (.npz) and their forward pass;
+   SlotAllocator scores candidate starts with it when a trained policy
+   is published
+
+The observation is the calendar's busy hours plus the task (deep flag,
+length in hours). train_slot_policy.py trains a policy from the
+database and publishes it through the model store;
+ml_models/rl_schedular.BatchedCalendarEnv exposes the same calendars to
+TF-Agents as a batched py_environment. benchmarks/env_benchmark.py
+reports steps/sec against the single-calendar CalendarEnv.
+
+Author: Gojo-Satoru-git
+"""
+
+import math
+
+import numpy as np
+
+N_SLOTS = 7 * 24
+DEEP_WORK_MIN = 45
+MAX_TASK_HOURS = 8
+N_TASK_FEATURES = 2  # deep flag, task hours / MAX_TASK_HOURS
+OBS_SIZE = N_SLOTS + N_TASK_FEATURES
+FC_LAYER_PARAMS = (128, 64)
+OVERLAP_REWARD = -1.0
+POLICY_FORMAT = 1
+
+
+# --- 1. Rewards from history ---
+def task_hours(minutes):
+    """Whole hours a task of `minutes` covers (1..MAX_TASK_HOURS)."""
+    minutes = np.asarray(minutes, dtype=float)
+    return np.clip(np.ceil(np.nan_to_num(minutes) / 60), 1, MAX_TASK_HOURS).astype(np.int64)
+
+
+def slot_rewards(started_at, actual_minutes):
+    """
+    (2, 168) rewards, row 0 shallow and row 1 deep work: how many tasks
+    of that type covered each hour of the week, divided by the busiest
+    hour. started_at are UTC datetimes (naive ones are UTC).
+    """
+    from insights_store import completion_slot
+    counts = np.zeros((2, N_SLOTS))
+    for start, minutes in zip(started_at, actual_minutes):
+        if start and minutes:
+            day_of_week, hour_of_day = completion_slot(start)
+            first = day_of_week * 24 + hour_of_day
+            hours = (first + np.arange(task_hours(minutes))) % N_SLOTS
+            counts[int(minutes > DEEP_WORK_MIN), hours] += 1
+    peak = counts.max(axis=1, keepdims=True)
+    return np.divide(counts, peak, out=np.zeros_like(counts), where=peak > 0)
+
+
+def observations(busy, hours, deep):
+    """(N, OBS_SIZE) float32 network inputs for N calendars and their tasks."""
+    busy = np.atleast_2d(busy)
+    obs = np.empty((busy.shape[0], OBS_SIZE), dtype=np.float32)
+    obs[:, :N_SLOTS] = busy
+    obs[:, N_SLOTS] = deep
+    obs[:, N_SLOTS + 1] = np.asarray(hours) / MAX_TASK_HOURS
+    return obs
+
+
+# --- 2. Vectorized environments ---
+SLOTS = np.arange(N_SLOTS)
+
+
+class VectorCalendarEnv:
+    """
+    N calendars stepped together, held as one (N, 168) bool array. An
+    episode places tasks_per_episode tasks drawn from the history (their
+    length and work type) one per step, into a week whose busy hours are
+    random, at a per-calendar rate up to max_busy. A placed task marks
+    its hours busy; one that overlaps or runs past the week is dropped.
+    All calendars start and end their episodes together.
+    """
+
+    def __init__(self, rewards, minutes, n_envs=256, tasks_per_episode=1, max_busy=0.6, seed=42):
+        self.rewards = np.asarray(rewards, dtype=np.float32)
+        self.reward_prefix = np.zeros((2, N_SLOTS + 1), dtype=np.float32)
+        np.cumsum(self.rewards, axis=1, out=self.reward_prefix[:, 1:])
+        self.task_pool = np.asarray(minutes, dtype=float)
+        self.n_envs = n_envs
+        self.tasks_per_episode = tasks_per_episode
+        self.max_busy = max_busy
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(n_envs)
+        self.busy = np.zeros((n_envs, N_SLOTS), dtype=bool)
+        self.pending_hours = np.ones((n_envs, tasks_per_episode), dtype=np.int64)
+        self.pending_deep = np.zeros((n_envs, tasks_per_episode), dtype=np.int64)
+        self.t = 0
+
+    @property
+    def hours(self):
+        return self.pending_hours[:, self.t]
+
+    @property
+    def deep(self):
+        return self.pending_deep[:, self.t]
+
+    def reset(self):
+        rate = self.rng.uniform(0, self.max_busy, (self.n_envs, 1))
+        self.busy = self.rng.random((self.n_envs, N_SLOTS)) < rate
+        minutes = self.rng.choice(self.task_pool, (self.n_envs, self.tasks_per_episode))
+        self.pending_hours = task_hours(minutes)
+        self.pending_deep = (minutes > DEEP_WORK_MIN).astype(np.int64)
+        self.t = 0
+        return self.observe()
+
+    def observe(self):
+        return observations(self.busy, self.hours, self.deep)
+
+    def action_rewards(self):
+        """(N, 168) reward of every start hour for the current tasks."""
+        busy_prefix = np.zeros((self.n_envs, N_SLOTS + 1), dtype=np.int32)
+        np.cumsum(self.busy, axis=1, out=busy_prefix[:, 1:])
+        hours = self.hours[:, None]
+        starts = SLOTS[None, :]
+        ends = np.minimum(starts + hours, N_SLOTS)
+        rows = self.rows[:, None]
+        free = (busy_prefix[rows, ends] == busy_prefix[rows, starts]) & (starts + hours <= N_SLOTS)
+        prefix = self.reward_prefix[self.deep]
+        gain = (prefix[rows, ends] - prefix[rows, starts]) / hours
+        return np.where(free, gain, OVERLAP_REWARD).astype(np.float32)
+
+    def step(self, actions):
+        """
+        Places every calendar's current task at its action (start hour).
+        Returns (observation, rewards, done); after the last task the
+        observation is the final calendars and the caller resets.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        hours = self.hours
+        ends = np.minimum(actions + hours, N_SLOTS)
+        # (N, 168) mask of the hours each task would cover: one overlap test and one update for every calendar
+        window = (SLOTS >= actions[:, None]) & (SLOTS < ends[:, None])
+        placed = ~(self.busy & window).any(axis=1) & (actions + hours <= N_SLOTS)
+        self.busy |= window & placed[:, None]
+        prefix = self.reward_prefix[self.deep]
+        gain = (prefix[self.rows, ends] - prefix[self.rows, actions]) / hours
+        rewards = np.where(placed, gain, OVERLAP_REWARD).astype(np.float32)
+        self.t += 1
+        done = self.t == self.tasks_per_episode
+        if done:
+            self.t -= 1  # the observation keeps showing the last task
+        return self.observe(), rewards, np.full(self.n_envs, done)
+
+
+# --- 3. Q-network ---
+class QNetwork:
+    """Fully connected ReLU network: OBS_SIZE -> FC_LAYER_PARAMS -> one Q-value per slot."""
+
+    def __init__(self, layers=FC_LAYER_PARAMS, seed=42, params=None):
+        if params is None:
+            rng = np.random.default_rng(seed)
+            sizes = (OBS_SIZE, *layers, N_SLOTS)
+            params = []
+            for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+                params.append(rng.normal(0, math.sqrt(2 / fan_in), (fan_in, fan_out)).astype(np.float32))
+                params.append(np.zeros(fan_out, dtype=np.float32))
+        self.params = [np.asarray(p, dtype=np.float32) for p in params]
+
+    def forward(self, obs, keep=False):
+        """Q-values (N, 168); with keep=True also the layer inputs backward() needs."""
+        x, inputs = obs, []
+        n_layers = len(self.params) // 2
+        for i in range(n_layers):
+            inputs.append(x)
+            x = x @ self.params[2 * i] + self.params[2 * i + 1]
+            if i < n_layers - 1:
+                x = np.maximum(x, 0)
+        return (x, inputs) if keep else x
+
+    def backward(self, inputs, grad_out):
+        """Gradients of every parameter, given dLoss/dQ."""
+        grads = [None] * len(self.params)
+        grad = grad_out
+        for i in reversed(range(len(self.params) // 2)):
+            grads[2 * i] = inputs[i].T @ grad
+            grads[2 * i + 1] = grad.sum(axis=0)
+            if i:
+                grad = (grad @ self.params[2 * i].T) * (inputs[i] > 0)
+        return grads
+
+    def copy(self):
+        return QNetwork(params=[p.copy() for p in self.params])
+
+
+class Adam:
+    def __init__(self, params, learning_rate=1e-3, beta1=0.9, beta2=0.999, eps=1e-7):
+        self.params = params
+        self.learning_rate, self.beta1, self.beta2, self.eps = learning_rate, beta1, beta2, eps
+        self.m = [np.zeros_like(p) for p in params]
+        self.v = [np.zeros_like(p) for p in params]
+        self.t = 0
+
+    def apply(self, grads):
+        self.t += 1
+        scale = self.learning_rate * math.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        for p, g, m, v in zip(self.params, grads, self.m, self.v):
+            m += (1 - self.beta1) * (g - m)
+            v += (1 - self.beta2) * (g * g - v)
+            p -= scale * m / (np.sqrt(v) + self.eps)
+
+
+def huber_grad(errors, delta=1.0):
+    """d/d(error) of the element-wise Huber loss (common.element_wise_huber_loss)."""
+    return np.clip(errors, -delta, delta)
+
+
+# --- 4. Training ---
+def train_policy(env, iterations=2000, batch_size=256, replay_size=100000, learning_rate=1e-3,
+                 gamma=0.9, epsilon=(1.0, 0.05), target_update=50, seed=42, log_every=500):
+    """
+    DQN over a vectorized env: every iteration steps all env.n_envs
+    calendars with epsilon-greedy actions, then takes one Adam step on
+    a replay batch. Returns the trained SlotPolicy.
+    """
+    rng = np.random.default_rng(seed)
+    net = QNetwork(seed=seed)
+    target = net.copy()
+    optimizer = Adam(net.params, learning_rate)
+    replay = {'obs': np.zeros((replay_size, OBS_SIZE), dtype=np.float32),
+              'action': np.zeros(replay_size, dtype=np.int64),
+              'reward': np.zeros(replay_size, dtype=np.float32),
+              'next_obs': np.zeros((replay_size, OBS_SIZE), dtype=np.float32),
+              'done': np.zeros(replay_size, dtype=bool)}
+    stored, cursor = 0, 0
+    obs = env.reset()
+    for it in range(iterations):
+        eps = epsilon[0] + (epsilon[1] - epsilon[0]) * min(1.0, it / max(1, iterations // 2))
+        actions = net.forward(obs).argmax(axis=1)
+        explore = rng.random(env.n_envs) < eps
+        actions[explore] = rng.integers(N_SLOTS, size=int(explore.sum()))
+        next_obs, rewards, done = env.step(actions)
+
+        idx = (cursor + np.arange(env.n_envs)) % replay_size
+        for key, value in (('obs', obs), ('action', actions), ('reward', rewards),
+                           ('next_obs', next_obs), ('done', done)):
+            replay[key][idx] = value
+        cursor = (cursor + env.n_envs) % replay_size
+        stored = min(stored + env.n_envs, replay_size)
+        obs = env.reset() if done.all() else next_obs
+
+        batch = rng.integers(stored, size=batch_size)
+        q, inputs = net.forward(replay['obs'][batch], keep=True)
+        bootstrap = target.forward(replay['next_obs'][batch]).max(axis=1)
+        targets = replay['reward'][batch] + gamma * ~replay['done'][batch] * bootstrap
+        rows = np.arange(batch_size)
+        errors = q[rows, replay['action'][batch]] - targets
+        grad_out = np.zeros_like(q)
+        grad_out[rows, replay['action'][batch]] = huber_grad(errors) / batch_size
+        optimizer.apply(net.backward(inputs, grad_out))
+        if (it + 1) % target_update == 0:
+            target = net.copy()
+        if log_every and (it + 1) % log_every == 0:
+            print(f"  iteration {it + 1}: mean reward {rewards.mean():.3f}, epsilon {eps:.2f}")
+    return SlotPolicy(net.params)
+
+
+def evaluate(policy, env, episodes=10):
+    """
+    Mean reward per task of the greedy policy, of random slots and of
+    the best slot for each task in turn, over episodes x n_envs pending
+    lists (env is reseeded so each strategy places the same lists).
+    """
+    totals = np.zeros(3)
+    rng = np.random.default_rng(0)
+    for episode in range(episodes):
+        for i, strategy in enumerate(('policy', 'random', 'best')):
+            env.rng = np.random.default_rng(episode)
+            obs, done, total = env.reset(), False, 0.0
+            while not done:
+                if strategy == 'policy':
+                    actions = policy.q_values(obs).argmax(axis=1)
+                elif strategy == 'random':
+                    actions = rng.integers(N_SLOTS, size=env.n_envs)
+                else:
+                    actions = env.action_rewards().argmax(axis=1)
+                obs, rewards, dones = env.step(actions)
+                total, done = total + rewards.mean(), dones.all()
+            totals[i] += total / env.tasks_per_episode
+    return dict(zip(('policy', 'random', 'best'), (totals / episodes).round(4).tolist()))
+
+
+# --- 5. Serving ---
+class SlotPolicy:
+    """Trained Q-network weights plus the NumPy forward pass smart-schedule uses."""
+
+    def __init__(self, params):
+        self.net = QNetwork(params=params)
+
+    def q_values(self, obs):
+        return self.net.forward(np.asarray(obs, dtype=np.float32))
+
+    def scores(self, busy_hours, minutes):
+        """(168,) Q-value of starting a task of `minutes` at each hour of a week with these busy hours."""
+        minutes = minutes or 0
+        return self.q_values(observations(busy_hours, task_hours(minutes), int(minutes > DEEP_WORK_MIN)))[0]
+
+    def save(self, f):
+        """Writes the weights as an .npz (a path or a binary file object)."""
+        arrays = {f'param{i}': p for i, p in enumerate(self.net.params)}
+        np.savez(f, format=np.int64(POLICY_FORMAT), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['format']) != POLICY_FORMAT:
+                raise ValueError(f"Unsupported slot policy format: {int(data['format'])}")
+            n_params = sum(1 for key in data.files if key.startswith('param'))
+            return cls([data[f'param{i}'] for i in range(n_params)])
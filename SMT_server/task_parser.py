@@ -0,0 +1,206 @@
+"""
+Task Text Parser for Smart Task Manager
+
+Finds and resolves the due date in a typed task ("Submit OS assignment
+by friday at 5pm"). parse-task used to run the whole en_core_web_sm
+pipeline (tagger, parser, lemmatizer, NER) on the request thread and
+hand every date phrase to dateparser, which costs milliseconds per
+call and seconds on its first call with a new phrase shape:
+1. spaCy is loaded with only the NER component enabled - the only
+   output parse-task uses is the first DATE / TIME / DURATION entity
+2. parse_date() resolves the common phrases ("today", "tomorrow",
+   "by friday", "at 5pm", "in 3 days", "friday 9am") with one regex
+   match and datetime arithmetic, following dateparser's
+   PREFER_DATES_FROM='future' results; anything else falls back to
+   dateparser
+3. ParsePool runs both steps in a pool of worker processes
+   (SMT_PARSE_WORKERS > 0), so spaCy and dateparser never hold the
+   server's GIL; with 0 workers (the default) they run in-process
+
+Dates are naive local time, like dateparser's.
+benchmarks/parse_benchmark.py reports the latency distribution.
+
+Author: Gojo-Satoru-git
+"""
+
+import math
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from metrics import span
+
+SPACY_MODEL = 'en_core_web_sm'
+DATE_LABELS = ('DATE', 'TIME', 'DURATION')
+PARSE_WORKERS = int(os.environ.get('SMT_PARSE_WORKERS', 0))
+TONIGHT_HOUR = 20
+
+# --- 1. spaCy, NER only ---
+def load_ner(model=SPACY_MODEL):
+    import spacy
+    print("Loading spaCy pipeline (NER only)...")
+    return spacy.load(model, enable=['ner'])
+
+
+def first_date_entity(doc):
+    """Text of the first DATE / TIME / DURATION entity, or None."""
+    return next((ent.text for ent in doc.ents if ent.label_ in DATE_LABELS), None)
+
+
+# --- 2. Date phrases ---
+_WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+_WEEKDAY_INDEX = {name: i for i, name in enumerate(_WEEKDAYS)}
+_WEEKDAY_INDEX.update({name[:3]: i for i, name in enumerate(_WEEKDAYS)})
+_WEEKDAY_INDEX.update({'tues': 1, 'thur': 3, 'thurs': 3})
+_UNIT_MINUTES = {'min': 1, 'minute': 1, 'hr': 60, 'hour': 60, 'day': 1440, 'week': 10080}
+
+_PREFIX = r'(?:(?:by|on|due|until|before)\s+)?'
+_TIME = r'(?:\d{1,2}(?:[:.]\d{2})?\s?[ap]m|\d{1,2}:\d{2}|noon|midnight)'
+_WEEKDAY = '|'.join(sorted(_WEEKDAY_INDEX, key=len, reverse=True))
+
+_DAY_RE = re.compile(
+    _PREFIX + r'(?P<day>today|tonight|tomorrow|tmrw|day after tomorrow|next week'
+    r'|(?:this\s+|next\s+)?(?P<weekday>' + _WEEKDAY + r'))'
+    r'(?:\s+(?:at\s+|by\s+)?(?P<time>' + _TIME + r'))?')
+_TIME_RE = re.compile(_PREFIX + r'(?:at\s+)?(?P<time>' + _TIME + r')')
+_RELATIVE_RE = re.compile(_PREFIX + r'(?:in\s+)?(?P<n>\d+|an?)\s+(?P<unit>min|minute|hr|hour|day|week)s?')
+_CLOCK_RE = re.compile(r'(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?\s?(?P<ampm>[ap]m)?')
+
+
+def _clock(text):
+    """(hour, minute) of a time phrase, or None if it is not a valid time."""
+    if text == 'noon':
+        return 12, 0
+    if text == 'midnight':
+        return 0, 0
+    m = _CLOCK_RE.fullmatch(text)
+    hour, minute = int(m['hour']), int(m['minute'] or 0)
+    if m['ampm']:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if m['ampm'] == 'pm' else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def _at(day, clock):
+    return day.replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
+
+
+def quick_parse(phrase, now):
+    """Resolves a common date phrase with a regex, or returns None (not a common phrase)."""
+    phrase = ' '.join(phrase.lower().strip(' .,!?').split())
+
+    m = _RELATIVE_RE.fullmatch(phrase)
+    if m:
+        n = 1 if m['n'] in ('a', 'an') else int(m['n'])
+        return now + timedelta(minutes=n * _UNIT_MINUTES[m['unit']])
+
+    m = _DAY_RE.fullmatch(phrase)
+    if m:
+        clock = _clock(m['time']) if m['time'] else None
+        if m['time'] and clock is None:
+            return None
+        day = m['day']
+        if m['weekday']:
+            # The next such day, never today (dateparser's "future" preference)
+            ahead = (_WEEKDAY_INDEX[m['weekday']] - now.weekday() - 1) % 7 + 1
+            due = _at(now + timedelta(days=ahead), (0, 0))
+        elif day == 'tonight':
+            due = _at(now, (TONIGHT_HOUR, 0))
+        else:
+            offset = {'today': 0, 'tomorrow': 1, 'tmrw': 1, 'day after tomorrow': 2, 'next week': 7}[day]
+            due = now + timedelta(days=offset)
+        return _at(due, clock) if clock else due
+
+    m = _TIME_RE.fullmatch(phrase)
+    if m:
+        clock = _clock(m['time'])
+        if clock is None:
+            return None
+        due = _at(now, clock)
+        # A bare time that already passed today means tomorrow
+        return due if due > now else due + timedelta(days=1)
+    return None
+
+
+def parse_date(date_text, now=None):
+    """Due date for a date phrase: the regex fast path, else dateparser (None if neither understands it)."""
+    if not date_text:
+        return None
+    with span('date.regex'):
+        due = quick_parse(date_text, now or datetime.now())
+    if due is not None:
+        return due
+    import dateparser
+    settings = {'PREFER_DATES_FROM': 'future'}
+    if now is not None:
+        settings['RELATIVE_BASE'] = now
+    with span('date.dateparser'):
+        return dateparser.parse(date_text, settings=settings)
+
+
+def parse_texts(nlp, texts, batch_size=256):
+    """(date_text, due_date) per text: one nlp.pipe pass for the entities, then parse_date."""
+    with span('spacy.ner'):
+        date_texts = [first_date_entity(doc) for doc in nlp.pipe(texts, batch_size=batch_size)]
+    return [(date_text, parse_date(date_text)) for date_text in date_texts]
+
+
+# --- 3. Process pool ---
+_worker_nlp = None
+
+def _init_worker():
+    global _worker_nlp
+    _worker_nlp = load_ner()
+
+
+def _parse_chunk(texts, batch_size):
+    return parse_texts(_worker_nlp, texts, batch_size)
+
+
+class ParsePool:
+    """
+    Runs parse_texts in worker processes (each loads its own NER
+    pipeline once), or in-process with get_nlp() when workers == 0.
+    """
+
+    def __init__(self, get_nlp, workers=PARSE_WORKERS):
+        self.get_nlp = get_nlp
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Started on first use, so importing (or forking) the app never spawns processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker,
+                    mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def parse(self, texts, batch_size=256):
+        """(date_text, due_date) for every text, in order."""
+        texts = list(texts)
+        if not texts:
+            return []
+        if self.workers <= 0:
+            return parse_texts(self.get_nlp(), texts, batch_size)
+        pool = self._pool()
+        chunk = math.ceil(len(texts) / self.workers)
+        # The spaCy / date spans are recorded in the worker processes; this one covers the round trip
+        with span('parse.pool'):
+            futures = [pool.submit(_parse_chunk, texts[i:i + chunk], batch_size)
+                       for i in range(0, len(texts), chunk)]
+            return [parsed for future in futures for parsed in future.result()]
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
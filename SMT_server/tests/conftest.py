@@ -0,0 +1,35 @@
+"""
+Test setup for Smart Task Manager
+
+Puts SMT_server/ (and benchmarks/, for its synthetic-data helpers) on
+sys.path so the tests import the server modules the way the app does
+(run `python -m pytest` from SMT_server/).
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+import sys
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(1, os.path.join(SERVER_DIR, 'benchmarks'))
+
+
+@pytest.fixture(scope='session')
+def server(tmp_path_factory):
+    """The app module on a fresh database, with retrains published to a temporary state dir."""
+    state_dir = tmp_path_factory.mktemp('state')
+    os.environ['DATABASE_URL'] = f"sqlite:///{state_dir / 'tasks.db'}"
+    os.environ['SMT_STATE_DIR'] = str(state_dir)
+    import app
+    with app.app.app_context():
+        app.init_db()
+    return app
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
@@ -0,0 +1,80 @@
+"""
+Database configuration tests for Smart Task Manager
+
+Checks db_config.py against a temporary SQLite file:
+1. Every new connection gets the pragmas (WAL, synchronous=NORMAL,
+   busy_timeout, mmap_size) and the pool options
+2. Concurrent read-then-write transactions opened with BEGIN IMMEDIATE
+   neither fail with "database is locked" nor lose updates
+
+Author: Gojo-Satoru-git
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import db_config
+
+pytestmark = pytest.mark.skipif(not db_config.TUNING_ENABLED, reason='SMT_DB_TUNING=0')
+
+WRITERS = 8
+WRITES_PER_THREAD = 25
+
+
+def tuned_engine(path, immediate=None):
+    url = f'sqlite:///{path}'
+    engine = create_engine(url, **db_config.engine_options(url))
+    db_config.install(engine, immediate=immediate)
+    return engine
+
+
+def test_engine_options():
+    assert db_config.engine_options('sqlite://') == {}
+    options = db_config.engine_options('sqlite:////tmp/tasks.db')
+    assert options['pool_size'] == db_config.POOL_SIZE
+    assert options['connect_args'] == {'timeout': db_config.BUSY_TIMEOUT_MS / 1000, 'check_same_thread': False}
+    assert db_config.engine_options('postgresql://db/tasks')['pool_pre_ping']
+
+
+def test_pragmas_on_every_connection(tmp_path):
+    engine = tuned_engine(tmp_path / 'tasks.db')
+    expected = {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': db_config.BUSY_TIMEOUT_MS,
+                'mmap_size': db_config.MMAP_MB * 1024 * 1024}
+    with engine.connect() as first, engine.connect() as second:
+        for conn in (first, second):
+            for name, value in expected.items():
+                assert conn.exec_driver_sql(f'PRAGMA {name}').scalar() == value, name
+    engine.dispose()
+
+
+def test_concurrent_writers(tmp_path):
+    engine = tuned_engine(tmp_path / 'tasks.db', immediate=lambda: True)
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE counter (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)'))
+        conn.execute(text('INSERT INTO counter VALUES (1, 0)'))
+
+    errors, start = [], threading.Barrier(WRITERS)
+
+    def writer():
+        start.wait()
+        try:
+            for _ in range(WRITES_PER_THREAD):
+                # Read, then write in the same transaction: a DEFERRED BEGIN could fail to upgrade here
+                with engine.begin() as conn:
+                    value = conn.execute(text('SELECT value FROM counter WHERE id = 1')).scalar()
+                    conn.execute(text('UPDATE counter SET value = :v WHERE id = 1'), {'v': value + 1})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT value FROM counter')).scalar() == WRITERS * WRITES_PER_THREAD
+    engine.dispose()
@@ -0,0 +1,54 @@
+"""
+Feature schema tests for Smart Task Manager
+
+Training and serving build the priority features from feature_schema.py;
+on the same rows they must agree:
+1. The compiled serving matrix equals the fitted training matrix
+2. The compiled NumPy predictor, the sklearn fallback and
+   Pipeline.predict on priority_frame return the same labels
+3. The compiled time predictor matches its pipeline
+
+Author: Gojo-Satoru-git
+"""
+
+import numpy as np
+import pytest
+
+from fast_predictor import CompiledPriorityPredictor, CompiledTimePredictor, PipelinePriorityPredictor
+from feature_schema import hours_until_due, numeric_matrix, priority_frame
+from training_benchmark import synthetic_rows
+from training_pipeline import train_all
+
+
+@pytest.fixture(scope='module')
+def trained():
+    """(names, hours, minutes, train_all result) for synthetic completed tasks."""
+    rows = synthetic_rows(400, np.random.default_rng(42))
+    names = [r[0] for r in rows]
+    minutes = [r[1] for r in rows]
+    hours = [hours_until_due(r[2], r[3]) for r in rows]
+    return names, hours, minutes, train_all(rows, n_jobs=1)
+
+
+def test_serving_matrix_matches_training_frame(trained):
+    names, hours, minutes, result = trained
+    pipeline = result['priority_model']
+    compiled = CompiledPriorityPredictor(pipeline)
+    X_train = pipeline.named_steps['preprocessor'].transform(priority_frame(names, hours, minutes))
+    X_train = X_train[:, compiled.forest.used_features].toarray().astype(np.float32)
+    X_serve = compiled.features(names, numeric_matrix(hours, minutes, compiled.numeric_columns))
+    np.testing.assert_array_equal(X_serve, X_train)
+
+
+def test_priority_predictors_agree(trained):
+    names, hours, minutes, result = trained
+    pipeline = result['priority_model']
+    reference = pipeline.predict(priority_frame(names, hours, minutes))
+    np.testing.assert_array_equal(CompiledPriorityPredictor(pipeline).predict(names, hours, minutes), reference)
+    np.testing.assert_array_equal(PipelinePriorityPredictor(pipeline).predict(names, hours, minutes), reference)
+
+
+def test_time_predictor_agrees(trained):
+    names, _, _, result = trained
+    pipeline = result['time_model']
+    np.testing.assert_array_equal(CompiledTimePredictor(pipeline).predict(names), pipeline.predict(names))
@@ -0,0 +1,55 @@
+"""
+Metrics tests for Smart Task Manager
+
+A request whose view raises must still land in
+smt_request_duration_seconds as a 500: both when Flask answers it with
+its error handler and when the exception propagates (debug mode, as
+app.run(debug=True) serves, or testing), where after_request never runs.
+
+Author: Gojo-Satoru-git
+"""
+
+import pytest
+from flask import Flask
+
+import metrics
+
+pytestmark = pytest.mark.skipif(not metrics.METRICS_ENABLED, reason='SMT_METRICS=0')
+
+
+def request_count(**labels):
+    return metrics.registry.histogram(metrics.REQUEST_METRIC, **labels).snapshot()[2]
+
+
+@pytest.fixture(params=[False, True], ids=['handled', 'propagated'])
+def client(request):
+    app = Flask(__name__)
+    app.config['PROPAGATE_EXCEPTIONS'] = request.param
+    metrics.instrument_app(app)
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError("view failed")
+
+    @app.route('/ok')
+    def ok():
+        return 'ok'
+
+    return app.test_client()
+
+
+def test_unhandled_exception_is_recorded_as_500(client):
+    before = request_count(endpoint='boom', method='GET', status=500)
+    if client.application.config['PROPAGATE_EXCEPTIONS']:
+        with pytest.raises(RuntimeError):
+            client.get('/boom')
+    else:
+        assert client.get('/boom').status_code == 500
+    assert request_count(endpoint='boom', method='GET', status=500) == before + 1
+    assert 'status="500"' in client.get('/metrics').get_data(as_text=True)
+
+
+def test_successful_request_keeps_its_status(client):
+    before = request_count(endpoint='ok', method='GET', status=200)
+    assert client.get('/ok').status_code == 200
+    assert request_count(endpoint='ok', method='GET', status=200) == before + 1
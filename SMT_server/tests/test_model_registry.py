@@ -0,0 +1,50 @@
+"""
+Model registry tests for Smart Task Manager
+
+A process hot-swaps to models another process published; when loading
+the new artifact fails, the next poll must try again instead of
+serving the old model until the pointer file changes once more.
+
+Author: Gojo-Satoru-git
+"""
+
+import time
+
+from metrics import SPAN_METRIC, registry
+from model_registry import ModelRegistry
+from slot_policy import QNetwork, SlotPolicy
+
+
+def poll(models):
+    """One refresh() past the poll interval, waiting for its background reload."""
+    models._next_poll = 0.0
+    models.refresh()
+    while models._reloading:
+        time.sleep(0.01)
+
+
+def test_failed_reload_is_retried(tmp_path):
+    models = ModelRegistry(str(tmp_path), str(tmp_path))
+    assert models.slot_policy is None  # nothing published yet
+
+    load_policy, attempts = ModelRegistry._load_slot_policy, []
+
+    def flaky_load(self):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("truncated artifact")
+        return load_policy(self)
+    models._loaders = {**models._loaders, 'slot_policy': flaky_load}
+
+    failures = registry.histogram(SPAN_METRIC, span='models.reload_failed')
+    failed_before = failures.snapshot()[2]
+    artifact = models.store.save_policy('slot_policy', SlotPolicy(QNetwork().params))
+    models.store.publish({'slot_policy': artifact})
+
+    poll(models)
+    assert models.slot_policy is None
+    assert failures.snapshot()[2] == failed_before + 1
+
+    poll(models)  # same pointer file: retried anyway
+    assert isinstance(models.slot_policy, SlotPolicy)
+    assert len(attempts) == 2
@@ -0,0 +1,32 @@
+"""
+Allocator tests for Smart Task Manager
+
+Every gunicorn worker keeps its own cached SlotAllocator per plan, so a
+placement may only depend on the allocator's free cells and the task,
+never on what that allocator placed (and released) before.
+
+Author: Gojo-Satoru-git
+"""
+
+from scheduler import SlotAllocator, allocate_all
+
+DEEP_SLOTS = [130, 131, 132, 30, 31, 32]
+SHALLOW_SLOTS = [80, 81, 82]
+
+
+def test_tie_break_ignores_call_history():
+    fresh = SlotAllocator(DEEP_SLOTS, SHALLOW_SLOTS, granularity_min=15, weeks=2)
+    used = SlotAllocator(DEEP_SLOTS, SHALLOW_SLOTS, granularity_min=15, weeks=2)
+    # Earlier placements that were released again leave `used` with the same free cells as `fresh`
+    for placement in allocate_all(used, [(i, None, 20 + 5 * i) for i in range(30)]).values():
+        used.release(*placement)
+    assert used.free.tolist() == fresh.free.tolist()
+
+    for deadline_cell, minutes in ((500, 30), (1200, 90), (1343, 15)):
+        assert used.allocate(deadline_cell, minutes) == fresh.allocate(deadline_cell, minutes)
+
+
+def test_placements_are_reproducible():
+    requests = [(i, (i * 37) % 1344 or None, 15 + (i * 13) % 200) for i in range(60)]
+    first = allocate_all(SlotAllocator(DEEP_SLOTS, SHALLOW_SLOTS, granularity_min=15, weeks=2), requests)
+    assert first == allocate_all(SlotAllocator(DEEP_SLOTS, SHALLOW_SLOTS, granularity_min=15, weeks=2), requests)
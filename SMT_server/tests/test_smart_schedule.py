@@ -0,0 +1,58 @@
+"""
+Smart-schedule scoring tests for Smart Task Manager
+
+The published slot policy is a single global model. It must not
+override a user's personal profile: those users keep profile-based
+placements, while users of the shared profile follow the policy.
+
+Author: Gojo-Satoru-git
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+PROFILE_HOUR = 2 * 24 + 14  # Wednesday 14:00 UTC, hour-of-week id
+POLICY_HOUR = 2 * 24 + 9  # Wednesday 09:00 UTC
+
+
+class OneHourPolicy:
+    """Stands in for a published SlotPolicy that always prefers POLICY_HOUR."""
+
+    def scores(self, busy_hours, minutes):
+        q_values = np.zeros(len(busy_hours))
+        q_values[POLICY_HOUR] = 1.0
+        return q_values
+
+
+@pytest.fixture
+def policy_published(server, monkeypatch):
+    monkeypatch.setattr(server, 'TRUST_USER_HEADER', True)
+    monkeypatch.setitem(server.models._models, 'slot_policy', OneHourPolicy())
+
+
+def scheduled_hour(server, client, user_id):
+    """Hour-of-week the smart schedule gives a new one-hour task of user_id."""
+    with server.app.app_context():
+        task = server.Task(task_name='deep work', user_id=user_id, predicted_time_min=60)
+        server.db.session.add(task)
+        server.db.session.commit()
+        task_id = task.id
+    response = client.get('/api/v1/smart-schedule', query_string={'weeks': 2}, headers={'X-User-Id': user_id})
+    assert response.status_code == 200
+    start = next(datetime.fromisoformat(t['scheduled_time']) for t in response.get_json() if t['id'] == task_id)
+    return start.weekday() * 24 + start.hour
+
+
+def test_personal_profile_outranks_the_policy(server, client, policy_published):
+    with server.app.app_context():
+        server.db.session.add(server.UserProfile(user_id='erin', version=1, deep_work_slots=json.dumps([PROFILE_HOUR]),
+                                                 shallow_work_slots=json.dumps([PROFILE_HOUR])))
+        server.db.session.commit()
+    assert scheduled_hour(server, client, 'erin') == PROFILE_HOUR
+
+
+def test_shared_profile_users_follow_the_policy(server, client, policy_published):
+    assert scheduled_hour(server, client, 'frank') == POLICY_HOUR
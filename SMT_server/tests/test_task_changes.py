@@ -0,0 +1,47 @@
+"""
+Task delta tests for Smart Task Manager
+
+GET /api/v1/tasks?since= returns changed rows and deleted ids; a client
+applies the changes, then the deletions. A deleted id must therefore
+never come back as a live task while its tombstone is still listed:
+1. New tasks never reuse a deleted id (AUTOINCREMENT)
+2. Where an id is reused anyway (tables created before AUTOINCREMENT),
+   the live task wins over its tombstone
+
+Author: Gojo-Satoru-git
+"""
+
+from datetime import datetime, timedelta, timezone
+
+
+def add_task(server, name, **fields):
+    with server.app.app_context():
+        task = server.Task(task_name=name, **fields)
+        server.db.session.add(task)
+        server.db.session.commit()
+        return task.id
+
+
+def changes_since(client, since):
+    response = client.get('/api/v1/tasks', query_string={'since': since.isoformat()})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_deleted_id_is_not_reused(server, client):
+    first = add_task(server, 'write report')
+    last = add_task(server, 'email team')
+    assert client.delete(f'/api/v1/tasks/{last}').status_code == 200
+    assert add_task(server, 'plan sprint') > last > first
+
+
+def test_live_task_outranks_its_tombstone(server, client):
+    since = datetime.now(timezone.utc) - timedelta(seconds=1)
+    task_id = add_task(server, 'review code')
+    assert client.delete(f'/api/v1/tasks/{task_id}').status_code == 200
+    assert task_id in changes_since(client, since)['deleted']
+
+    add_task(server, 'review code again', id=task_id)  # an id reused by an older table
+    delta = changes_since(client, since)
+    assert task_id not in delta['deleted']
+    assert task_id in [task['id'] for task in delta['changed']]
@@ -0,0 +1,25 @@
+"""
+User identification tests for Smart Task Manager
+
+X-User-Id is unauthenticated, so it is only honoured when the operator
+says a trusted proxy sets it (SMT_TRUST_USER_HEADER=1).
+
+Author: Gojo-Satoru-git
+"""
+
+
+def test_named_user_rejected_by_default(server, client, monkeypatch):
+    monkeypatch.setattr(server, 'TRUST_USER_HEADER', False)
+    assert client.get('/api/v1/tasks', headers={'X-User-Id': 'alice'}).status_code == 403
+    assert client.get('/api/v1/tasks', headers={'X-User-Id': server.DEFAULT_USER_ID}).status_code == 200
+    assert client.get('/api/v1/tasks').status_code == 200
+
+
+def test_query_parameter_never_selects_a_user(server, client, monkeypatch):
+    monkeypatch.setattr(server, 'TRUST_USER_HEADER', True)
+    with server.app.app_context():
+        server.db.session.add(server.Task(task_name='alice only', user_id='alice'))
+        server.db.session.commit()
+    names = lambda body: [t['task_name'] for section in body.values() for t in section]  # noqa: E731
+    assert 'alice only' in names(client.get('/api/v1/tasks', headers={'X-User-Id': 'alice'}).get_json())
+    assert 'alice only' not in names(client.get('/api/v1/tasks', query_string={'user_id': 'alice'}).get_json())
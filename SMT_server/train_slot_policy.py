@@ -0,0 +1,81 @@
+"""
+Slot Policy Training for Smart Task Manager
+
+Learns the smart-schedule slot policy (slot_policy.py) offline from the
+completed tasks in the database, with NumPy only:
+1. The reward of every hour of the week comes from when the completed
+   tasks were worked on (completed_at minus the reported minutes), for
+   deep and shallow work separately
+2. A DQN is trained over --envs vectorized calendars, each iteration
+   stepping all of them at once; every episode places --tasks tasks.
+   The policy is then evaluated on fresh calendars against random
+   slots and the best slot for each task
+3. The weights are published as a new slot_policy version in the model
+   store (or only written to --out); running servers hot-swap to it
+   through the model-version pointer and score smart-schedule
+   placements with its NumPy forward pass
+
+Neither TensorFlow nor spaCy is imported.
+
+Usage (from SMT_server/):
+    python train_slot_policy.py
+    python train_slot_policy.py --iterations 4000 --envs 512
+    python train_slot_policy.py --tasks 6 --iterations 6000   # whole pending lists per episode
+    python train_slot_policy.py --out /tmp/slot_policy.npz   # do not publish
+
+Author: Gojo-Satoru-git
+"""
+
+import argparse
+import time
+from datetime import timedelta
+
+from app import MIN_RETRAIN_TASKS, Task, app, completed_with_feedback, init_db, models
+from slot_policy import VectorCalendarEnv, evaluate, slot_rewards, train_policy
+
+
+def load_history():
+    """(started_at, actual minutes) of every completed task with a reported time."""
+    with app.app_context():
+        init_db()
+        rows = completed_with_feedback().with_entities(Task.completed_at, Task.actual_time_taken_min).all()
+    started = [done_at - timedelta(minutes=minutes) for done_at, minutes in rows if done_at and minutes]
+    return started, [minutes for done_at, minutes in rows if done_at and minutes]
+
+
+def train_slot_policy(iterations, n_envs, tasks, gamma, seed, out=None):
+    started, minutes = load_history()
+    if len(minutes) < MIN_RETRAIN_TASKS:
+        print(f"Not enough data. You need at least {MIN_RETRAIN_TASKS} completed tasks. You have {len(minutes)}.")
+        return None
+    print(f"Training the slot policy on {len(minutes)} completed tasks ({n_envs} calendars per step)...")
+    rewards = slot_rewards(started, minutes)
+    start = time.perf_counter()
+    policy = train_policy(VectorCalendarEnv(rewards, minutes, n_envs=n_envs, tasks_per_episode=tasks, seed=seed),
+                          iterations=iterations, gamma=gamma, seed=seed)
+    elapsed = time.perf_counter() - start
+    print(f"Trained in {elapsed:.1f}s ({iterations * n_envs / elapsed:,.0f} env steps/s).")
+    scores = evaluate(policy, VectorCalendarEnv(rewards, minutes, n_envs=1000, tasks_per_episode=tasks, seed=seed + 1))
+    print(f"Mean reward on new calendars: policy {scores['policy']}, random {scores['random']}, best {scores['best']}")
+
+    if out:
+        policy.save(out)
+        print(f"Weights written to {out}.")
+        return None
+    artifact = models.store.save_policy('slot_policy', policy)
+    version = models.store.publish({'slot_policy': artifact})
+    print(f"Published model version {version} ({artifact}).")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=2000, help='DQN iterations (each steps every calendar)')
+    parser.add_argument('--envs', type=int, default=256, help='calendars stepped together')
+    parser.add_argument('--tasks', type=int, default=1, help='tasks placed per episode (the pending list)')
+    parser.add_argument('--gamma', type=float, default=0.0,
+                        help='discount over an episode (smart-schedule places tasks one at a time, greedily)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', help='write the weights (.npz) here instead of publishing them')
+    args = parser.parse_args()
+    train_slot_policy(args.iterations, args.envs, args.tasks, args.gamma, args.seed, args.out)
@@ -0,0 +1,160 @@
+"""
+Training Pipeline for Smart Task Manager
+
+One pass fits everything a retrain publishes, from the same rows of
+completed tasks (name, actual minutes, due date, created/completed at):
+1. Featurize - the priority model's ColumnTransformer is fit once; its
+   fitted TfidfVectorizer and TF-IDF block are reused by the time model
+   instead of vectorizing the task names a second time
+2. Time model - RandomForestRegressor on the shared TF-IDF matrix,
+   wrapped as the usual Pipeline([tfidf, regressor])
+3. Priority model - RandomForestClassifier on [scaled numeric | TF-IDF]
+   with the ground-truth labels from assign_real_priority
+4. Productivity profile - weighted KMeans over the deep / shallow
+   completion histograms (slot_clustering.py)
+
+Forests fit with n_jobs (SMT_TRAIN_JOBS, default all cores) and are
+reset to single-threaded afterwards so serving predictions never start
+a thread pool. Every stage's wall time is recorded by StageTimer.
+
+Author: Gojo-Satoru-git
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from feature_schema import NUMERIC_COLUMNS, TEXT_COLUMN, hours_until_due, priority_frame
+from insights_store import completion_slot
+from metrics import observe_span
+from slot_clustering import slot_histogram, top_slots
+
+TRAIN_JOBS = int(os.environ.get('SMT_TRAIN_JOBS', -1))
+DEEP_WORK_MIN = 45
+
+
+class StageTimer:
+    """Collects {stage: seconds} for the job report (and the train.<stage> metrics)."""
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = round(elapsed, 4)
+            observe_span(f'train.{name}', elapsed)
+            print(f"  [{name}] {self.timings[name]:.3f}s")
+
+
+# --- Model definitions (same shapes as ml_models/*.py and fast_predictor.py expect) ---
+def create_time_pipeline(n_jobs=None):
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(stop_words='english')),
+        ('regressor', RandomForestRegressor(n_estimators=10, random_state=42, n_jobs=n_jobs))
+    ])
+
+
+def create_priority_pipeline(n_jobs=None):
+    numeric_features = list(NUMERIC_COLUMNS)
+    numeric_transformer = Pipeline(steps=[
+        ('scaler', StandardScaler())
+    ])
+    text_features = TEXT_COLUMN
+    text_transformer = Pipeline(steps=[
+        ('tfidf', TfidfVectorizer(stop_words='english'))
+    ])
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, numeric_features),
+            ('text', text_transformer, text_features)
+        ])
+    return Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('classifier', RandomForestClassifier(random_state=42, n_jobs=n_jobs))
+    ])
+
+
+# --- Ground truth for the priority model ---
+def assign_real_priority(hours_to_due):
+    """Creates a "smart" ground-truth label from the time left until the deadline."""
+    if hours_to_due is None:
+        return 'Low' # No deadline
+    if hours_to_due <= 2:
+        return 'Critical'
+    if hours_to_due <= 48: # Due in 2 days
+        return 'High'
+    if hours_to_due > 168: # Due in over a week
+        return 'Low'
+    return 'Medium'
+
+
+def build_profile(completed_at, actual_minutes):
+    """Productivity profile: 2 deep-work habits and 1 shallow-work habit as slot ids."""
+    deep_days, deep_hours, shallow_days, shallow_hours = [], [], [], []
+    for done_at, minutes in zip(completed_at, actual_minutes):
+        if done_at and minutes:
+            day_of_week, hour_of_day = completion_slot(done_at)
+            if minutes > DEEP_WORK_MIN:
+                deep_days.append(day_of_week); deep_hours.append(hour_of_day)
+            else:
+                shallow_days.append(day_of_week); shallow_hours.append(hour_of_day)
+    return {
+        'last_trained': datetime.now().isoformat(),
+        'deep_work_slots': top_slots(slot_histogram(deep_days, deep_hours), k=2),
+        'shallow_work_slots': top_slots(slot_histogram(shallow_days, shallow_hours), k=1),
+    }
+
+
+def train_all(rows, n_jobs=TRAIN_JOBS, timer=None):
+    """
+    rows: sequence of (task_name, actual_time_min, due_date, created_at, completed_at).
+    Returns a dict with time_model, priority_model, profile, n_samples and timings.
+    """
+    timer = timer or StageTimer()
+    names, actual_minutes, due_dates, created, completed = (list(col) for col in zip(*rows))
+
+    with timer.stage('featurize'):
+        hours = [hours_until_due(due, made) for due, made in zip(due_dates, created)]
+        # At training time the estimate feature is the actual duration
+        frame = priority_frame(names, hours, actual_minutes)
+        labels = [assign_real_priority(h) for h in hours]
+        priority_model = create_priority_pipeline(n_jobs)
+        preprocessor = priority_model.named_steps['preprocessor']
+        X = preprocessor.fit_transform(frame)
+        # The TF-IDF block of the priority features is exactly tfidf.transform(names)
+        vectorizer = preprocessor.named_transformers_['text'].named_steps['tfidf']
+        X_text = X[:, preprocessor.output_indices_['text']]
+
+    with timer.stage('time_model'):
+        time_model = create_time_pipeline(n_jobs)
+        time_model.steps[0] = ('tfidf', vectorizer)
+        time_model.named_steps['regressor'].fit(X_text, actual_minutes)
+
+    with timer.stage('priority_model'):
+        priority_model.named_steps['classifier'].fit(X, labels)
+
+    with timer.stage('profile'):
+        profile = build_profile(completed, actual_minutes)
+
+    # Parallel fitting only: serving predicts one row at a time
+    time_model.named_steps['regressor'].set_params(n_jobs=None)
+    priority_model.named_steps['classifier'].set_params(n_jobs=None)
+    return {
+        'time_model': time_model,
+        'priority_model': priority_model,
+        'profile': profile,
+        'n_samples': len(names),
+        'timings': timer.timings,
+    }
@@ -0,0 +1,15 @@
+"""
+WSGI Entry Point for Smart Task Manager
+
+The object production servers import:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+create_app() migrates the database and preloads the models once; with
+gunicorn's preload_app that happens in the master, before workers fork.
+
+Author: Gojo-Satoru-git
+"""
+
+from app import create_app
+
+app = create_app()
@@ -1,4 +1,4 @@
-import React, { useState, useCallback } from 'react';
+import React, { useState, useCallback, useRef } from 'react';
 import {
   View,
   Text,
@@ -38,6 +38,8 @@ export const CalendarScreen = () => {
   const [schedule, setSchedule] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
+  // Plan version of the schedule on screen (sent back as If-None-Match)
+  const scheduleVersion = useRef(null);
 
   // --- Fetch the schedule ---
   const fetchSchedule = async () => {
@@ -45,10 +47,15 @@ export const CalendarScreen = () => {
     setIsLoading(true);
     setError(null);
     try {
-      const response = await fetch(`${API_URL}/api/v1/smart-schedule`);
+      const headers = scheduleVersion.current ? { 'If-None-Match': scheduleVersion.current } : {};
+      const response = await fetch(`${API_URL}/api/v1/smart-schedule`, { headers });
+      if (response.status === 304) {
+        return; // plan unchanged, keep what is on screen
+      }
       const data = await response.json();
       if (response.ok) {
         setSchedule(data);
+        scheduleVersion.current = response.headers.get('ETag');
       } else {
         setError(data.error || 'Failed to fetch schedule');
       }
@@ -14,6 +14,10 @@ import { URL } from '../../ip';
 // --- 2. Define API_URL ---
 const API_URL = URL.barath;
 
+// Retrain job polling: every 2 s, for at most 10 minutes
+const RETRAIN_POLL_MS = 2000;
+const RETRAIN_POLL_LIMIT_MS = 10 * 60 * 1000;
+
 // Reusable settings item component
 const SettingsItem = ({ label, iconName, onPress }) => (
   // --- 3. Updated to use onPress prop ---
@@ -52,14 +56,25 @@ export const SettingsScreen = () => {
               const response = await fetch(`${API_URL}/api/v1/retrain`, {
                 method: 'POST',
               });
-              const data = await response.json();
+              let data = await response.json();
+
+              // Retraining runs in the background: poll the job until it finishes (or we give up)
+              const isActive = () => data.status === 'queued' || data.status === 'running';
+              const deadline = Date.now() + RETRAIN_POLL_LIMIT_MS;
+              while (response.ok && isActive() && Date.now() < deadline) {
+                await new Promise(resolve => setTimeout(resolve, RETRAIN_POLL_MS));
+                const poll = await fetch(`${API_URL}/api/v1/retrain/${data.job_id}`);
+                data = await poll.json();
+              }
 
-              if (response.ok) {
+              if (response.ok && isActive()) {
+                Alert.alert("Training Timed Out", "Retraining is taking too long. Please try again later.");
+              } else if (response.ok && data.status !== 'failed') {
                 // 3. Show success message
                 Alert.alert("Success!", data.message);
               } else {
                 // 4. Show error/warning message
-                Alert.alert("Training Failed", data.message || data.error);
+                Alert.alert("Training Failed", data.error || data.message);
               }
             } catch (e) {
               Alert.alert("Error", "Could not connect to the retraining server.");